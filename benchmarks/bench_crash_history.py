@@ -0,0 +1,55 @@
+"""
+bench_crash_history.py - I fill a crash history with a million synthetic crashes and time the queries /api/history runs
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bsod-analyzer-python"))
+
+from crash_history import CrashHistory
+
+STOP_CODES = ["MEMORY_MANAGEMENT", "IRQL_NOT_LESS_OR_EQUAL", "SYSTEM_SERVICE_EXCEPTION", "KERNEL_SECURITY_CHECK_FAILURE",
+              "DRIVER_IRQL_NOT_LESS_OR_EQUAL", "PAGE_FAULT_IN_NONPAGED_AREA", "CRITICAL_PROCESS_DIED", "VIDEO_TDR_FAILURE"]
+CRASHES = 1_000_000
+YEAR = 365 * 24 * 60 * 60
+
+
+def timed(label, func, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<40} {elapsed * 1000:8.2f} ms  ({len(result)} rows)")
+
+
+def main():
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as directory:
+        history = CrashHistory(os.path.join(directory, "history.sqlite3"))
+        now = int(time.time())
+
+        started = time.perf_counter()
+        for batch in range(0, CRASHES, 10_000):
+            history._add([
+                (now - random.randrange(YEAR), random.choice(STOP_CODES), f"host{random.randrange(500):03d}", None,
+                 "event", ["0x0000000000041792", "0x0"], i.to_bytes(16, "little"))
+                for i in range(batch, batch + 10_000)
+            ])
+        print(f"Inserted {CRASHES} crashes in {time.perf_counter() - started:.1f}s, "
+              f"{os.path.getsize(history.path) / CRASHES:.0f} bytes per crash")
+
+        day = 24 * 60 * 60
+        timed("newest 100", lambda: history.query())
+        timed("one day", lambda: history.query(start=now - 30 * day, end=now - 29 * day, limit=1000))
+        timed("one stop code, one week", lambda: history.query(
+            start=now - 7 * day, end=now, stop_code="VIDEO_TDR_FAILURE", limit=1000))
+        timed("stop code counts, one week", lambda: history.stop_code_counts(now - 7 * day, now))
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+bench_event_merge.py - I feed synthetic BugCheck events through my Event Viewer extraction and merge path
+to check that the time per event stays flat as the number of events grows
+"""
+import os
+import sys
+import json
+import time
+import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bsod-analyzer-python"))
+
+from error_code_index import ErrorCodeIndex
+from event_viewer_scanner import RecordedEvent, merge_crash_events
+
+
+def synthetic_events(count, hex_codes):
+    # I'm repeating every fourth event so the dedup set has real work to do
+    start = datetime.datetime(2025, 1, 1)
+    for i in range(count):
+        n = i - (i % 4 == 3)
+        yield RecordedEvent({
+            "RecordNumber": i + 1,
+            "TimeGenerated": (start + datetime.timedelta(seconds=n)).strftime('%Y-%m-%d %H:%M:%S'),
+            "SourceName": "BugCheck",
+            "EventID": 1001,
+            "StringInserts": [f"{hex_codes[n % len(hex_codes)]} (0x0, 0x2, 0x0, 0x0)"]
+        })
+
+
+def main():
+    with open(os.path.join(ROOT, "error-codes.json"), "r") as f:
+        error_codes_data = json.load(f)
+    code_index = ErrorCodeIndex(error_codes_data)
+    hex_codes = [e["hexCode"] for e in code_index.entries if e.get("hexCode")]
+
+    for count in (12500, 25000, 50000, 100000):
+        events = list(synthetic_events(count, hex_codes))
+        crash_events, seen = [], set()
+        started = time.perf_counter()
+        added = merge_crash_events(events, error_codes_data, 'evtlog', crash_events, seen, code_index)
+        elapsed = time.perf_counter() - started
+        print(f"{count:>7} events  {added:>7} crashes  {elapsed:6.2f}s  {elapsed / count * 1e6:6.1f} us/event")
+
+
+if __name__ == "__main__":
+    main()
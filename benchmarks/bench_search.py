@@ -0,0 +1,54 @@
+"""
+bench_search.py - I time fuzzy searches against a knowledge base padded out to thousands of entries
+"""
+import os
+import sys
+import json
+import time
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bsod-analyzer-python"))
+
+from error_code_index import ErrorCodeIndex
+
+QUERIES = ["IRQL_NOT_LES_OR_EQUAL", "PAGE FAULT NONPAGED", "memry managment", "faulty ram driver", "0x1a"]
+
+
+def synthetic_entries(real_entries, count):
+    # I'm building names and descriptions from every word in the real database, so the vocabulary
+    # is as varied as the real one rather than a handful of words every entry shares
+    random.seed(1)
+    vocabulary = sorted({word.strip(".,:;()'\"") for word in json.dumps(real_entries).replace("\\n", " ").split()} - {""})
+    name_words = sorted({word.upper() for word in vocabulary if word.isalpha() and len(word) > 2})
+    text_words = vocabulary
+    for i in range(count):
+        yield {
+            "code": "_".join(random.sample(name_words, 4)) + f"_{i}",
+            "hexCode": f"0x{0x1000 + i:08X}",
+            "description": " ".join(random.choices(text_words, k=25)),
+            "commonCauses": [" ".join(random.choices(text_words, k=5)) for _ in range(4)]
+        }
+
+
+def main():
+    with open(os.path.join(ROOT, "error-codes.json"), "r") as f:
+        real_entries = json.load(f)["errorCodes"]
+
+    for count in (1000, 5000):
+        entries = real_entries + list(synthetic_entries(real_entries, count))
+        started = time.perf_counter()
+        index = ErrorCodeIndex({"errorCodes": entries})
+        print(f"{len(entries)} entries indexed in {time.perf_counter() - started:.2f}s")
+
+        for query in QUERIES:
+            repeat = 200
+            started = time.perf_counter()
+            for _ in range(repeat):
+                results = index.search(query, 10)
+            elapsed = (time.perf_counter() - started) / repeat
+            print(f"  {query!r:<26} {elapsed * 1e6:8.0f} us  top: {results[0][1]['code']}")
+
+
+if __name__ == "__main__":
+    main()
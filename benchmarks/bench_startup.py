@@ -0,0 +1,70 @@
+"""
+bench_startup.py - I time a cold import of app.py in fresh interpreters and show where the import time goes
+"""
+import os
+import sys
+import statistics
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "bsod-analyzer-python")
+RUNS = 15
+TOP = 15
+
+
+def cold_import(code="import app"):
+    # A new interpreter each time, so nothing is already in sys.modules. I report the child's CPU time,
+    # which a busy machine disturbs far less than wall time.
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "ERROR_CODES_POLL_INTERVAL": "0"}
+    )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def import_profile():
+    """
+    I return (self microseconds, cumulative microseconds, module) for every import -X importtime reports
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "ERROR_CODES_POLL_INTERVAL": "0"}
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return rows
+
+
+def main():
+    baseline = [cold_import("pass") for _ in range(RUNS)]
+    timings = [cold_import() for _ in range(RUNS)]
+    interpreter = statistics.median(baseline)
+    print(f"interpreter alone   {interpreter * 1000:7.1f} ms CPU (median of {RUNS})")
+    print(f"import app          {statistics.median(timings) * 1000:7.1f} ms CPU "
+          f"({(statistics.median(timings) - interpreter) * 1000:.1f} ms over the bare interpreter)")
+
+    rows = import_profile()
+    total = next(cumulative for _, cumulative, module in rows if module.strip() == "app")
+    print(f"\nimport-time breakdown, app cumulative {total / 1000:.1f} ms, slowest {TOP} by cumulative time:")
+    print(f"  {'self ms':>8} {'cum ms':>8}  module")
+    for self_us, cumulative_us, module in sorted(rows, key=lambda row: -row[1])[:TOP]:
+        print(f"  {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {module}")
+
+    own = {name[:-3] for name in os.listdir(APP_DIR) if name.endswith(".py")}
+    print("\nmy own modules:")
+    for self_us, cumulative_us, module in rows:
+        if module.strip() in own:
+            print(f"  {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {module.strip()}")
+
+
+if __name__ == "__main__":
+    main()
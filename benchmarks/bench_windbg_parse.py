@@ -0,0 +1,101 @@
+"""
+bench_windbg_parse.py - I time my line-by-line WinDbg output parser against the six-regex parser it replaced,
+on synthetic !analyze -v and lm transcripts the size of a verbose kernel dump analysis
+"""
+import os
+import re
+import sys
+import time
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bsod-analyzer-python"))
+
+from windbg_integration import WinDbgOutputParser
+
+RUNS = 5
+
+
+def legacy_parse(output):
+    # The parser as it was before: every field searched over the whole output, modules deduplicated in a list
+    results = {"stop_code": None, "stop_code_name": None, "cause": None,
+               "responsible_driver": None, "responsible_address": None, "loaded_modules": []}
+    match = re.search(r"Bugcheck code: (0x[0-9a-fA-F]+)", output)
+    if match:
+        results["stop_code"] = match.group(1)
+    match = re.search(r"Bugcheck code: 0x[0-9a-fA-F]+ \(([^)]+)\)", output)
+    if match:
+        results["stop_code_name"] = match.group(1)
+    match = re.search(r"Probably caused by : ([^\r\n]+)", output)
+    if match:
+        results["cause"] = match.group(1)
+        driver = re.search(r"(\w+\.\w+)", results["cause"])
+        if driver:
+            results["responsible_driver"] = driver.group(1)
+    match = re.search(r"EXCEPTION_PARAMETER1: ([0-9a-fA-F]+)", output)
+    if match:
+        results["responsible_address"] = match.group(1)
+    for match in re.finditer(r"([a-zA-Z0-9]+\.sys)\s+", output):
+        if match.group(1) not in results["loaded_modules"]:
+            results["loaded_modules"].append(match.group(1))
+    results["raw_output"] = output[:5000]
+    return results
+
+
+def transcript(stack_lines, modules):
+    """
+    I write an !analyze -v transcript with stack_lines of stack text, then an lm table of modules
+    """
+    rng = random.Random(modules)
+    names = [f"drv{i:04d}" for i in range(modules)]
+    lines = ["*" * 79, "*                        Bugcheck Analysis", "*" * 79, "",
+             "DRIVER_IRQL_NOT_LESS_OR_EQUAL (d1)", "Arguments:", "Arg1: 0000000000000010", ""]
+    for i in range(stack_lines):
+        name = rng.choice(names)
+        lines.append(f"ffff{rng.getrandbits(44):012x} fffff801`{rng.getrandbits(32):08x}     : "
+                     f"00000000`00000000 ffff{rng.getrandbits(44):012x} : {name}!Routine{i % 97}+0x{i % 4096:x}")
+        if i % 50 == 0:
+            lines.append(f"    {name}.sys loaded at fffff801`{rng.getrandbits(32):08x}")
+    lines += ["", "EXCEPTION_PARAMETER1: fffff80112345678", "",
+              "Bugcheck code: 0xD1 (DRIVER_IRQL_NOT_LESS_OR_EQUAL)",
+              "Probably caused by : drv0042.sys ( drv0042+1234 )", "",
+              "start             end                 module name"]
+    for i, name in enumerate(names):
+        base = 0xFFFFF80110000000 + i * 0x100000
+        lines.append(f"{base >> 32:08x}`{base & 0xFFFFFFFF:08x} {(base + 0x80000) >> 32:08x}`"
+                     f"{(base + 0x80000) & 0xFFFFFFFF:08x}   {name}    {name}.sys   (deferred)")
+    return "\n".join(lines) + "\n"
+
+
+def best_of(function, output):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        function(output)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def streaming_parse(output):
+    parser = WinDbgOutputParser()
+    for line in output.splitlines(keepends=True):
+        parser.feed(line)
+    return parser.results()
+
+
+def main():
+    print(f"{'output':>9} {'modules':>8} {'before':>10} {'after':>10}  speedup")
+    for stack_lines, modules in ((5000, 200), (20000, 500), (50000, 1000), (100000, 2000)):
+        output = transcript(stack_lines, modules)
+        before, after = legacy_parse(output), streaming_parse(output)
+        for key in before:
+            assert before[key] == after[key], key
+        assert len(after["module_table"]) == modules
+
+        legacy, streaming = best_of(legacy_parse, output), best_of(streaming_parse, output)
+        print(f"{len(output) / 1e6:7.1f}MB {modules:>8} {legacy * 1000:8.1f}ms {streaming * 1000:8.1f}ms"
+              f"  {legacy / streaming:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
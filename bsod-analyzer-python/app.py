@@ -1,12 +1,20 @@
 import os
 import time
 import json
+import shutil
+import hashlib
+import tempfile
+import threading
 import traceback
 import sys
 import platform
+from collections import Counter
+from itertools import chain, count
+from concurrent.futures import as_completed
 from pathlib import Path
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
 
 # I'm setting up important file paths for my application
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -17,141 +25,294 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 # I'm trying to import my minidump parser module
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 try:
-    from minidump_parser import extract_dump_info
+    from minidump_parser import extract_dump_info, open_dump_buffer
     PARSER_AVAILABLE = True
 except ImportError as e:
     print(f"Minidump parser not loaded: {e}")
     PARSER_AVAILABLE = False
 
-# I'm making sure my uploads directory exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+from error_code_index import normalize_hex
+from job_queue import JobQueue, QueueFullError
+from result_cache import ResultCache
+from knowledge_base import KnowledgeBase
+from content_encoding import negotiated_response
+from static_assets import StaticAssets
+from crash_history import CrashHistory, parse_time
+from chunked_upload import ChunkedUploads, UploadError
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, stage
+from upload_guard import UploadRequest, SIGNATURE_BYTES, is_dump_head
+from driver_index import DriverIndex
 
-# I'm trying to set the right permissions for my uploads folder
-try:
-    import stat
-    os.chmod(UPLOAD_FOLDER, stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
-except Exception as e:
-    print(f"Warning: Could not set permissions on uploads folder: {e}")
-
-# I'm setting up my Flask application with CORS support
+# I'm setting up my Flask application with CORS support.
+# My own routes serve the frontend, so I turn off Flask's static route that would shadow them.
 app = Flask(
     __name__,
-    static_folder=FRONTEND_DIR,
-    static_url_path=''
+    static_folder=None
 )
 CORS(app)
 
-# I'm loading my error codes database from the JSON file
-try:
-    possible_paths = [
+# I'm remembering where my last Event Viewer scan stopped, next to my uploads so it persists
+SCAN_STATE_PATH = os.path.join(UPLOAD_FOLDER, 'scan-state.json')
+
+# I'm running uploaded dumps through a bounded pool of background workers when asked to
+DUMP_ANALYSIS_MODE = os.environ.get('DUMP_ANALYSIS_MODE', 'sync')
+analysis_jobs = JobQueue(
+    max_workers=int(os.environ.get('ANALYSIS_WORKERS', 2)),
+    queue_depth=int(os.environ.get('ANALYSIS_QUEUE_DEPTH', 8))
+)
+
+# I'm remembering analysis results by upload hash so repeat uploads skip the parser entirely.
+# The cache, the chunked upload sessions and the crash history all live in my uploads folder,
+# so init_app opens them rather than importing me.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+result_cache = None
+
+# I'm accepting huge dumps in resumable parts, written straight into a preallocated file
+UPLOAD_PART_MAX_SIZE = int(os.environ.get('UPLOAD_PART_MAX_SIZE', 64 * 1024 ** 2))
+chunked_uploads = None
+
+# I'm capping request bodies by route: uploads get room for a kernel dump, everything else MAX_REQUEST_SIZE.
+# Dumps posted for analysis must start with a dump signature, and batches may also be zips of dumps.
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_REQUEST_SIZE', 16 * 1024 ** 2))
+UploadRequest.size_limits = {
+    'analyze_dump': int(os.environ.get('DUMP_UPLOAD_MAX_SIZE', 4 * 1024 ** 3)),
+    'analyze_dumps': int(os.environ.get('BATCH_UPLOAD_MAX_SIZE', 16 * 1024 ** 3)),
+    'scan_fleet': int(os.environ.get('FLEET_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)),
+    'analyze_codes': int(os.environ.get('BULK_UPLOAD_MAX_SIZE', 256 * 1024 ** 2)),
+    'upload_part': UPLOAD_PART_MAX_SIZE,
+}
+UploadRequest.signature_checks = {'analyze_dump': False, 'analyze_dumps': True}
+app.request_class = UploadRequest
+
+# I'm fanning batch uploads out to a process pool so parsing uses every core
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 0)) or None
+batch_pool = None
+batch_pool_lock = threading.Lock()
+
+# I'm spelling each driver the same way in every result, however the dumps spelled it
+driver_index = DriverIndex()
+
+# I'm keeping every analyzed dump and scanned crash so the history can be queried later
+crash_history = None
+HISTORY_PAGE_LIMIT = 1000
+
+# I'm collecting from several machines or exported logs at once, giving each one its own time limit
+FLEET_MAX_TARGETS = int(os.environ.get('FLEET_MAX_TARGETS', 64))
+FLEET_WORKERS = int(os.environ.get('FLEET_WORKERS', 8))
+FLEET_HOST_TIMEOUT = float(os.environ.get('FLEET_HOST_TIMEOUT', 60))
+
+# I'm loading my error codes database from the first of these files that exists, and reloading it when it changes.
+# Analysis results embed database entries, so a reload also empties my result cache.
+knowledge_base = KnowledgeBase(
+    [
         ERROR_CODES_PATH,
-        os.path.join(FRONTEND_DIR, 'error-codes.json'),
-        os.path.join(BASE_DIR, '..', 'error-codes.json')
+        os.path.join(FRONTEND_DIR, 'error-codes.json')
+    ],
+    poll_interval=float(os.environ.get('ERROR_CODES_POLL_INTERVAL', 2)),
+    on_reload=lambda snapshot: result_cache.clear()
+)
+
+def __getattr__(name):
+    # error_codes_data was a module global before the database could reload; I keep the name pointing at the live data
+    if name == 'error_codes_data':
+        return knowledge_base.snapshot.data
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# I'm fingerprinting and precompressing my frontend once, so hashed assets can be cached forever
+STATIC_ASSET_MAX_AGE = 365 * 24 * 60 * 60
+static_assets = StaticAssets(FRONTEND_DIR)
+
+app_ready = False
+app_ready_lock = threading.Lock()
+
+def init_app(upload_folder=None):
+    """
+    I do everything that touches disk or starts threads, once: I create the uploads folder (upload_folder
+    when given), open the result cache, chunked upload sessions and crash history inside it,
+    and start watching the error codes database. The first request calls me if nobody has yet.
+    """
+    global app_ready, UPLOAD_FOLDER, SCAN_STATE_PATH, result_cache, chunked_uploads, crash_history
+    with app_ready_lock:
+        if app_ready:
+            return
+        if upload_folder:
+            UPLOAD_FOLDER = upload_folder
+            SCAN_STATE_PATH = os.path.join(UPLOAD_FOLDER, 'scan-state.json')
+
+        # I'm making sure my uploads directory exists
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+        # I'm trying to set the right permissions for my uploads folder
+        try:
+            import stat
+            os.chmod(UPLOAD_FOLDER, stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
+        except Exception as e:
+            print(f"Warning: Could not set permissions on uploads folder: {e}")
+
+        result_cache = ResultCache(
+            os.path.join(UPLOAD_FOLDER, 'result-cache'),
+            max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 1024)),
+            ttl=int(os.environ.get('RESULT_CACHE_TTL', 7 * 24 * 60 * 60))
+        )
+        chunked_uploads = ChunkedUploads(
+            os.path.join(UPLOAD_FOLDER, 'chunked'),
+            max_size=int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', 64 * 1024 ** 3)),
+            max_part_size=UPLOAD_PART_MAX_SIZE,
+            ttl=int(os.environ.get('UPLOAD_SESSION_TTL', 24 * 60 * 60))
+        )
+        crash_history = CrashHistory(
+            os.environ.get('CRASH_HISTORY_PATH', os.path.join(UPLOAD_FOLDER, 'crash-history.sqlite3'))
+        )
+        knowledge_base.watch()
+        app_ready = True
+
+@app.before_first_request
+def init_app_on_first_request():
+    init_app()
+
+# I'm counting and timing what my server does so /metrics can show where the time goes
+REQUEST_SECONDS = REGISTRY.histogram(
+    "bsod_request_duration_seconds", "Seconds spent answering each endpoint", ("endpoint", "status")
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("bsod_requests_in_flight", "Requests being answered right now")
+DUMP_ANALYSES = REGISTRY.counter(
+    "bsod_dump_analyses_total", "Dump analyses by the method that settled the stop code", ("method",)
+)
+UPLOAD_BYTES = REGISTRY.counter("bsod_upload_bytes_total", "Bytes of uploaded dumps and event logs")
+
+def collect_state_metrics():
+    # I read queue, cache and database state when scraped instead of tracking every change
+    jobs = analysis_jobs.stats()
+    cache = result_cache.stats()
+    return [
+        ("bsod_analysis_jobs", "gauge", "Background dump analyses by status", ("status",),
+         {(status,): jobs[status] for status in ("queued", "running", "done", "failed")}),
+        ("bsod_analysis_job_capacity", "gauge", "Background dump analyses I accept before answering 429", (),
+         {(): jobs["capacity"]}),
+        ("bsod_result_cache_lookups_total", "counter", "Result cache lookups by outcome", ("outcome",),
+         {("hit",): cache["hits"], ("miss",): cache["misses"]}),
+        ("bsod_result_cache_evictions_total", "counter", "Results dropped from the cache", (),
+         {(): cache["evictions"]}),
+        ("bsod_result_cache_entries", "gauge", "Results held in the cache", (), {(): cache["entries"]}),
+        ("bsod_knowledge_base_version", "gauge", "Version of the error codes database in use", (),
+         {(): knowledge_base.snapshot.version}),
     ]
-    
-    error_codes_data = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            print(f"Found error-codes.json at: {path}")
-            with open(path, 'r') as f:
-                error_codes_data = json.load(f)
-            break
-    
-    if error_codes_data is None:
-        print("Error codes database not found")
-        error_codes_data = {"errorCodes": []}
-        
-except Exception as e:
-    print(f"Could not load error codes: {e}")
-    error_codes_data = {"errorCodes": []}
+
+REGISTRY.collector(collect_state_metrics)
+
+if REGISTRY.enabled:
+    @app.before_request
+    def start_request_timer():
+        REQUESTS_IN_FLIGHT.inc()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        # Streamed responses are timed until their first byte is ready, not until the stream ends
+        started = g.pop('request_started', None)
+        if started is not None:
+            REQUEST_SECONDS.labels(request.endpoint or "unmatched", str(response.status_code)).observe(
+                time.perf_counter() - started
+            )
+        return response
+
+    @app.teardown_request
+    def finish_request(exception=None):
+        REQUESTS_IN_FLIGHT.dec()
+
+@app.before_request
+def refuse_oversized_body():
+    # Werkzeug only enforces the cap while parsing a form, after reading the whole body, so I check
+    # the declared length first and answer without reading a byte
+    limit = request.max_content_length
+    if limit is not None and request.content_length is not None and request.content_length > limit:
+        raise RequestEntityTooLarge()
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    limit = request.max_content_length
+    return jsonify({
+        "error": f"Request body is too large, {request.endpoint or 'this endpoint'} accepts at most {limit} bytes",
+        "type": "upload_too_large",
+        "limit": limit
+    }), 413
+
+@app.errorhandler(UnsupportedMediaType)
+def unsupported_upload(e):
+    # I'm refusing files that aren't dumps rather than guessing a stop code from their size
+    return jsonify({"error": e.description, "type": "unsupported_media"}), 415
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # I'm exposing every counter, gauge and timing histogram in Prometheus text format
+    if not REGISTRY.enabled:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 # I'm setting up routes to serve my frontend files
 @app.route('/')
 def serve_index():
-    if os.path.exists(os.path.join(FRONTEND_DIR, 'index.html')):
-        return send_from_directory(FRONTEND_DIR, 'index.html')
-    else:
-        return send_from_directory('../frontend', 'index.html')
+    return serve_static('index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
-    return send_from_directory('../frontend', path)
+    body, fingerprinted = static_assets.get(path)
+    if body is None:
+        # Anything added after startup is served straight from disk
+        return send_from_directory(FRONTEND_DIR, path)
+    if fingerprinted:
+        return negotiated_response(request, body, STATIC_ASSET_MAX_AGE, immutable=True)
+    # Unhashed names, index.html included, are revalidated on every use
+    response = negotiated_response(request, body, 0)
+    response.cache_control.no_cache = True
+    return response
+
+# I'm letting browsers and CDNs keep lookup responses for a while; ETags make revalidation cheap afterwards
+LOOKUP_CACHE_MAX_AGE = int(os.environ.get('LOOKUP_CACHE_MAX_AGE', 300))
+
+def prepared_response(body):
+    """
+    I answer with bytes encoded when my database loaded. GET answers are public, compressed and
+    revalidate with If-None-Match; a POST can't be cached, so it gets the plain JSON with no caching headers.
+    """
+    if request.method != 'GET':
+        return Response(body.data, mimetype=body.mimetype)
+    return negotiated_response(request, body, LOOKUP_CACHE_MAX_AGE)
 
 # Analyze error code
-@app.route('/api/analyze-code', methods=['POST', 'OPTIONS'])
+@app.route('/api/analyze-code', methods=['GET', 'POST', 'OPTIONS'])
 def analyze_code():
     # I'm handling CORS preflight requests first
     if request.method == 'OPTIONS':
         response = app.make_default_options_response()
         response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
         return response
         
-    # I'm extracting and validating the error code from the request
-    data = request.get_json(force=True)
+    # I'm extracting and validating the error code from the request; GET lets CDNs cache lookups
+    data = request.get_json(force=True) if request.method == 'POST' else request.args
     code = (data.get('errorCode') or "").strip().upper()
     if not code:
         return jsonify({"error": "Error code is required"}), 400
 
-    # I'm normalizing hex codes for consistent comparison
-    normalized_hex = code
-    if code.startswith("0X") and len(code) > 2 and all(c in "0123456789ABCDEF" for c in code[2:]):
-        normalized_hex = "0X" + code[2:].lstrip("0")
-        normalized_hex = "0X0" if normalized_hex == "0X" else normalized_hex
-    
-    # I'm handling a common error code as a special case for better performance
-    if code in ("IRQL_NOT_LESS_OR_EQUAL", "0X0000000A", "0XA"):
-        for error in error_codes_data["errorCodes"]:
-            if error["code"] == "IRQL_NOT_LESS_OR_EQUAL":
-                return jsonify(error)
-
-    # I'm checking for exact match by name first (fastest path)
-    exact_by_name = next(
-        (c for c in error_codes_data["errorCodes"]
-         if c["code"] == code or c["code"] == code.replace("_", " ")),
-        None
-    )
-    if exact_by_name:
-        return jsonify(exact_by_name)
-    
-    # I'm checking for exact match by hex code
-    for error in error_codes_data["errorCodes"]:
-        if error.get("hexCode"):
-            error_hex = error["hexCode"].upper()
-            # I'm normalizing database hex codes the same way as input
-            if error_hex.startswith("0X"):
-                db_normalized = "0X" + error_hex[2:].lstrip("0")
-                db_normalized = "0X0" if db_normalized == "0X" else db_normalized
-                
-                if normalized_hex == db_normalized or normalized_hex == error_hex:
-                    return jsonify(error)
-
-    # I'm looking for partial matches when no exact match is found
-    # First by error code names
-    partials = [
-        c for c in error_codes_data["errorCodes"]
-        if code in c["code"] or c["code"] in code 
-        or code.replace("_", " ") in c["code"] or c["code"] in code.replace("_", " ")
-    ]
-    if partials:
-        return jsonify(partials[0])
-    
-    # Then by hex codes
-    hex_partials = [
-        error for error in error_codes_data["errorCodes"]
-        if error.get("hexCode") and (
-            normalized_hex in error["hexCode"].upper() or 
-            error["hexCode"].upper() in normalized_hex
-        )
-    ]
-    if hex_partials:
-        return jsonify(hex_partials[0])
+    # I'm resolving the code through my precomputed index (exact name, exact hex, then partials)
+    snapshot = knowledge_base.snapshot
+    match = snapshot.index.lookup(code)
+    if match:
+        return prepared_response(snapshot.body_for(match))
 
     # If no match found, I return a helpful generic response
-    return jsonify({
+    return jsonify(generic_code_response(code))
+
+def generic_code_response(code):
+    """
+    I describe a code my database doesn't know in general terms
+    """
+    return {
         "code": code,
-        "hexCode": normalized_hex if code.startswith("0X") else "",
+        "hexCode": normalize_hex(code) if code.startswith("0X") else "",
         "description": "Generic BSOD—no exact match found.",
         "commonCauses": [
             "Outdated drivers",
@@ -162,6 +323,124 @@ def analyze_code():
             { "title": "Update Drivers", "description": "Use Device Manager to update flagged drivers." },
             { "title": "Run SFC", "description": "Open admin CMD and run `sfc /scannow`." }
         ]
+    }
+
+# Analyze many error codes at once
+BULK_MAX_CODES = int(os.environ.get('BULK_MAX_CODES', 10000))
+
+@app.route('/api/analyze-codes', methods=['POST', 'OPTIONS'])
+def analyze_codes():
+    # I'm handling CORS preflight requests first
+    if request.method == 'OPTIONS':
+        response = app.make_default_options_response()
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        return response
+
+    snapshot = knowledge_base.snapshot
+
+    # An NDJSON body (one code per line) is read and answered line by line, so it can be any size
+    if request.mimetype == 'application/x-ndjson':
+        return Response(stream_code_lookups(read_code_lines(request.stream), snapshot),
+                        mimetype='application/x-ndjson')
+
+    data = request.get_json(force=True, silent=True)
+    codes = data.get('codes') if isinstance(data, dict) else data
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return jsonify({"error": "codes must be a list of error code strings"}), 400
+    if len(codes) > BULK_MAX_CODES:
+        return jsonify({
+            "error": f"At most {BULK_MAX_CODES} codes per request, send larger lists as NDJSON",
+            "type": "too_many_codes"
+        }), 413
+
+    if request.args.get('stream') in ('1', 'true'):
+        return Response(stream_code_lookups(codes, snapshot), mimetype='application/x-ndjson')
+
+    # I'm splicing each entry's pre-encoded body into the map instead of encoding it again
+    results = []
+    unmatched = []
+    for code, match in resolve_codes(codes, snapshot):
+        if match is None:
+            unmatched.append(code)
+            body = json.dumps(generic_code_response(code), separators=(",", ":"), sort_keys=True)
+        else:
+            body = snapshot.body_for(match).data.decode("utf-8").rstrip()
+        results.append(f"{json.dumps(code)}:{body}")
+    payload = (
+        f'{{"results":{{{",".join(results)}}},"matched":{len(results) - len(unmatched)},'
+        f'"unmatched":{json.dumps(unmatched)}}}\n'
+    )
+    return Response(payload, mimetype='application/json')
+
+def read_code_lines(stream):
+    """
+    I yield one code per line of an NDJSON body, accepting JSON strings or bare text
+    """
+    for raw in stream:
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        if line.startswith('"'):
+            try:
+                line = json.loads(line)
+            except ValueError:
+                pass
+        yield line
+
+def resolve_codes(codes, snapshot):
+    """
+    I yield (code, database entry or None) once per distinct code, in the order they first appear
+    """
+    seen = set()
+    for code in codes:
+        code = code.strip().upper()
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        yield code, snapshot.index.lookup(code)
+
+def stream_code_lookups(codes, snapshot):
+    """
+    I yield an NDJSON result line per distinct code, then a summary line
+    """
+    matched = 0
+    resolved = 0
+    for code, match in resolve_codes(codes, snapshot):
+        resolved += 1
+        if match is None:
+            yield json.dumps({"type": "result", "code": code, "matched": False,
+                              "result": generic_code_response(code)}) + "\n"
+            continue
+        matched += 1
+        body = snapshot.body_for(match).data.decode("utf-8").rstrip()
+        yield f'{{"type":"result","code":{json.dumps(code)},"matched":true,"result":{body}}}\n'
+    yield json.dumps({"type": "summary", "codes": resolved, "matched": matched}) + "\n"
+
+# Search error codes by a loosely typed name or symptom
+SEARCH_MAX_RESULTS = 50
+
+@app.route('/api/search', methods=['GET'])
+def search_codes():
+    # I'm ranking entries against ?q with my precomputed fuzzy index, so typos still find the right code
+    query = (request.args.get('q') or "").strip()
+    if not query:
+        return jsonify({"error": "Search query is required"}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), SEARCH_MAX_RESULTS))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+
+    results = knowledge_base.snapshot.index.search(query, limit)
+    return jsonify({
+        "query": query,
+        "results": [{
+            "score": round(score, 3),
+            "code": entry["code"],
+            "hexCode": entry.get("hexCode", ""),
+            "description": entry.get("description", "")
+        } for score, entry in results]
     })
 
 # Analyze dump file
@@ -183,120 +462,559 @@ def analyze_dump():
     if file.filename == '':
         return jsonify({"error": "No file selected"}), 400
     
+    # I'm deciding whether to analyze now or hand the dump to my background workers
+    mode = request.args.get('mode') or request.form.get('mode') or DUMP_ANALYSIS_MODE
+    if mode == 'async' and not analysis_jobs.has_capacity():
+        return queue_full_response()
+
+    if mode != 'async' and PARSER_AVAILABLE:
+        # I'm analyzing the upload where werkzeug already holds it: in memory when it's small,
+        # memory-mapped from its spool file when it's large, and never copied to my uploads folder
+        try:
+            with open_dump_buffer(file.stream) as view:
+                UPLOAD_BYTES.inc(len(view))
+                with stage("hash"):
+                    digest = hashlib.blake2b(view, digest_size=32).hexdigest()
+                cached = result_cache.get(digest)
+                if cached is not None:
+                    return cached_response(cached)
+                body, status = analyze_dump_source(view, digest)
+        except Exception as e:
+            return jsonify({
+                "error": f"Error analyzing dump file: {str(e)}",
+                "type": "analysis_error"
+            }), 500
+        response = jsonify(body)
+        response.headers['X-Result-Cache'] = 'MISS'
+        return response, status
+
     # I'm saving the uploaded file with a timestamp to avoid filename collisions
     filename = f"{int(time.time())}-{file.filename}"
     save_path = os.path.join(UPLOAD_FOLDER, filename)
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    
+
+    try:
+        digest = save_upload(file.stream, save_path)
+
+        # I'm answering straight from my cache when I've seen these exact bytes before
+        cached = result_cache.get(digest)
+        if cached is not None:
+            remove_upload(save_path)
+            return cached_response(cached)
+
+        if mode == 'async':
+            job_id = analysis_jobs.submit(analyze_saved_dump, save_path, digest)
+            return jsonify({
+                "jobId": job_id,
+                "status": "queued",
+                "statusUrl": f"/api/jobs/{job_id}"
+            }), 202
+    except QueueFullError:
+        remove_upload(save_path)
+        return queue_full_response()
+    except Exception as e:
+        remove_upload(save_path)
+        return jsonify({
+            "error": f"Error analyzing dump file: {str(e)}",
+            "type": "analysis_error"
+        }), 500
+
+    body, status = analyze_saved_dump(save_path, digest)
+    response = jsonify(body)
+    response.headers['X-Result-Cache'] = 'MISS'
+    return response, status
+
+def cached_response(body):
+    response = jsonify(body)
+    response.headers['X-Result-Cache'] = 'HIT'
+    return response
+
+def save_upload(stream, save_path):
+    """
+    I write an upload stream to disk in chunks and hash it on the way through, returning the hex digest
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    size = 0
+    with stage("save"), open(save_path, 'wb') as out:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+    UPLOAD_BYTES.inc(size)
+    return digest.hexdigest()
+
+def queue_full_response():
+    # I'm telling clients to back off when my analysis workers are saturated
+    response = jsonify({
+        "error": "Too many dump analyses in progress, please retry shortly",
+        "type": "queue_full"
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 429
+
+def remove_upload(save_path):
+    # I'm cleaning up by deleting the file after analysis (optional)
+    try:
+        with stage("cleanup"):
+            if os.path.exists(save_path):
+                os.remove(save_path)
+    except:
+        pass  # Silently continue if cleanup fails
+
+def analyze_saved_dump(save_path, digest=None, progress=lambda stage, percent: None):
+    """
+    I analyze a dump that's already on disk, delete it, and return (body, http_status)
+    """
+    try:
+        return analyze_dump_source(save_path, digest, progress)
+    finally:
+        remove_upload(save_path)
+
+def analyze_dump_source(source, digest=None, progress=lambda stage, percent: None):
+    """
+    I analyze a dump given as a path, buffer or file object and return (body, http_status).
+    Successful results are cached under the upload's digest.
+    """
     try:
-        file.save(save_path)
-        
-        # I'm tracking which analysis methods were used and their results
-        analysis_results = {
-            "basic_parser": {"used": False, "result": None},
-            "size_heuristic": {"used": False, "result": None},
-            "final_result": None
-        }
-        
-        # First I try my basic parser if it's available
         if PARSER_AVAILABLE:
-            analysis_results["basic_parser"]["used"] = True
-            dump_info = extract_dump_info(save_path)
-            analysis_results["basic_parser"]["result"] = dump_info
-            
-            if dump_info["error_detected"]:
-                analysis_results["final_result"] = {
-                    "code": dump_info["stop_code_name"],
-                    "hexCode": dump_info["stop_code"],
-                    "analysisMethod": "Basic dump file analysis",
-                    "validDumpFormat": dump_info["valid_format"]
-                }
+            # Every stage shares this one view, so the dump is opened and mapped only once
+            with open_dump_buffer(source) as view:
+                progress("parsing", 10)
+                with stage("parse"):
+                    dump_info = extract_dump_info(view)
+                size = len(view)
+        else:
+            dump_info, size = None, os.path.getsize(source)
+
+        progress("lookup", 90)
+        with stage("lookup"):
+            body = build_dump_response(dump_info, size)
+        return cache_result(digest, body), 200
+
+    except Exception as e:
+        # I'm handling any errors that might occur during file processing
+        return {
+            "error": f"Error analyzing dump file: {str(e)}",
+            "type": "analysis_error"
+        }, 500
+
+# A stop code guessed from the file size says nothing about the crash itself
+SIZE_HEURISTIC_METHOD = "Estimated based on file size"
+
+def build_dump_response(dump_info, size):
+    """
+    I turn my parser's result (or None if it didn't run) into the analyze-dump response body
+    """
+    # I'm tracking which analysis methods were used and their results
+    analysis_results = {
+        "basic_parser": {"used": False, "result": None},
+        "size_heuristic": {"used": False, "result": None},
+        "final_result": None
+    }
+    
+    # First I use my basic parser's result if it ran
+    if dump_info is not None:
+        analysis_results["basic_parser"]["used"] = True
+        analysis_results["basic_parser"]["result"] = dump_info
         
-        # If the parser didn't find anything, I use my size heuristic as a fallback
-        if not analysis_results["final_result"]:
-            analysis_results["size_heuristic"]["used"] = True
-            size = os.path.getsize(save_path)
-            
-            # I'm using file size to guess the most likely error type
-            if size < 1_048_576:  # Less than 1MB
-                etype = 'MEMORY_MANAGEMENT'
-                hex_code = '0x0000001A'
-            elif size < 10_485_760:  # Less than 10MB
-                etype = 'DRIVER_IRQL_NOT_LESS_OR_EQUAL'
-                hex_code = '0x0000000A'
-            else:
-                etype = 'SYSTEM_SERVICE_EXCEPTION'
-                hex_code = '0x0000003B'
-                
+        if dump_info["error_detected"]:
             analysis_results["final_result"] = {
-                "code": etype,
-                "hexCode": hex_code,
-                "analysisMethod": "Estimated based on file size",
-                "validDumpFormat": False,
-                "disclaimer": "This is an approximation only. The actual crash cause could be different."
+                "code": dump_info["stop_code_name"],
+                "hexCode": dump_info["stop_code"],
+                "analysisMethod": (
+                    "Dump bug check record"
+                    if dump_info.get("analysis_source") == "bugcheck_record"
+                    else "Basic dump file analysis"
+                ),
+                "validDumpFormat": dump_info["valid_format"]
             }
+            if dump_info.get("parameters"):
+                analysis_results["final_result"]["parameters"] = dump_info["parameters"]
+            if dump_info.get("crash_time"):
+                analysis_results["final_result"]["crashTime"] = dump_info["crash_time"]
+            if dump_info.get("driver"):
+                driver = dump_info["driver"]
+                name = driver_index.intern(driver["name"])
+                analysis_results["final_result"]["driver"] = name
+                analysis_results["final_result"]["faultingModule"] = f"{name}+0x{driver['offset']:X}"
+    
+    # If the parser didn't find anything, I use my size heuristic as a fallback
+    if analysis_results["final_result"]:
+        DUMP_ANALYSES.labels("basic_parser").inc()
+    else:
+        analysis_results["size_heuristic"]["used"] = True
+        DUMP_ANALYSES.labels("size_heuristic").inc()
         
-        # Now I'm looking up more detailed information from my error codes database
-        etype = analysis_results["final_result"]["code"]
-        info = next((c for c in error_codes_data["errorCodes"] if c["code"] == etype), None)
-        
-        if info:
-            # I'm combining the database info with my analysis results
-            final_response = {**info}
-            final_response["analysisMethod"] = analysis_results["final_result"]["analysisMethod"]
-            final_response["validDumpFormat"] = analysis_results["final_result"]["validDumpFormat"]
+        # I'm using file size to guess the most likely error type
+        if size < 1_048_576:  # Less than 1MB
+            etype = 'MEMORY_MANAGEMENT'
+            hex_code = '0x0000001A'
+        elif size < 10_485_760:  # Less than 10MB
+            etype = 'DRIVER_IRQL_NOT_LESS_OR_EQUAL'
+            hex_code = '0x0000000A'
+        else:
+            etype = 'SYSTEM_SERVICE_EXCEPTION'
+            hex_code = '0x0000003B'
             
-            if "disclaimer" in analysis_results["final_result"]:
-                final_response["disclaimer"] = analysis_results["final_result"]["disclaimer"]
-                
-            return jsonify(final_response)
-        
-        # If I can't find detailed info, I return a basic response with what I found
-        return jsonify({
-            "code": analysis_results["final_result"]["code"],
-            "hexCode": analysis_results["final_result"]["hexCode"],
-            "description": f"BSOD caused by {analysis_results['final_result']['code']}.",
-            "analysisMethod": analysis_results["final_result"]["analysisMethod"],
-            "validDumpFormat": analysis_results["final_result"]["validDumpFormat"],
-            "disclaimer": analysis_results["final_result"].get("disclaimer", ""),
-            "commonCauses": [
-                "Driver conflicts",
-                "Hardware failures",
-                "System file corruption"
-            ],
-            "solutions": [
-                {
-                    "title": "Update System Drivers",
-                    "description": "Update all drivers from manufacturer websites."
-                },
-                {
-                    "title": "Run System File Checker",
-                    "description": "Open admin CMD and run 'sfc /scannow'."
-                }
-            ]
-        })
+        analysis_results["final_result"] = {
+            "code": etype,
+            "hexCode": hex_code,
+            "analysisMethod": SIZE_HEURISTIC_METHOD,
+            "validDumpFormat": False,
+            "disclaimer": "This is an approximation only. The actual crash cause could be different."
+        }
+    
+    # Now I'm looking up more detailed information from my error codes database
+    etype = analysis_results["final_result"]["code"]
+    index = knowledge_base.snapshot.index
+    info = index.by_name(etype)
+    if not info and etype == analysis_results["final_result"]["hexCode"]:
+        # My parser only knows this stop code by number, so I look it up that way
+        info = index.by_hex(etype)
+    
+    if info:
+        # I'm combining the database info with my analysis results
+        final_response = {**info}
+        final_response["analysisMethod"] = analysis_results["final_result"]["analysisMethod"]
+        final_response["validDumpFormat"] = analysis_results["final_result"]["validDumpFormat"]
         
+        if "disclaimer" in analysis_results["final_result"]:
+            final_response["disclaimer"] = analysis_results["final_result"]["disclaimer"]
+        for key in ("parameters", "driver", "faultingModule", "crashTime"):
+            if key in analysis_results["final_result"]:
+                final_response[key] = analysis_results["final_result"][key]
+
+        return final_response
+    
+    # If I can't find detailed info, I return a basic response with what I found
+    return {
+        "code": analysis_results["final_result"]["code"],
+        "hexCode": analysis_results["final_result"]["hexCode"],
+        "description": f"BSOD caused by {analysis_results['final_result']['code']}.",
+        "analysisMethod": analysis_results["final_result"]["analysisMethod"],
+        "validDumpFormat": analysis_results["final_result"]["validDumpFormat"],
+        "disclaimer": analysis_results["final_result"].get("disclaimer", ""),
+        "parameters": analysis_results["final_result"].get("parameters", []),
+        "driver": analysis_results["final_result"].get("driver"),
+        "faultingModule": analysis_results["final_result"].get("faultingModule"),
+        "crashTime": analysis_results["final_result"].get("crashTime"),
+        "commonCauses": [
+            "Driver conflicts",
+            "Hardware failures",
+            "System file corruption"
+        ],
+        "solutions": [
+            {
+                "title": "Update System Drivers",
+                "description": "Update all drivers from manufacturer websites."
+            },
+            {
+                "title": "Run System File Checker",
+                "description": "Open admin CMD and run 'sfc /scannow'."
+            }
+        ]
+    }
+
+# Resumable chunked uploads: POST to start, PUT each part at its offset, GET to resume, POST complete to analyze.
+# I suggest parts of UPLOAD_PART_SIZE; clients may send any size up to my limit.
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    # I'm starting a session for a dump the client will send in parts
+    data = request.get_json(silent=True) or {}
+    try:
+        status = chunked_uploads.create(data.get('filename'), data.get('size'))
+    except UploadError as e:
+        return jsonify({"error": str(e), "type": "upload_error"}), e.status
+    status["partSize"] = min(UPLOAD_PART_SIZE, chunked_uploads.max_part_size)
+    status["uploadUrl"] = f"/api/uploads/{status['uploadId']}"
+    return jsonify(status), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'PUT', 'DELETE'])
+def upload_part(upload_id):
+    try:
+        if request.method == 'GET':
+            # I'm telling a client that lost its connection which byte ranges I still need
+            return jsonify(upload_status(chunked_uploads.status(upload_id)))
+        if request.method == 'DELETE':
+            chunked_uploads.abort(upload_id)
+            return jsonify({"uploadId": upload_id, "status": "aborted"})
+
+        # The part is the raw request body, so werkzeug streams it instead of spooling a form
+        try:
+            offset = int(request.args.get('offset', ''))
+        except ValueError:
+            return jsonify({"error": "offset must be a byte position", "type": "upload_error"}), 400
+        status = chunked_uploads.write_part(
+            upload_id, offset, request.stream, request.content_length,
+            sha256=request.headers.get('X-Part-SHA256')
+        )
+        UPLOAD_BYTES.inc(request.content_length)
+        return jsonify(upload_status(status))
+    except UploadError as e:
+        return jsonify({"error": str(e), "type": "upload_error"}), e.status
+
+def upload_status(status):
+    # Once the header parts reveal the stop code, I add what my database says about it
+    early = status["earlyResult"]
+    if early:
+        index = knowledge_base.snapshot.index
+        info = index.by_name(early["code"]) or index.by_hex(early["hexCode"])
+        if info:
+            status["earlyResult"] = {**early, "description": info.get("description", "")}
+    return status
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    # I'm analyzing a finished upload the same way /api/analyze-dump would, honouring ?mode=async
+    mode = request.args.get('mode') or DUMP_ANALYSIS_MODE
+    if mode == 'async' and not analysis_jobs.has_capacity():
+        return queue_full_response()
+    try:
+        save_path, digest, _ = chunked_uploads.complete(upload_id)
+    except UploadError as e:
+        return jsonify({"error": str(e), "type": "upload_error"}), e.status
+
+    cached = result_cache.get(digest)
+    if cached is not None:
+        remove_upload(save_path)
+        return cached_response(cached)
+
+    if mode == 'async':
+        try:
+            job_id = analysis_jobs.submit(analyze_saved_dump, save_path, digest)
+            return jsonify({"jobId": job_id, "status": "queued", "statusUrl": f"/api/jobs/{job_id}"}), 202
+        except QueueFullError:
+            # The session is gone by now, so I'd rather analyze here than lose the upload
+            pass
+
+    body, status = analyze_saved_dump(save_path, digest)
+    response = jsonify(body)
+    response.headers['X-Result-Cache'] = 'MISS'
+    return response, status
+
+# Analyze many dump files at once
+@app.route('/api/analyze-dumps', methods=['POST', 'OPTIONS'])
+def analyze_dumps():
+    # I'm handling CORS preflight requests
+    if request.method == 'OPTIONS':
+        response = app.make_default_options_response()
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        return response
+
+    # I'm accepting any number of dumpFile parts, each either a dump or a zip of dumps
+    files = [f for f in request.files.getlist('dumpFile') if f.filename]
+    if not files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    batch_dir = tempfile.mkdtemp(prefix='batch-', dir=UPLOAD_FOLDER)
+    try:
+        entries = collect_batch_files(files, batch_dir)
+    except BatchTooLargeError as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return jsonify({"error": str(e), "type": "batch_too_large"}), 413
     except Exception as e:
-        # I'm handling any errors that might occur during file processing
-        return jsonify({
-            "error": f"Error analyzing dump file: {str(e)}",
-            "type": "analysis_error"
-        }), 500
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return jsonify({"error": f"Error reading batch upload: {str(e)}", "type": "analysis_error"}), 400
+
+    if not any(path for _, path, _ in entries):
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        if entries:
+            return jsonify({"error": "No dump files found in upload", "type": "unsupported_media"}), 415
+        return jsonify({"error": "No dump files found in upload"}), 400
+
+    # I'm streaming one JSON line per file as it finishes, then a summary line
+    return Response(stream_batch_results(entries, batch_dir), mimetype='application/x-ndjson')
+
+class BatchTooLargeError(Exception):
+    """I raise this when a batch upload holds more files than I'm willing to analyze"""
+
+def collect_batch_files(files, batch_dir):
+    """
+    I save every uploaded dump (unpacking zips) into batch_dir and return [(name, path, digest)].
+    Zip members that aren't dumps are never extracted; they come back with a path and digest of None.
+    """
+    # Only batches need zipfile, so I import it here rather than at startup
+    import zipfile
+    entries = []
+    file_numbers = count(1)
+
+    def next_path():
+        if len(entries) >= BATCH_MAX_FILES:
+            raise BatchTooLargeError(f"A batch may contain at most {BATCH_MAX_FILES} dump files")
+        return os.path.join(batch_dir, f"{next(file_numbers)}.dmp")
+
+    for file in files:
+        save_path = next_path()
+        digest = save_upload(file.stream, save_path)
+        if not zipfile.is_zipfile(save_path):
+            # The upload started with a dump or zip signature; one that only looks like a zip is still no dump
+            with open(save_path, 'rb') as f:
+                if not is_dump_head(f.read(SIGNATURE_BYTES)):
+                    remove_upload(save_path)
+                    entries.append((file.filename, None, None))
+                    continue
+            entries.append((file.filename, save_path, digest))
+            continue
+
+        # I'm unpacking zip members under my own names so archive paths can't escape batch_dir
+        with zipfile.ZipFile(save_path) as archive:
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                with archive.open(member) as stream:
+                    if not is_dump_head(stream.read(SIGNATURE_BYTES)):
+                        entries.append((member.filename, None, None))
+                        continue
+                member_path = next_path()
+                with archive.open(member) as stream:
+                    member_digest = save_upload(stream, member_path)
+                entries.append((member.filename, member_path, member_digest))
+        remove_upload(save_path)
+
+    return entries
+
+def get_batch_pool():
+    # I'm creating my process pool the first time a batch arrives
+    global batch_pool
+    with batch_pool_lock:
+        if batch_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return batch_pool
+
+def stream_batch_results(entries, batch_dir):
+    """
+    I yield NDJSON lines with each file's result as soon as it's ready, then a stop code histogram
+    """
+    histogram = Counter()
+    failed = 0
+
+    def line(record):
+        return json.dumps(record) + "\n"
+
+    try:
+        # I'm answering cached files right away and parsing identical uploads only once
+        pending = {}
+        for name, path, digest in entries:
+            if path is None:
+                failed += 1
+                yield line({"type": "error", "file": name, "error": "Not a Windows minidump or kernel dump"})
+                continue
+            cached = result_cache.get(digest)
+            if cached is not None:
+                histogram[cached.get("code")] += 1
+                yield line({"type": "result", "file": name, "cached": True, "result": cached})
+            elif digest in pending:
+                pending[digest]["files"].append(name)
+            else:
+                future = get_batch_pool().submit(extract_dump_info, path) if PARSER_AVAILABLE else None
+                pending[digest] = {"future": future, "path": path, "files": [name]}
+
+        # Files the parser doesn't need to see come first, then each pool result as it finishes
+        futures = {job["future"]: digest for digest, job in pending.items() if job["future"] is not None}
+        ready = [digest for digest, job in pending.items() if job["future"] is None]
+        completed = (futures[future] for future in as_completed(futures))
+
+        for digest in chain(ready, completed):
+            job = pending[digest]
+            try:
+                dump_info = job["future"].result() if job["future"] is not None else None
+                body = cache_result(digest, build_dump_response(dump_info, os.path.getsize(job["path"])))
+            except Exception as e:
+                for name in job["files"]:
+                    failed += 1
+                    yield line({"type": "error", "file": name, "error": f"Error analyzing dump file: {str(e)}"})
+                continue
+
+            for name in job["files"]:
+                histogram[body.get("code")] += 1
+                yield line({"type": "result", "file": name, "cached": False, "result": body})
+
+        yield line({
+            "type": "summary",
+            "files": len(entries),
+            "failed": failed,
+            "stopCodes": dict(histogram.most_common())
+        })
     finally:
-        # I'm cleaning up by deleting the file after analysis (optional)
-        try:
-            if os.path.exists(save_path):
-                os.remove(save_path)
-        except:
-            pass  # Silently continue if cleanup fails
+        shutil.rmtree(batch_dir, ignore_errors=True)
+
+def cache_result(digest, body):
+    # I'm storing a finished analysis so the next upload of the same bytes is instant, and adding it to my history
+    # under the time the dump was written. Size guesses stay out of the history, since they'd skew its counts.
+    if digest:
+        result_cache.put(digest, body)
+        if body.get("analysisMethod") != SIZE_HEURISTIC_METHOD:
+            record_history(crash_history.record_dump, digest, body, timestamp=body.get("crashTime"))
+    return body
+
+def record_history(record, *args, **kwargs):
+    # A history write must never fail the analysis it describes
+    try:
+        record(*args, **kwargs)
+    except Exception as e:
+        print(f"Warning: Could not record crash history: {e}")
+
+# Crash history endpoints
+@app.route('/api/history', methods=['GET'])
+def history():
+    # I'm returning stored crashes newest first, filtered by ?from, ?to, ?code and ?host.
+    # ?before takes the "next" value of the previous page
+    try:
+        start, end = parse_time(request.args.get('from')), parse_time(request.args.get('to'))
+        limit = max(1, min(int(request.args.get('limit', 100)), HISTORY_PAGE_LIMIT))
+        before = tuple(int(part) for part in request.args['before'].split(':')) if request.args.get('before') else None
+        if before is not None and len(before) != 2:
+            raise ValueError("before must look like <timestamp>:<id>")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid history query: {str(e)}"}), 400
+
+    crashes = crash_history.query(
+        start, end,
+        stop_code=request.args.get('code'),
+        host=request.args.get('host'),
+        limit=limit,
+        before=before
+    )
+    return jsonify({
+        "crashes": crashes,
+        "next": f"{crashes[-1]['timestamp']}:{crashes[-1]['id']}" if len(crashes) == limit else None
+    })
+
+@app.route('/api/history/stop-codes', methods=['GET'])
+def history_stop_codes():
+    # I'm counting stored crashes per stop code between ?from and ?to
+    try:
+        start, end = parse_time(request.args.get('from')), parse_time(request.args.get('to'))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid history query: {str(e)}"}), 400
+    return jsonify({"stopCodes": crash_history.stop_code_counts(start, end)})
+
+# Job status endpoint
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    # I'm letting clients poll for the progress and result of a background analysis
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job)
 
 # IRQL error shortcut
 @app.route('/api/error/irql', methods=['GET'])
 def irql_error():
     # I'm creating a shortcut for the common IRQL error
-    for error in error_codes_data["errorCodes"]:
-        if error["code"] == "IRQL_NOT_LESS_OR_EQUAL":
-            return jsonify(error)
+    snapshot = knowledge_base.snapshot
+    error = snapshot.index.by_name("IRQL_NOT_LESS_OR_EQUAL")
+    if error:
+        return prepared_response(snapshot.body_for(error))
     
     # I'll use this fallback if the error isn't in my database
     return jsonify({
@@ -337,7 +1055,25 @@ def irql_error():
 @app.route('/api/debug/errors', methods=['GET'])
 def debug_errors():
     # I'm returning all error codes for debugging purposes
-    return jsonify(error_codes_data)
+    return prepared_response(knowledge_base.snapshot.database_body)
+
+# Error code database version
+@app.route('/api/knowledge-base', methods=['GET'])
+def knowledge_base_info():
+    # I'm reporting which version of my error codes database requests are using right now
+    snapshot = knowledge_base.snapshot
+    return jsonify({
+        "version": snapshot.version,
+        "path": snapshot.path,
+        "entries": len(snapshot.index.entries),
+        "loaded": snapshot.loaded
+    })
+
+# Result cache statistics
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    # I'm exposing my result cache counters for monitoring
+    return jsonify(result_cache.stats())
 
 # Upload test endpoint
 @app.route('/api/test-upload', methods=['GET'])
@@ -372,6 +1108,13 @@ def scan_system():
         return jsonify({"error": "System scanning is only available on Windows"}), 400
     
     try:
+        crashes, warning = open_system_scan(request.args.get('mode'))
+        
+        # With ?stream=1 I send each crash as an NDJSON line the moment I find it, then a summary line
+        if request.args.get('stream') in ('1', 'true'):
+            return Response(stream_with_context(stream_scan_results(crashes, warning)),
+                            mimetype='application/x-ndjson')
+        
         results = {
             "success": True,
             "events_found": 0,
@@ -381,27 +1124,13 @@ def scan_system():
         
         # I'm looking for crashes in the Event Viewer
         try:
-            import importlib
-            if 'event_viewer_scanner' in sys.modules:
-                importlib.reload(sys.modules['event_viewer_scanner'])
-            
-            from event_viewer_scanner import scan_event_viewer_for_crashes, EVENT_VIEWER_AVAILABLE
-            
-            if not EVENT_VIEWER_AVAILABLE:
-                results["warning"] = "Event Viewer scanning unavailable. Check if pywin32 is installed correctly."
-            else:
-                event_viewer_crashes = scan_event_viewer_for_crashes(
-                    max_events=5000,
-                    error_codes_data=error_codes_data.copy() if error_codes_data else None
-                )
-                
-                if event_viewer_crashes:
-                    results["events_found"] += len(event_viewer_crashes)
-                    results["crashes"].extend(event_viewer_crashes)
-        except ImportError as e:
-            results["warning"] = f"Could not import Event Viewer scanner: {str(e)}"
+            results["crashes"].extend(crashes)
         except Exception as e:
-            results["warning"] = f"Error during Event Viewer scan: {str(e)}"
+            warning = f"Error during Event Viewer scan: {str(e)}"
+        results["events_found"] = len(results["crashes"])
+        record_history(crash_history.record_events, unrecorded(results["crashes"]), host=platform.node())
+        if warning:
+            results["warning"] = warning
         
         # I'm sorting the crashes by date, newest first
         if results["crashes"]:
@@ -422,10 +1151,165 @@ def scan_system():
             "trace": traceback.format_exc()
         }), 500
 
+def open_system_scan(mode):
+    """
+    I pick the Event Viewer scan for mode and return (crash iterator, warning or None)
+    """
+    # The scanner and pywin32 are imported the first time anyone scans, then reused by every later scan
+    try:
+        from event_viewer_scanner import (
+            iter_event_viewer_crashes, iter_event_viewer_incremental,
+            Win32EventLogSource, load_pywin32
+        )
+    except ImportError as e:
+        return iter(()), f"Could not import Event Viewer scanner: {str(e)}"
+    
+    if not load_pywin32():
+        return iter(()), "Event Viewer scanning unavailable. Check if pywin32 is installed correctly."
+    if mode == 'full':
+        # A full scan re-queries WMI and re-reads the recent log from scratch
+        return iter_event_viewer_crashes(
+            max_events=5000,
+            code_index=knowledge_base.snapshot.index
+        ), None
+    # By default I only read records added since my last scan; earlier crashes come from my history store
+    return chain(stored_event_crashes(platform.node()), iter_event_viewer_incremental(
+        Win32EventLogSource(),
+        SCAN_STATE_PATH,
+        code_index=knowledge_base.snapshot.index
+    )), None
+
+def stored_event_crashes(host):
+    """
+    I yield the Event Viewer crashes earlier scans of host found, shaped like the scanner's own results.
+    They're marked stored so nobody records them twice.
+    """
+    index = knowledge_base.snapshot.index
+    for row in crash_history.query(host=host, source="event", limit=HISTORY_PAGE_LIMIT):
+        info = index.by_name(row["stopCode"]) or {}
+        yield {
+            "source": "Event Viewer",
+            "date": row["date"],
+            "error_code": row["stopCode"],
+            "description": info.get("description", ""),
+            "parameters": row["parameters"],
+            "driver": row["driver"],
+            "stored": True
+        }
+
+def unrecorded(crashes):
+    return [crash for crash in crashes if not crash.get("stored")]
+
+def stream_scan_results(crashes, warning=None):
+    """
+    I yield one NDJSON line per crash as the scanner produces it, then a summary line
+    """
+    def line(record):
+        return json.dumps(record) + "\n"
+    
+    found = 0
+    pending = []
+    try:
+        for crash in crashes:
+            found += 1
+            yield line({"type": "crash", "crash": crash})
+            
+            # I'm writing history in small batches so memory stays flat however many crashes match
+            if not crash.get("stored"):
+                pending.append(crash)
+            if len(pending) >= 500:
+                record_history(crash_history.record_events, pending, host=platform.node())
+                pending = []
+    except Exception as e:
+        warning = f"Error during Event Viewer scan: {str(e)}"
+    record_history(crash_history.record_events, pending, host=platform.node())
+    
+    summary = {"type": "summary", "success": True, "events_found": found, "date_analyzed": time.time()}
+    if warning:
+        summary["warning"] = warning
+    if not found:
+        summary["message"] = "No BSOD crashes found in your system's Event Viewer."
+    yield line(summary)
+    
+    # I'm cleaning up COM objects to prevent memory leaks
+    import gc
+    gc.collect()
+
+@app.route('/api/scan-fleet', methods=['POST', 'OPTIONS'])
+def scan_fleet():
+    # I'm handling CORS preflight requests
+    if request.method == 'OPTIONS':
+        response = app.make_default_options_response()
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        return response
+
+    from fleet_collector import collect_fleet, EXPORT_EXTENSIONS
+
+    # I'm taking host names from a JSON body or form fields, and exported logs as eventLog files
+    payload = request.get_json(silent=True) or {}
+    hosts = payload.get('hosts') or request.form.getlist('host')
+    exports = [f for f in request.files.getlist('eventLog') if f.filename]
+
+    if not isinstance(hosts, list) or not all(isinstance(host, str) and host.strip() for host in hosts):
+        return jsonify({"error": "hosts must be a list of host names"}), 400
+    if not hosts and not exports:
+        return jsonify({"error": "No hosts or event log exports provided"}), 400
+    if len(hosts) + len(exports) > FLEET_MAX_TARGETS:
+        return jsonify({"error": f"A fleet scan may cover at most {FLEET_MAX_TARGETS} targets"}), 413
+    for export in exports:
+        if os.path.splitext(export.filename)[1].lower() not in EXPORT_EXTENSIONS:
+            return jsonify({"error": f"Unsupported event log export: {export.filename}. Use .json or .evtx"}), 400
+
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    fleet_dir = tempfile.mkdtemp(prefix='fleet-', dir=UPLOAD_FOLDER)
+    remove_fleet_dir = lambda: shutil.rmtree(fleet_dir, ignore_errors=True)
+    try:
+        # I'm labelling each target by what the client sent, numbering repeats so every label is unique
+        targets = []
+        labels = Counter()
+
+        def label_for(name):
+            labels[name] += 1
+            return name if labels[name] == 1 else f"{name} ({labels[name]})"
+
+        for host in hosts:
+            targets.append((label_for(host.strip()), host.strip()))
+        for number, export in enumerate(exports, 1):
+            export_path = os.path.join(fleet_dir, f"{number}{os.path.splitext(export.filename)[1].lower()}")
+            save_upload(export.stream, export_path)
+            targets.append((label_for(export.filename), export_path))
+    except BaseException:
+        remove_fleet_dir()
+        raise
+
+    # A read I stopped waiting for may still be going, so the exports are removed once the last one stops
+    fleet = collect_fleet(
+        targets,
+        code_index=knowledge_base.snapshot.index,
+        timeout=FLEET_HOST_TIMEOUT,
+        max_workers=FLEET_WORKERS,
+        cleanup=remove_fleet_dir
+    )
+    record_history(crash_history.record_events, fleet["crashes"])
+
+    results = {
+        "success": True,
+        "events_found": len(fleet["crashes"]),
+        "crashes": fleet["crashes"],
+        "hosts": fleet["hosts"],
+        "date_analyzed": time.time()
+    }
+    if not fleet["crashes"]:
+        results["message"] = "No BSOD crashes found on the requested hosts."
+    return jsonify(results)
+
 # Run app
 if __name__ == '__main__':
     # I'm checking whether I should run in development or production mode
     debug_mode = os.environ.get('FLASK_ENV') == 'development'
     port = int(os.environ.get('PORT', 5000))
     print(f"→  Serving on http://0.0.0.0:{port} (Debug: {debug_mode})")
+    init_app()
     app.run(debug=debug_mode, port=port, host='0.0.0.0')
\ No newline at end of file
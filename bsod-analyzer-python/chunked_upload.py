@@ -0,0 +1,352 @@
+"""
+chunked_upload.py - I created this module so huge kernel dumps can be uploaded in parts,
+resumed after a dropped connection, and analyzed from their headers before the last part arrives
+"""
+import os
+import errno
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import tempfile
+import threading
+from bisect import bisect_right
+
+from minidump_parser import STOP_CODES, parse_dump_structure, has_dump_signature
+
+# I'm reading and hashing parts in pieces this size, so a part never sits in memory whole
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """I raise this for a request that doesn't fit its upload; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def add_range(ranges, start, end):
+    """
+    I merge [start, end) into a sorted list of disjoint [start, end) ranges and return the new list
+    """
+    merged = []
+    for range_start, range_end in ranges:
+        if range_end < start or range_start > end:
+            merged.append([range_start, range_end])
+        else:
+            start, end = min(start, range_start), max(end, range_end)
+    merged.append([start, end])
+    merged.sort()
+    return merged
+
+
+def covers(ranges, start, end):
+    """
+    I check whether one received range holds all of [start, end)
+    """
+    position = bisect_right([range_start for range_start, _ in ranges], start) - 1
+    return position >= 0 and ranges[position][1] >= end
+
+
+def missing_ranges(ranges, size):
+    """
+    I return the [start, end) gaps a client still has to send
+    """
+    gaps, position = [], 0
+    for start, end in ranges:
+        if start > position:
+            gaps.append([position, start])
+        position = max(position, end)
+    if position < size:
+        gaps.append([position, size])
+    return gaps
+
+
+def preallocate(file, size):
+    """
+    I size a new file to its final length, reserving real blocks where the OS lets me,
+    so a full disk fails the upload now rather than 3 GB in
+    """
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(file.fileno(), 0, size)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+    file.truncate(size)
+
+
+class ReceivedView:
+    """
+    I look like a read-only buffer over an upload in progress, but only hand out bytes that have arrived.
+    A read that touches a missing byte comes back short, which the parser already treats as "not there".
+    """
+
+    def __init__(self, file, size, ranges):
+        self._file = file
+        self._size = size
+        self._ranges = ranges
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError("I only support slices")
+        start, stop, step = key.indices(self._size)
+        if step != 1 or stop <= start or not covers(self._ranges, start, stop):
+            return b""
+        self._file.seek(start)
+        return self._file.read(stop - start)
+
+
+def peek_bugcheck(file, size, ranges):
+    """
+    I try to read the bug check from whatever parts of a dump have arrived, returning None until I can
+    """
+    structure = parse_dump_structure(ReceivedView(file, size, ranges))
+    bugcheck = structure and structure["bugcheck"]
+    if not bugcheck:
+        return None
+    hex_code = f"0x{bugcheck['code']:08X}"
+    return {
+        "code": STOP_CODES.get(bugcheck["code"], hex_code),
+        "hexCode": hex_code,
+        "parameters": [f"0x{p:016X}" for p in bugcheck["parameters"]],
+        "format": structure["format"]
+    }
+
+
+class UploadSession:
+    def __init__(self, state, directory):
+        self.state = state  # everything I persist: id, filename, size, created, ranges, parts, early
+        self.data_path = os.path.join(directory, f"{state['id']}.part")
+        self.state_path = os.path.join(directory, f"{state['id']}.json")
+        self.lock = threading.Lock()
+        # I hash the contiguous prefix as it grows, so completing a 4 GB upload doesn't mean reading it all again.
+        # The hash can't be saved, so after a restart I start it over from the first byte.
+        self._hasher = hashlib.blake2b(digest_size=32)
+        self._hashed = 0
+
+    def save(self):
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(temp_path, self.state_path)
+
+    def received(self):
+        return sum(end - start for start, end in self.state["ranges"])
+
+    def hash_through(self, file, end):
+        # I feed the hasher every byte from where it stopped up to end, which must already be on disk
+        file.seek(self._hashed)
+        while self._hashed < end:
+            chunk = file.read(min(COPY_CHUNK_SIZE, end - self._hashed))
+            if not chunk:
+                raise UploadError("Upload data is shorter than expected", 500)
+            self._hasher.update(chunk)
+            self._hashed += len(chunk)
+
+    def contiguous_end(self):
+        ranges = self.state["ranges"]
+        return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+    def status(self):
+        return {
+            "uploadId": self.state["id"],
+            "filename": self.state["filename"],
+            "size": self.state["size"],
+            "received": self.received(),
+            "missing": missing_ranges(self.state["ranges"], self.state["size"]),
+            "parts": len(self.state["parts"]),
+            "earlyResult": self.state["early"]
+        }
+
+
+class ChunkedUploads:
+    def __init__(self, directory, max_size=64 * 1024 ** 3, max_part_size=64 * 1024 ** 2, ttl=24 * 60 * 60):
+        """
+        I keep upload sessions under directory: a preallocated .part file plus a small JSON state file each,
+        so an interrupted upload can resume even after a restart. Idle sessions expire after ttl seconds.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.max_part_size = max_part_size
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _session(self, upload_id):
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                # Sessions left by an earlier run are picked up the first time a client asks for them
+                state_path = os.path.join(self.directory, f"{upload_id}.json")
+                if not upload_id.isalnum() or not os.path.exists(state_path):
+                    raise UploadError("Unknown or expired upload", 404)
+                with open(state_path, 'r') as f:
+                    session = UploadSession(json.load(f), self.directory)
+                self._sessions[upload_id] = session
+            return session
+
+    def create(self, filename, size):
+        """
+        I start a session for a dump of size bytes, reserving its disk space up front
+        """
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError("size must be a positive number of bytes")
+        if size > self.max_size:
+            raise UploadError(f"Uploads may be at most {self.max_size} bytes", 413)
+        self.prune()
+
+        upload_id = uuid.uuid4().hex
+        session = UploadSession({
+            "id": upload_id,
+            "filename": os.path.basename(filename or "upload.dmp"),
+            "size": size,
+            "created": time.time(),
+            "updated": time.time(),
+            "ranges": [],
+            "parts": {},
+            "early": None
+        }, self.directory)
+        try:
+            with open(session.data_path, 'wb') as f:
+                preallocate(f, size)
+            session.save()
+        except OSError as e:
+            self._remove_files(session)
+            raise UploadError(f"Could not reserve space for the upload: {e}", 507)
+
+        with self._lock:
+            self._sessions[upload_id] = session
+        return session.status()
+
+    def write_part(self, upload_id, offset, stream, length, sha256=None):
+        """
+        I write length bytes from stream at offset into the preallocated file.
+        When sha256 is given, the part is staged and only written into the upload once it matches.
+        A part whose bytes have all been received already is left alone, and
+        a first part that doesn't start with a dump signature ends the session.
+        """
+        session = self._session(upload_id)
+        size = session.state["size"]
+        if not isinstance(offset, int) or offset < 0 or length is None or length <= 0:
+            raise UploadError("A part needs a non-negative offset and a Content-Length")
+        if length > self.max_part_size:
+            raise UploadError(f"Parts may be at most {self.max_part_size} bytes", 413)
+        if offset + length > size:
+            raise UploadError(f"Part ends at {offset + length}, past the upload's {size} bytes", 416)
+        with session.lock:
+            if covers(session.state["ranges"], offset, offset + length):
+                # A client resending a part it never heard back about gets the status; the bytes I hold stay put
+                return session.status()
+
+        checksum = hashlib.sha256()
+        written = 0
+        # A part with a checksum goes to a staging file first, so a resend that got corrupted
+        # on the way can't overwrite bytes that arrived intact
+        staged = tempfile.TemporaryFile(dir=self.directory) if sha256 else None
+        try:
+            # Parts of one session may arrive in parallel; each writes its own range through its own handle
+            with open(session.data_path, 'r+b') as f:
+                f.seek(offset)
+                target = staged or f
+                while written < length:
+                    chunk = stream.read(min(COPY_CHUNK_SIZE, length - written))
+                    if not chunk:
+                        break
+                    if offset == 0 and written == 0 and not has_dump_signature(chunk):
+                        # The first part decides whether this is a dump at all; if not, the session is no use to anyone
+                        f.close()
+                        self.abort(upload_id)
+                        raise UploadError("The upload is not a Windows minidump or kernel dump", 415)
+                    checksum.update(chunk)
+                    target.write(chunk)
+                    written += len(chunk)
+                if written != length:
+                    raise UploadError(f"Part was cut off after {written} of {length} bytes")
+                if sha256 and checksum.hexdigest() != sha256.strip().lower():
+                    raise UploadError("Part checksum does not match, please send it again", 422)
+                if staged:
+                    staged.seek(0)
+                    shutil.copyfileobj(staged, f, COPY_CHUNK_SIZE)
+        finally:
+            if staged:
+                staged.close()
+
+        with session.lock:
+            state = session.state
+            state["ranges"] = add_range(state["ranges"], offset, offset + length)
+            state["parts"][str(offset)] = {"length": length, "sha256": checksum.hexdigest()}
+            state["updated"] = time.time()
+            with open(session.data_path, 'rb') as f:
+                session.hash_through(f, session.contiguous_end())
+                if state["early"] is None:
+                    state["early"] = peek_bugcheck(f, size, state["ranges"])
+            session.save()
+            return session.status()
+
+    def status(self, upload_id):
+        session = self._session(upload_id)
+        with session.lock:
+            return session.status()
+
+    def complete(self, upload_id):
+        """
+        I finish an upload once every byte has arrived and return (data path, blake2b digest, status).
+        The data file becomes the caller's to analyze and delete.
+        """
+        session = self._session(upload_id)
+        with session.lock:
+            missing = missing_ranges(session.state["ranges"], session.state["size"])
+            if missing:
+                raise UploadError(f"Upload is missing {len(missing)} range(s), first at byte {missing[0][0]}", 409)
+            with open(session.data_path, 'rb') as f:
+                session.hash_through(f, session.state["size"])
+            status = session.status()
+            digest = session._hasher.hexdigest()
+            with self._lock:
+                self._sessions.pop(upload_id, None)
+            try:
+                os.remove(session.state_path)
+            except OSError:
+                pass
+        return session.data_path, digest, status
+
+    def abort(self, upload_id):
+        session = self._session(upload_id)
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+        with session.lock:
+            self._remove_files(session)
+
+    def _remove_files(self, session):
+        for path in (session.data_path, session.state_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def prune(self):
+        """
+        I delete sessions nobody has touched for ttl seconds
+        """
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-5]
+            try:
+                with open(os.path.join(self.directory, name), 'r') as f:
+                    updated = json.load(f).get("updated", 0)
+            except (OSError, ValueError):
+                continue
+            if updated < cutoff:
+                with self._lock:
+                    self._sessions.pop(upload_id, None)
+                self._remove_files(UploadSession({"id": upload_id}, self.directory))
@@ -0,0 +1,52 @@
+"""
+content_encoding.py - I created this module to compress response bodies once, up front,
+and serve whichever coding the client accepts with a strong ETag
+"""
+import gzip
+import hashlib
+from collections import namedtuple
+from werkzeug.wrappers import Response
+
+# I'm also precompressing with brotli; it's in requirements.txt, but without it I still serve gzip
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# A response body encoded once: identity bytes, {content coding: bytes}, its ETag and its type
+PreparedBody = namedtuple("PreparedBody", "data encoded etag mimetype")
+
+# The codings I offer, best first
+CODINGS = ("br", "gzip")
+
+
+def prepare(data, mimetype):
+    """
+    I compress data in every coding I support and tag it with a content hash
+    """
+    encoded = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        encoded["br"] = brotli.compress(data)
+    # I only keep codings that actually make the body smaller
+    encoded = {coding: body for coding, body in encoded.items() if len(body) < len(data)}
+    return PreparedBody(data, encoded, hashlib.blake2b(data, digest_size=16).hexdigest(), mimetype)
+
+
+def negotiated_response(request, body, max_age, immutable=False):
+    """
+    I answer with body in the best coding the request accepts, cacheable for max_age seconds,
+    and turn GET requests whose If-None-Match already matches into a 304
+    """
+    coding = next((c for c in CODINGS if c in body.encoded and request.accept_encodings[c]), None)
+    response = Response(body.encoded[coding] if coding else body.data, mimetype=body.mimetype)
+    # Each coding is its own representation, so each gets its own strong ETag
+    response.set_etag(f"{body.etag}-{coding}" if coding else body.etag)
+    if coding:
+        response.headers['Content-Encoding'] = coding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response.make_conditional(request)
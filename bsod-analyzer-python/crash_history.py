@@ -0,0 +1,218 @@
+"""
+crash_history.py - I created this module to keep every crash I've analyzed or scanned, so I can query the history later
+"""
+import os
+import time
+import struct
+import sqlite3
+import hashlib
+import datetime
+import threading
+
+# I store stop codes, hosts and drivers once each and refer to them by number from every crash row
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stop_codes (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS hosts (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS drivers (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS crashes (
+    id INTEGER PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    stop_code_id INTEGER NOT NULL REFERENCES stop_codes(id),
+    host_id INTEGER REFERENCES hosts(id),
+    driver_id INTEGER REFERENCES drivers(id),
+    source INTEGER NOT NULL,
+    parameters BLOB,
+    hash BLOB NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS crashes_by_time ON crashes (timestamp);
+CREATE INDEX IF NOT EXISTS crashes_by_stop_code ON crashes (stop_code_id, timestamp);
+"""
+
+# I keep where a crash came from as a small number
+SOURCES = ("dump", "event")
+
+
+def pack_parameters(parameters):
+    """
+    I pack hex parameter strings as 64-bit integers, skipping anything that isn't a number
+    """
+    values = []
+    for parameter in parameters or []:
+        try:
+            values.append(int(parameter, 16) if isinstance(parameter, str) else int(parameter))
+        except ValueError:
+            continue
+    return struct.pack(f"<{len(values)}Q", *(v & 0xFFFFFFFFFFFFFFFF for v in values)) if values else None
+
+
+def unpack_parameters(blob):
+    if not blob:
+        return []
+    return [f"0x{value:016X}" for value in struct.unpack(f"<{len(blob) // 8}Q", blob)]
+
+
+def parse_time(value):
+    """
+    I accept unix seconds or an ISO date like 2025-05-03 or 2025-05-03T11:02:47 and return unix seconds
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) or str(value).lstrip("-").isdigit():
+        return int(value)
+    return int(time.mktime(datetime.datetime.fromisoformat(str(value)).timetuple()))
+
+
+def time_range(start, end):
+    """
+    I build the SQL conditions for start <= timestamp < end, so they can use my time index
+    """
+    conditions, arguments = [], []
+    if start is not None:
+        conditions.append("c.timestamp >= ?")
+        arguments.append(start)
+    if end is not None:
+        conditions.append("c.timestamp < ?")
+        arguments.append(end)
+    return conditions, arguments
+
+
+class CrashHistory:
+    def __init__(self, path):
+        """
+        I open (or create) my SQLite history at path. One connection is shared behind a lock.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._names = {"stop_codes": {}, "hosts": {}, "drivers": {}}  # table -> name -> id, so I rarely ask SQLite
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def _intern(self, table, name):
+        # I turn a name into its row id, adding it the first time I see it (caller holds the lock)
+        if not name:
+            return None
+        ids = self._names[table]
+        if name not in ids:
+            self._db.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            ids[name] = self._db.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+        return ids[name]
+
+    def _add(self, rows):
+        # rows hold (timestamp, stop code, host, driver, source, parameters, hash); repeats of a hash are ignored
+        with self._lock:
+            try:
+                return self._insert(rows)
+            except Exception:
+                # A rolled back insert may have taken interned names with it, so I forget them all
+                self._names = {table: {} for table in self._names}
+                raise
+
+    def _insert(self, rows):
+        with self._db:
+            interned = [
+                (timestamp, self._intern("stop_codes", stop_code), self._intern("hosts", host),
+                 self._intern("drivers", driver), SOURCES.index(source), pack_parameters(parameters), digest)
+                for timestamp, stop_code, host, driver, source, parameters, digest in rows
+            ]
+            return self._db.executemany(
+                "INSERT OR IGNORE INTO crashes (timestamp, stop_code_id, host_id, driver_id, source, parameters, hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                interned
+            ).rowcount
+
+    def record_dump(self, digest, body, host=None, timestamp=None):
+        """
+        I remember one analyzed dump under its content digest, so the same dump is only stored once.
+        timestamp is when the crash happened, as the dump's header records it; without one I use the current time.
+        """
+        if not digest or not body.get("code"):
+            return 0
+        return self._add([(
+            int(timestamp if timestamp is not None else time.time()),
+            body["code"], host, body.get("driver"), "dump", body.get("parameters"), bytes.fromhex(digest)
+        )])
+
+    def record_events(self, crashes, host=None):
+        """
+        I remember Event Viewer crashes, keyed on host, event and date so rescans don't add them twice
+        """
+        rows = []
+        for crash in crashes:
+            try:
+                timestamp = parse_time(crash.get("date"))
+            except ValueError:
+                continue
+            crash_host = crash.get("host", host)
+            key = "|".join(str(part) for part in (
+                crash_host, crash.get("event_id"), crash.get("date"), crash.get("event_source")
+            ))
+            rows.append((
+                timestamp, crash.get("error_code") or "UNKNOWN_ERROR", crash_host, crash.get("driver"),
+                "event", crash.get("parameters"), hashlib.blake2b(key.encode(), digest_size=16).digest()
+            ))
+        return self._add(rows) if rows else 0
+
+    def query(self, start=None, end=None, stop_code=None, host=None, limit=100, before=None, source=None):
+        """
+        I return crashes newest first, filtered by time range, stop code, host and source ("dump" or "event").
+        Pass the (timestamp, id) of the last crash you got as before to read the next page.
+        """
+        conditions, arguments = time_range(start, end)
+        if stop_code:
+            conditions.append("s.name = ?")
+            arguments.append(stop_code.strip().upper())
+        if host:
+            conditions.append("h.name = ?")
+            arguments.append(host)
+        if source is not None:
+            conditions.append("c.source = ?")
+            arguments.append(SOURCES.index(source))
+        if before is not None:
+            conditions.append("(c.timestamp, c.id) < (?, ?)")
+            arguments.extend(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.id, c.timestamp, s.name, h.name, d.name, c.source, c.parameters, c.hash "
+                "FROM crashes c JOIN stop_codes s ON s.id = c.stop_code_id "
+                "LEFT JOIN hosts h ON h.id = c.host_id LEFT JOIN drivers d ON d.id = c.driver_id "
+                f"{where} ORDER BY c.timestamp DESC, c.id DESC LIMIT ?",
+                arguments + [limit]
+            ).fetchall()
+
+        return [{
+            "id": crash_id,
+            "timestamp": timestamp,
+            "date": datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            "stopCode": stop_code_name,
+            "host": host_name,
+            "driver": driver,
+            "source": SOURCES[source],
+            "parameters": unpack_parameters(parameters),
+            "hash": digest.hex()
+        } for crash_id, timestamp, stop_code_name, host_name, driver, source, parameters, digest in rows]
+
+    def stop_code_counts(self, start=None, end=None):
+        """
+        I count crashes per stop code in a time range, most frequent first
+        """
+        conditions, arguments = time_range(start, end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.name, COUNT(*) FROM crashes c JOIN stop_codes s ON s.id = c.stop_code_id "
+                f"{where} GROUP BY c.stop_code_id ORDER BY COUNT(*) DESC",
+                arguments
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
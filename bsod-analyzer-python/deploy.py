@@ -8,4 +8,5 @@ import app
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"I'm starting my BSOD Analyzer on http://0.0.0.0:{port}")
+    app.init_app()
     serve(app.app, host='0.0.0.0', port=port) 
\ No newline at end of file
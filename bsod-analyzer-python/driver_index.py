@@ -0,0 +1,98 @@
+"""
+driver_index.py - I created this module to name the driver a crash happened in without a debugger:
+a faulting address is looked up in the dump's module list, and driver names are kept once for every analysis
+"""
+import threading
+from bisect import bisect_right
+
+# For the stop codes whose parameters hold the address of the faulting instruction, which one it is (0-based)
+FAULT_ADDRESS_PARAMETER = {
+    0x0000000A: 3,  # IRQL_NOT_LESS_OR_EQUAL
+    0x000000D1: 3,  # DRIVER_IRQL_NOT_LESS_OR_EQUAL
+    0x0000001E: 1,  # KMODE_EXCEPTION_NOT_HANDLED
+    0x0000003B: 1,  # SYSTEM_SERVICE_EXCEPTION
+    0x00000050: 2,  # PAGE_FAULT_IN_NONPAGED_AREA
+    0x0000007E: 1,  # SYSTEM_THREAD_EXCEPTION_NOT_HANDLED
+    0x0000008E: 1,  # KERNEL_MODE_EXCEPTION_NOT_HANDLED
+}
+
+
+class ModuleRanges:
+    """
+    I hold a dump's modules sorted by base address, so finding the one that contains an address is a binary search
+    """
+
+    def __init__(self, modules):
+        self._modules = sorted((m for m in modules if m["size"]), key=lambda m: m["base"])
+        self._bases = [m["base"] for m in self._modules]
+
+    def __len__(self):
+        return len(self._modules)
+
+    def find(self, address):
+        """
+        I return the module whose [base, base + size) holds address, or None
+        """
+        position = bisect_right(self._bases, address) - 1
+        if position < 0:
+            return None
+        module = self._modules[position]
+        return module if address < module["base"] + module["size"] else None
+
+
+def fault_addresses(bugcheck):
+    """
+    I list the addresses worth attributing for a bug check, most telling first
+    """
+    addresses = []
+    if bugcheck.get("address"):
+        addresses.append(bugcheck["address"])
+    position = FAULT_ADDRESS_PARAMETER.get(bugcheck["code"])
+    parameters = bugcheck.get("parameters") or []
+    if position is not None and position < len(parameters) and parameters[position]:
+        addresses.append(parameters[position])
+    return addresses
+
+
+def attribute_driver(modules, bugcheck):
+    """
+    I return {name, path, address, offset, timestamp} for the module the crash happened in, or None
+    """
+    if not modules or not bugcheck:
+        return None
+    ranges = ModuleRanges(modules)
+    for address in fault_addresses(bugcheck):
+        module = ranges.find(address)
+        if module is not None:
+            return {
+                "name": module["name"],
+                "path": module["path"],
+                "address": address,
+                "offset": address - module["base"],
+                "timestamp": module["timestamp"]
+            }
+    return None
+
+
+class DriverIndex:
+    """
+    I keep one copy of every driver name I've attributed a crash to, keyed without case like Windows does,
+    so "NVLDDMKM.SYS" and "nvlddmkm.sys" from different dumps are reported and stored as the same driver
+    """
+
+    def __init__(self):
+        self._names = {}  # lower-cased name -> the spelling I saw first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, name):
+        """
+        I return the shared spelling of name
+        """
+        if not name:
+            return None
+        key = name.lower()
+        with self._lock:
+            return self._names.setdefault(key, name)
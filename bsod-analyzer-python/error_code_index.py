@@ -0,0 +1,286 @@
+"""
+error_code_index.py - I created this module to look up BSOD error codes without scanning my whole database
+"""
+import re
+import math
+import heapq
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain
+
+HEX_DIGITS = set("0123456789ABCDEF")
+WORD = re.compile(r"[A-Z0-9]+")
+
+# How much a fuzzy match on each field counts towards an entry's text score
+SEARCH_FIELD_WEIGHTS = {"description": 1.0, "commonCauses": 0.6, "causes": 0.6}
+NAME_WEIGHT = 0.7
+MIN_WORD_SIMILARITY = 0.5
+# Names sharing fewer than this share of the query's trigrams can't rank anywhere near the top
+MIN_NAME_OVERLAP = 0.3
+# Words found in more than this share of a large database are too common to tell entries apart
+MAX_WORD_SHARE = 0.2
+MIN_ENTRIES_FOR_STOP_WORDS = 50
+
+
+def normalize_hex(code):
+    """
+    I normalize a hex stop code so 0xA, 0x0000000A and 0X0A all compare equal
+    """
+    code = code.strip().upper()
+    if code.startswith("0X") and len(code) > 2 and all(c in HEX_DIGITS for c in code[2:]):
+        return "0X" + (code[2:].lstrip("0") or "0")
+    return code
+
+
+def normalize_name(code):
+    """
+    I normalize an error code name so spaces and underscores compare equal
+    """
+    return code.strip().upper().replace(" ", "_")
+
+
+class SubstringIndex:
+    """
+    I find the earliest key that contains a text, or is contained in it, without scanning every key
+    """
+
+    def __init__(self, keys):
+        # I'm remembering the first database position for every distinct key
+        self._positions = {}
+        for position, key in keys:
+            if key and key not in self._positions:
+                self._positions[key] = position
+
+        # I'm building a sorted suffix array so "key contains text" becomes a prefix search
+        suffixes = sorted(
+            (key[start:], position)
+            for key, position in self._positions.items()
+            for start in range(len(key))
+        )
+        self._suffix_texts = [suffix for suffix, _ in suffixes]
+        self._suffix_positions = [position for _, position in suffixes]
+
+        # I'm grouping key lengths so "text contains key" only probes lengths that exist
+        self._lengths = sorted({len(key) for key in self._positions})
+
+    def find_first(self, text):
+        """
+        I return the lowest position whose key overlaps the text, or None
+        """
+        if not text:
+            return None
+        best = None
+
+        # Keys that contain the text share it as a prefix of one of their suffixes
+        start = bisect_left(self._suffix_texts, text)
+        for i in range(start, len(self._suffix_texts)):
+            if not self._suffix_texts[i].startswith(text):
+                break
+            if best is None or self._suffix_positions[i] < best:
+                best = self._suffix_positions[i]
+
+        # Keys contained in the text are found by probing each window of a known length
+        for offset in range(len(text)):
+            for length in self._lengths:
+                if offset + length > len(text):
+                    break
+                position = self._positions.get(text[offset:offset + length])
+                if position is not None and (best is None or position < best):
+                    best = position
+
+        return best
+
+
+def words(text):
+    """
+    I split text into upper case words, so IRQL_NOT_LESS and "irql not less" split the same way
+    """
+    return WORD.findall(text.upper())
+
+
+def trigrams(word_list):
+    """
+    I return the padded trigrams of every word, the way pg_trgm does: "LESS" gives "  L", " LE", "LES", "ESS", "SS "
+    """
+    grams = set()
+    for word in word_list:
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def field_text(value):
+    # Causes can be plain strings or {"title", "description"} objects
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(field_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(field_text(v) for v in value)
+    return ""
+
+
+class FuzzyIndex:
+    """
+    I rank entries against a typo-ridden query using trigram postings built once, so a search
+    only touches entries that share a trigram with the query
+    """
+
+    def __init__(self, entries):
+        self._count = len(entries)
+
+        # Code names: trigram -> positions, plus each name's trigram count for the Dice similarity
+        self._name_postings = defaultdict(list)
+        self._name_sizes = []
+        for position, entry in enumerate(entries):
+            grams = trigrams(words(entry.get("code", "")))
+            self._name_sizes.append(len(grams))
+            for gram in grams:
+                self._name_postings[gram].append(position)
+
+        # Free text: word -> {position: best field weight}, and a trigram index over that vocabulary
+        word_postings = defaultdict(dict)
+        for position, entry in enumerate(entries):
+            for field, weight in SEARCH_FIELD_WEIGHTS.items():
+                for word in words(field_text(entry.get(field))):
+                    if len(word) >= 3 and word_postings[word].get(position, 0) < weight:
+                        word_postings[word][position] = weight
+        if self._count >= MIN_ENTRIES_FOR_STOP_WORDS:
+            for word in [w for w, postings in word_postings.items() if len(postings) > MAX_WORD_SHARE * self._count]:
+                del word_postings[word]
+        self._vocabulary = list(word_postings)
+        self._word_postings = [word_postings[word] for word in self._vocabulary]
+        self._word_sizes = []
+        self._vocabulary_postings = defaultdict(list)
+        for word_id, word in enumerate(self._vocabulary):
+            grams = trigrams([word])
+            self._word_sizes.append(len(grams))
+            for gram in grams:
+                self._vocabulary_postings[gram].append(word_id)
+        # Rare words say more about an entry than words every entry uses
+        self._word_idf = [
+            math.log((self._count + 1) / (len(postings) + 0.5)) / math.log((self._count + 1) / 0.5)
+            for postings in self._word_postings
+        ]
+
+    def _name_scores(self, query_words):
+        grams = trigrams(query_words)
+        # Counter does the counting in C, which matters when common trigrams have long postings
+        shared = Counter(chain.from_iterable(self._name_postings.get(gram, ()) for gram in grams))
+        minimum = MIN_NAME_OVERLAP * len(grams)
+        return {
+            position: 2 * count / (len(grams) + self._name_sizes[position])
+            for position, count in shared.items()
+            if count >= minimum
+        }
+
+    def _text_scores(self, query_words):
+        scores = defaultdict(float)
+        query_words = [word for word in query_words if len(word) >= 3]
+        for word in query_words:
+            # I'm finding vocabulary words that look like this query word, typos included
+            grams = trigrams([word])
+            shared = Counter(chain.from_iterable(self._vocabulary_postings.get(gram, ()) for gram in grams))
+
+            best = {}
+            for word_id, count in shared.items():
+                similarity = 2 * count / (len(grams) + self._word_sizes[word_id])
+                if similarity < MIN_WORD_SIMILARITY:
+                    continue
+                weight = similarity * self._word_idf[word_id]
+                for position, field_weight in self._word_postings[word_id].items():
+                    if best.get(position, 0) < weight * field_weight:
+                        best[position] = weight * field_weight
+            for position, score in best.items():
+                scores[position] += score / len(query_words)
+        return scores
+
+    def search(self, query, limit=10):
+        """
+        I return up to limit (score, position) pairs, best first, with scores between 0 and 1
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        name_scores = self._name_scores(query_words)
+        text_scores = self._text_scores(query_words)
+
+        ranked = (
+            (NAME_WEIGHT * name_scores.get(position, 0.0) + (1 - NAME_WEIGHT) * text_scores.get(position, 0.0), -position)
+            for position in name_scores.keys() | text_scores.keys()
+        )
+        # Ties go to the earlier entry, so results follow database order
+        return [(score, -negated) for score, negated in heapq.nlargest(limit, ranked)]
+
+
+class ErrorCodeIndex:
+    """
+    I build every lookup structure for my error codes database once, at load time
+    """
+
+    def __init__(self, error_codes_data):
+        self.entries = list((error_codes_data or {}).get("errorCodes", []))
+        self._by_name = {}
+        self._by_hex = {}
+
+        for entry in self.entries:
+            # I keep the first entry for each key so lookups match database order
+            self._by_name.setdefault(normalize_name(entry["code"]), entry)
+
+            error_hex = (entry.get("hexCode") or "").upper()
+            if error_hex.startswith("0X"):
+                self._by_hex.setdefault(error_hex, entry)
+                db_normalized = "0X" + (error_hex[2:].lstrip("0") or "0")
+                self._by_hex.setdefault(db_normalized, entry)
+
+        self._name_partials = SubstringIndex(
+            (position, normalize_name(entry["code"]))
+            for position, entry in enumerate(self.entries)
+        )
+        self._hex_partials = SubstringIndex(
+            (position, entry["hexCode"].upper())
+            for position, entry in enumerate(self.entries)
+            if entry.get("hexCode")
+        )
+        self._fuzzy = FuzzyIndex(self.entries)
+
+    def by_name(self, code):
+        """
+        I return the entry with exactly this name, or None
+        """
+        return self._by_name.get(normalize_name(code))
+
+    def by_hex(self, code):
+        """
+        I return the entry with exactly this hex code in any format, or None
+        """
+        return self._by_hex.get(normalize_hex(code)) or self._by_hex.get(code.strip().upper())
+
+    def lookup(self, code):
+        """
+        I resolve a user supplied code the same way my analyze-code endpoint always has:
+        exact name, exact hex, partial name and finally partial hex
+        """
+        exact = self.by_name(code) or self.by_hex(code)
+        if exact:
+            return exact
+
+        position = self._name_partials.find_first(normalize_name(code))
+        if position is None:
+            position = self._hex_partials.find_first(normalize_hex(code))
+        if position is not None:
+            return self.entries[position]
+
+        return None
+
+    def search(self, query, limit=10):
+        """
+        I rank entries by how well their name, description and causes match a loosely typed query.
+        A hex code that matches exactly always comes first with a score of 1.
+        """
+        exact = self.by_hex(query) if normalize_hex(query).startswith("0X") else None
+        results = [(1.0, exact)] if exact else []
+        for score, position in self._fuzzy.search(query, limit):
+            if self.entries[position] is not exact:
+                results.append((score, self.entries[position]))
+        return results[:limit]
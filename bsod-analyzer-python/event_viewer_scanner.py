@@ -9,69 +9,157 @@ import traceback
 import platform
 import sys
 import re
+import json
 import datetime
+import threading
+import xml.etree.ElementTree as ET
+from itertools import islice
 
-# I'm checking for required modules
-try:
-    import pythoncom
-    PYTHONCOM_AVAILABLE = True
-except ImportError:
-    PYTHONCOM_AVAILABLE = False
-    print("Warning: pythoncom not available. Try installing pywin32.")
-
-# I'm adding Python Scripts paths to help find pywin32
-python_paths = [
-    os.path.join(sys.prefix, 'Scripts'),
-    os.path.expandvars('%APPDATA%\\Python\\Python312\\Scripts'),
-    os.path.expandvars('%APPDATA%\\Python\\Python310\\Scripts')
-]
+from error_code_index import ErrorCodeIndex
+from metrics import stage
 
-for path in python_paths:
-    if os.path.exists(path) and path not in sys.path:
-        sys.path.append(path)
-
-# I'm checking if I'm on Windows and if win32evtlog is available
+# I only import pywin32 the first time a scan needs it (see load_pywin32), so importing me stays cheap
+# and a server that never scans this machine never pays for it
+pythoncom = win32evtlog = win32con = win32evtlogutil = win32com = None
+PYTHONCOM_AVAILABLE = False
 EVENT_VIEWER_AVAILABLE = False
-try:
-    if platform.system() == "Windows":
-        import win32evtlog
-        import win32con
-        import win32evtlogutil
-        import win32com.client
-        EVENT_VIEWER_AVAILABLE = True
-except ImportError as e:
-    print(f"Event Viewer access not available: {e}")
+_pywin32_loaded = False
+_pywin32_lock = threading.Lock()
+
+def add_pywin32_paths():
+    """
+    I add the places pywin32 tends to hide to sys.path, once, before importing it
+    """
+    python_paths = [
+        os.path.join(sys.prefix, 'Scripts'),
+        os.path.expandvars('%APPDATA%\\Python\\Python312\\Scripts'),
+        os.path.expandvars('%APPDATA%\\Python\\Python310\\Scripts')
+    ]
     try:
-        # I'm trying to find the pywin32 modules in site-packages
         import site
-        site_packages = site.getsitepackages()
-        for site_pkg in site_packages:
-            pywin32_path = os.path.join(site_pkg, 'win32')
-            if os.path.exists(pywin32_path) and pywin32_path not in sys.path:
-                sys.path.append(pywin32_path)
+        python_paths.extend(os.path.join(site_pkg, 'win32') for site_pkg in site.getsitepackages())
     except Exception:
         pass
+    for path in python_paths:
+        if os.path.exists(path) and path not in sys.path:
+            sys.path.append(path)
 
-def scan_event_viewer(max_events=5000, error_codes_data=None):
+def load_pywin32():
+    """
+    I import pywin32 the first time I'm called and return whether the Event Viewer can be read.
+    Later calls just return what the first one found.
+    """
+    global pythoncom, win32evtlog, win32con, win32evtlogutil, win32com
+    global PYTHONCOM_AVAILABLE, EVENT_VIEWER_AVAILABLE, _pywin32_loaded
+    if _pywin32_loaded:
+        return EVENT_VIEWER_AVAILABLE
+
+    with _pywin32_lock:
+        if _pywin32_loaded:
+            return EVENT_VIEWER_AVAILABLE
+        if platform.system() == "Windows":
+            add_pywin32_paths()
+            try:
+                import pythoncom
+                PYTHONCOM_AVAILABLE = True
+            except ImportError:
+                print("Warning: pythoncom not available. Try installing pywin32.")
+            try:
+                import win32evtlog
+                import win32con
+                import win32evtlogutil
+                import win32com.client
+                EVENT_VIEWER_AVAILABLE = True
+            except ImportError as e:
+                print(f"Event Viewer access not available: {e}")
+        _pywin32_loaded = True
+    return EVENT_VIEWER_AVAILABLE
+
+# I'm reading exported .evtx files off Windows with python-evtx when it's installed
+try:
+    from Evtx.Evtx import Evtx
+    EVTX_AVAILABLE = True
+except ImportError:
+    EVTX_AVAILABLE = False
+
+EVTX_NAMESPACE = {"e": "http://schemas.microsoft.com/win/2004/08/events/event"}
+
+# I'm compiling my crash text patterns once: hex codes, "bugcheck was:" codes and dump paths in one alternation.
+# The last two only consume their prefix so a hex code inside them is still found on its own.
+CRASH_TEXT_PATTERN = re.compile(
+    r'(?P<hex>0x[0-9A-Fa-f]{8,10})'
+    r'|(?i:bugcheck\s+was:\s+)(?=(?P<bugcheck>[0-9A-Fa-fxX]+))'
+    r'|(?=(?P<dump>C:\\.*\.dmp))C:'
+)
+BUGCHECK_TEXT = re.compile('bugcheck', re.IGNORECASE)
+
+def scan_crash_text(text):
+    """
+    I find the hex codes, "bugcheck was:" codes and first dump file path in a single pass over the text
+    
+    Returns:
+        Tuple of (hex codes, bugcheck codes, dump file path or "")
+    """
+    hex_codes = []
+    bugcheck_codes = []
+    dump_file = ""
+    for match in CRASH_TEXT_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "hex":
+            hex_codes.append(match.group("hex"))
+        elif kind == "bugcheck":
+            bugcheck_codes.append(match.group("bugcheck").lower())
+        elif not dump_file:
+            dump_file = match.group("dump")
+    return hex_codes, bugcheck_codes, dump_file
+
+def scan_event_viewer(max_events=5000, error_codes_data=None, code_index=None):
     """
     I scan the Windows Event Viewer for blue screen events.
     
     Args:
         max_events: Maximum number of events to scan
         error_codes_data: Dictionary containing error codes database
+        code_index: Prebuilt ErrorCodeIndex; I only index error_codes_data myself when it's missing
         
     Returns:
         List of dictionaries containing crash information
     """
-    crash_events = []
+    crash_events = list(iter_event_viewer_crashes(max_events, error_codes_data, code_index))
+    
+    # Sort crash events by date (newest first)
+    crash_events.sort(key=lambda x: x.get("date", ""), reverse=True)
+    return crash_events
+
+def iter_event_viewer_crashes(max_events=5000, error_codes_data=None, code_index=None):
+    """
+    I scan the Windows Event Viewer for blue screen events and yield each crash as soon as I find it,
+    so callers can stream results without waiting for the whole scan. Crashes come in log order.
+    
+    Args:
+        max_events: Maximum number of events to scan
+        error_codes_data: Dictionary containing error codes database
+        code_index: Prebuilt ErrorCodeIndex; I only index error_codes_data myself when it's missing
+        
+    Yields:
+        Dictionaries containing crash information
+    """
+    seen = set()
+    
+    # Every event in this scan shares one lookup index, the knowledge base's own when I'm given it
+    if code_index is None:
+        code_index = ErrorCodeIndex(error_codes_data)
+    
+    load_pywin32()
     
     # I need to initialize COM
     pythoncom_initialized = False
     try:
-        pythoncom.CoInitialize()
-        pythoncom_initialized = True
-    except ImportError:
-        print("Warning: pythoncom not available - COM initialization skipped")
+        if PYTHONCOM_AVAILABLE:
+            pythoncom.CoInitialize()
+            pythoncom_initialized = True
+        else:
+            print("Warning: pythoncom not available - COM initialization skipped")
     except Exception as com_error:
         print(f"Error initializing COM: {str(com_error)}")
     
@@ -79,7 +167,7 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
         # I'm verifying I'm on a Windows system
         if not platform.system() == "Windows":
             print("This function only works on Windows")
-            return []
+            return
             
         # I'm importing required modules
         try:
@@ -87,7 +175,7 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
             import win32evtlog
         except ImportError as e:
             print(f"Required modules not available: {e}")
-            return []
+            return
         
         # I'm connecting to WMI
         wmi = None
@@ -101,7 +189,7 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
                 from win32com.client import Dispatch
                 wmi = Dispatch("WbemScripting.SWbemLocator").ConnectServer(".", "root\\cimv2")
             except Exception:
-                return []
+                return
         
         # I'm calculating a timestamp to filter for events in the last 7 days
         days_to_look_back = 7
@@ -115,19 +203,12 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
                         f"(SourceName = 'BugCheck' OR SourceName LIKE '%BugCheck%' OR Message LIKE '%bugcheck%') AND "
                         f"TimeGenerated >= '{wmi_date}'")
                 
-                events = wmi.ExecQuery(query)
+                with stage("wmi_query"):
+                    events = wmi.ExecQuery(query)
                 
                 # I'm processing BugCheck events
-                processed = 0
-                for event in events:
-                    if processed >= max_events:
-                        break
-                        
-                    crash_info = extract_crash_info_from_event(event, error_codes_data, 'wmi')
-                    if crash_info:
-                        crash_events.append(crash_info)
-                        
-                    processed += 1
+                yield from iter_new_crashes(islice(events, max_events), error_codes_data, 'wmi',
+                                            seen, code_index)
             except Exception as e:
                 print(f"Error querying for BugCheck events: {str(e)}")
         
@@ -151,42 +232,38 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
                     pass
                 
                 events_to_scan = min(500, total_in_log)
-                events_read = 0
                 batch_size = 100
                 
-                while events_read < events_to_scan:
-                    try:
-                        events = win32evtlog.ReadEventLog(handle, flags, 0, batch_size)
-                        if not events:
-                            break
-                    except Exception:
-                        break
-                    
-                    for event in events:
-                        events_read += 1
-                        
-                        # I'm filtering by timestamp
+                def recent_bugcheck_events():
+                    events_read = 0
+                    while events_read < events_to_scan:
                         try:
-                            event_time = event.TimeGenerated
-                            event_unix_time = time.mktime(event_time.timetuple())
-                            if event_unix_time < cutoff_date:
-                                continue
+                            with stage("event_log_read"):
+                                events = win32evtlog.ReadEventLog(handle, flags, 0, batch_size)
+                            if not events:
+                                break
                         except Exception:
-                            pass
-                        
-                        # I'm processing BugCheck events
-                        if 'BugCheck' in event.SourceName:
-                            crash_info = extract_crash_info_from_event(event, error_codes_data, 'evtlog')
-                            if crash_info:
-                                # I'm checking for duplicates before adding
-                                if not any(existing.get("event_id") == crash_info.get("event_id") and 
-                                         existing.get("date") == crash_info.get("date") 
-                                         for existing in crash_events):
-                                    crash_events.append(crash_info)
+                            break
                         
-                    # I'll stop if I've processed enough events
-                    if events_read >= events_to_scan:
-                        break
+                        for event in events:
+                            events_read += 1
+                            
+                            # I'm filtering by timestamp
+                            try:
+                                event_time = event.TimeGenerated
+                                event_unix_time = time.mktime(event_time.timetuple())
+                                if event_unix_time < cutoff_date:
+                                    continue
+                            except Exception:
+                                pass
+                            
+                            # I'm only passing on BugCheck events
+                            if 'BugCheck' in event.SourceName:
+                                yield event
+                
+                # I'm skipping crashes the WMI query already found with a set lookup
+                yield from iter_new_crashes(recent_bugcheck_events(), error_codes_data, 'evtlog',
+                                            seen, code_index)
                 
                 # I'm closing the handle when I'm done
                 try:
@@ -204,15 +281,8 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
         except Exception:
             pass
         
-        # Sort crash events by date (newest first)
-        if crash_events:
-            crash_events.sort(key=lambda x: x.get("date", ""), reverse=True)
-        
-        return crash_events
-        
     except Exception as e:
         print(f"Error scanning Event Viewer: {str(e)}")
-        return []
     finally:
         if pythoncom_initialized:
             try:
@@ -220,7 +290,49 @@ def scan_event_viewer(max_events=5000, error_codes_data=None):
             except Exception:
                 pass
 
-def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
+def crash_key(crash_info):
+    """
+    I identify a crash by event ID, date and source, so duplicate checks are a set lookup
+    """
+    return (crash_info.get("event_id"), crash_info.get("date"), crash_info.get("event_source"))
+
+def merge_crash_events(events, error_codes_data, event_type, crash_events, seen, code_index=None):
+    """
+    I extract crash information from each event and append the crashes I haven't seen yet.
+    
+    Args:
+        events: Iterable of event log entries
+        error_codes_data: Dictionary containing error codes database
+        event_type: Type of event object ('wmi' or 'evtlog')
+        crash_events: List I append new crashes to
+        seen: Set of crash keys already in crash_events, which I keep up to date
+        code_index: ErrorCodeIndex shared across the scan
+        
+    Returns:
+        Number of crashes added
+    """
+    added = 0
+    for crash_info in iter_new_crashes(events, error_codes_data, event_type, seen, code_index):
+        crash_events.append(crash_info)
+        added += 1
+    return added
+
+def iter_new_crashes(events, error_codes_data, event_type, seen, code_index=None):
+    """
+    I extract crash information from each event and yield the crashes whose key isn't in seen yet
+    """
+    if code_index is None:
+        code_index = ErrorCodeIndex(error_codes_data)
+    
+    for event in events:
+        crash_info = extract_crash_info_from_event(event, error_codes_data, event_type, code_index)
+        if crash_info:
+            key = crash_key(crash_info)
+            if key not in seen:
+                seen.add(key)
+                yield crash_info
+
+def extract_crash_info_from_event(event, error_codes_data, event_type='wmi', code_index=None):
     """
     I extract crash information from an event log entry.
     
@@ -228,10 +340,14 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
         event: Event log entry
         error_codes_data: Dictionary containing error codes database
         event_type: Type of event object ('wmi' or 'evtlog')
+        code_index: ErrorCodeIndex to look codes up in; I build one if it's missing
         
     Returns:
         Dictionary with crash information or None if no crash info found
     """
+    if code_index is None:
+        code_index = ErrorCodeIndex(error_codes_data)
+    
     try:
         # I'm initializing my crash info dictionary
         crash_info = {
@@ -277,13 +393,20 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
             event_source = event.SourceName
             string_inserts = event.StringInserts or []
             
-            try:
-                event_message = win32evtlogutil.SafeFormatMessage(event, "System")
-            except:
-                event_message = str(string_inserts)
+            if getattr(event, 'Message', None):
+                # Recorded events already carry their formatted message
+                event_message = event.Message
+            elif "BugCheck" in event_source:
+                # I only pay for message formatting on BugCheck candidates, the inserts are enough for the rest
+                try:
+                    event_message = win32evtlogutil.SafeFormatMessage(event, "System")
+                except:
+                    event_message = str(string_inserts)
+            else:
+                event_message = ""
         
         # I'm checking if it's a BugCheck event
-        if "BugCheck" in event_source or "bugcheck" in str(event_message).lower():
+        if "BugCheck" in event_source or BUGCHECK_TEXT.search(str(event_message)):
             is_bugcheck = True
             
         # I'm adding event source and ID info
@@ -295,16 +418,11 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
         if event_message:
             combined_text += " " + str(event_message)
         
+        # I'm pulling hex codes (like 0x0000001E), "bugcheck was: 0x1e" codes and the dump path out in one pass
+        hex_codes, bugcheck_matches, dump_file = scan_crash_text(combined_text)
+        
         # I'm processing based on event type
         if is_bugcheck:
-            # I'm looking for hex codes (like 0x0000001E)
-            hex_pattern = r'0x[0-9A-Fa-f]{8,10}'
-            hex_codes = re.findall(hex_pattern, combined_text)
-            
-            # I'm also checking for "bugcheck was: 0x0000001e" pattern
-            bugcheck_pattern = r'bugcheck\s+was:\s+([0-9A-Fa-fx]+)'
-            bugcheck_matches = re.findall(bugcheck_pattern, combined_text.lower())
-            
             if bugcheck_matches and not hex_codes:
                 for match in bugcheck_matches:
                     if match.startswith('0x'):
@@ -319,31 +437,12 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
                 if len(hex_codes) > 1:
                     crash_info["parameters"] = hex_codes[1:]
                 
-                # I'm matching against my error codes database
-                found_match = False
-                
-                # I'm normalizing the stop code for better matching
-                normalized_stop_code = stop_code
-                if stop_code.startswith("0X"):
-                    normalized_stop_code = "0X" + stop_code[2:].lstrip("0")
-                    normalized_stop_code = "0X0" if normalized_stop_code == "0X" else normalized_stop_code
-                
-                if error_codes_data and "errorCodes" in error_codes_data:
-                    for error in error_codes_data["errorCodes"]:
-                        if error.get("hexCode"):
-                            # I'm normalizing the database hex code the same way
-                            db_hex_code = error["hexCode"].upper()
-                            normalized_db_hex = db_hex_code
-                            if db_hex_code.startswith("0X"):
-                                normalized_db_hex = "0X" + db_hex_code[2:].lstrip("0")
-                                normalized_db_hex = "0X0" if normalized_db_hex == "0X" else normalized_db_hex
-                            
-                            # I'm comparing normalized codes
-                            if normalized_stop_code == normalized_db_hex or stop_code == db_hex_code:
-                                crash_info["error_code"] = error.get("code", stop_code)
-                                crash_info["description"] = error.get("description", "Unknown Error")
-                                found_match = True
-                                break
+                # I'm matching against my error codes database by normalized hex code
+                error = code_index.by_hex(stop_code)
+                found_match = error is not None
+                if found_match:
+                    crash_info["error_code"] = error.get("code", stop_code)
+                    crash_info["description"] = error.get("description", "Unknown Error")
                     
                 # If I couldn't find a match, I'll use a generic format
                 if not found_match:
@@ -352,11 +451,9 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
                     crash_info["error_code"] = f"STOP 0x{short_code}"
                     crash_info["description"] = f"Blue Screen Error Code: {stop_code}"
                 
-                # I'm looking for any dump file paths
-                dump_pattern = r'(C:\\.*\.dmp)'
-                dump_matches = re.findall(dump_pattern, combined_text)
-                if dump_matches:
-                    crash_info["dump_file"] = dump_matches[0]
+                # I'm keeping the dump file path if the event mentions one
+                if dump_file:
+                    crash_info["dump_file"] = dump_file
             else:
                 # No hex codes found
                 crash_info["error_code"] = "BUGCHECK_EVENT"
@@ -377,20 +474,15 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
             crash_info["description"] = "The system has rebooted without cleanly shutting down first"
             
         else:
-            # I'm looking for hex codes in other events too
-            hex_pattern = r'0x[0-9A-Fa-f]{8}'
-            hex_codes = re.findall(hex_pattern, combined_text)
-            
+            # I'm using the first hex code in other events too, trimmed to 8 digits
             if hex_codes:
-                error_code = hex_codes[0].upper()
+                error_code = hex_codes[0][:10].upper()
                 crash_info["error_code"] = error_code
                 
                 # I'm trying to match against my error codes database
-                if error_codes_data and "errorCodes" in error_codes_data:
-                    for error in error_codes_data["errorCodes"]:
-                        if error.get("code", "").upper() == error_code:
-                            crash_info["description"] = error.get("description", "Unknown Error")
-                            break
+                error = code_index.by_name(error_code)
+                if error:
+                    crash_info["description"] = error.get("description", "Unknown Error")
             else:
                 # I'm using event ID as error code when nothing else is available
                 crash_info["error_code"] = f"EVENT_{event_id}"
@@ -409,43 +501,236 @@ def extract_crash_info_from_event(event, error_codes_data, event_type='wmi'):
 def scan_event_viewer_for_crashes(max_events=5000, error_codes_data=None):
     """
     I created this wrapper function for backward compatibility.
+    pywin32 has to be installed with the server (see requirements.txt); I never install it myself.
     """
-    global EVENT_VIEWER_AVAILABLE
-    global PYTHONCOM_AVAILABLE
-    
-    # I'm trying to ensure pythoncom is available
-    if platform.system() == "Windows" and not PYTHONCOM_AVAILABLE:
-        try:
-            import subprocess
-            subprocess.run([sys.executable, "-m", "pip", "install", "pywin32"], 
-                           capture_output=True, text=True)
-        except Exception:
-            pass
-    
-    # I'm updating availability flags
-    try:
-        if platform.system() == "Windows":
-            import win32evtlog
-            import win32com.client
-            try:
-                import pythoncom
-                PYTHONCOM_AVAILABLE = True
-            except ImportError:
-                pass
-            EVENT_VIEWER_AVAILABLE = True
-        else:
-            EVENT_VIEWER_AVAILABLE = False
-    except ImportError:
-        EVENT_VIEWER_AVAILABLE = False
-        return []
-    
     # I'll return early if the Event Viewer isn't available
-    if not EVENT_VIEWER_AVAILABLE:
+    if not load_pywin32():
         return []
         
     # I'm running the scan
     return scan_event_viewer(max_events, error_codes_data)
 
+class Win32EventLogSource:
+    """
+    I read raw records from the Windows event log through win32evtlog, newest first
+    """
+    def __init__(self, server=None):
+        if not load_pywin32():
+            raise RuntimeError("Reading the Event Viewer needs pywin32 on Windows")
+        self.server = server
+
+    def read_records(self, log_name):
+        return read_win32_records(win32evtlog.OpenEventLog(self.server, log_name))
+
+def read_win32_records(handle):
+    """
+    I yield every record behind an open win32evtlog handle, newest first, and close it when done
+    """
+    flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
+    try:
+        while True:
+            with stage("event_log_read"):
+                events = win32evtlog.ReadEventLog(handle, flags, 0)
+            if not events:
+                return
+            for event in events:
+                yield event
+    finally:
+        try:
+            win32evtlog.CloseEventLog(handle)
+        except Exception:
+            pass
+
+class RecordedEvent:
+    """
+    I look like a win32evtlog record but come from a recorded JSON export
+    """
+    def __init__(self, record):
+        self.RecordNumber = int(record["RecordNumber"])
+        self.TimeGenerated = datetime.datetime.strptime(record["TimeGenerated"], '%Y-%m-%d %H:%M:%S')
+        self.SourceName = record.get("SourceName", "")
+        self.EventID = int(record.get("EventID", 0))
+        self.StringInserts = record.get("StringInserts") or []
+        self.Message = record.get("Message", "")
+
+class RecordedEventSource:
+    """
+    I replay events from a JSON file shaped like {"System": [record, ...]} so scans can run off Windows
+    """
+    def __init__(self, path):
+        with open(path, 'r') as f:
+            self.logs = json.load(f)
+
+    def read_records(self, log_name):
+        records = sorted(self.logs.get(log_name, []), key=lambda r: int(r["RecordNumber"]), reverse=True)
+        for record in records:
+            yield RecordedEvent(record)
+
+class EvtxFileSource:
+    """
+    I read an exported .evtx file through win32evtlog on Windows, or python-evtx anywhere else
+    """
+    def __init__(self, path):
+        if not (load_pywin32() or EVTX_AVAILABLE):
+            raise RuntimeError("Reading .evtx exports needs pywin32 or python-evtx")
+        self.path = path
+
+    def read_records(self, log_name):
+        # An export only holds one log, so I ignore the log name
+        if EVENT_VIEWER_AVAILABLE:
+            yield from read_win32_records(win32evtlog.OpenBackupEventLog(None, self.path))
+            return
+        with Evtx(self.path) as log:
+            for record in log.records():
+                yield RecordedEvent(parse_evtx_record(record.xml()))
+
+def parse_evtx_record(xml):
+    """
+    I turn one .evtx record's XML into the record dictionary RecordedEvent expects
+    """
+    root = ET.fromstring(xml)
+    system = root.find("e:System", EVTX_NAMESPACE)
+    provider = system.find("e:Provider", EVTX_NAMESPACE)
+    created = system.find("e:TimeCreated", EVTX_NAMESPACE)
+    source_name = ""
+    if provider is not None:
+        # BugCheck events are logged by WER but keep BugCheck as their event source name
+        source_name = provider.get("EventSourceName") or provider.get("Name", "")
+    return {
+        "RecordNumber": system.findtext("e:EventRecordID", "0", EVTX_NAMESPACE),
+        # SystemTime looks like 2025-05-03T11:02:47.1234567Z, I keep it to the second
+        "TimeGenerated": (created.get("SystemTime", "") if created is not None else "").replace("T", " ")[:19],
+        "SourceName": source_name,
+        "EventID": system.findtext("e:EventID", "0", EVTX_NAMESPACE),
+        "StringInserts": [data.text or "" for data in root.iterfind("e:EventData/e:Data", EVTX_NAMESPACE)]
+    }
+
+def collect_crashes_from_source(source, error_codes_data=None, logs=("System",), max_events=5000, code_index=None):
+    """
+    I read up to max_events records from each log of any event source and return its crashes, newest first
+    """
+    if code_index is None:
+        code_index = ErrorCodeIndex(error_codes_data)
+    crash_events = []
+    seen = set()
+
+    for log_name in logs:
+        with stage("event_log_collect"):
+            records = islice(source.read_records(log_name), max_events)
+            bugchecks = (event for event in records if 'BugCheck' in event.SourceName)
+            merge_crash_events(bugchecks, error_codes_data, 'evtlog', crash_events, seen, code_index)
+
+    crash_events.sort(key=lambda x: x.get("date", ""), reverse=True)
+    return crash_events
+
+def load_scan_state(state_path):
+    """
+    I load my per-log cursors, starting fresh if there's nothing usable
+    """
+    try:
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+        if isinstance(state.get("cursors"), dict):
+            # Older state files also kept a copy of every crash; the history store has those now
+            return {"cursors": state["cursors"]}
+    except (OSError, ValueError):
+        pass
+    return {"cursors": {}}
+
+def add_stretch(stretches, low, high):
+    """
+    I merge the records low..high (inclusive) into a sorted list of disjoint [low, high] stretches
+    """
+    merged = []
+    for stretch_low, stretch_high in sorted(stretches + [[low, high]]):
+        if merged and stretch_low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], stretch_high)
+        else:
+            merged.append([stretch_low, stretch_high])
+    return merged
+
+def save_scan_state(state_path, state):
+    """
+    I write my scan state atomically so an interrupted save can't lose my cursors
+    """
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(temp_path, state_path)
+
+def scan_event_viewer_incremental(source, state_path, error_codes_data=None, logs=("System",), max_events=5000,
+                                  code_index=None):
+    """
+    I read only the records added since my last scan of each log and return the crashes among them,
+    newest first. Crashes found by earlier scans live in the crash history, not here.
+
+    Args:
+        source: Event source with read_records(log_name), yielding records newest first
+        state_path: JSON file holding my per-log cursors
+        error_codes_data: Dictionary containing error codes database
+        logs: Names of the event logs to scan
+        max_events: Maximum number of new records to read per log
+        code_index: Prebuilt ErrorCodeIndex; I only index error_codes_data myself when it's missing
+
+    Returns:
+        List of dictionaries containing crash information
+    """
+    crashes = list(iter_event_viewer_incremental(source, state_path, error_codes_data, logs, max_events, code_index))
+    crashes.sort(key=lambda x: x.get("date", ""), reverse=True)
+    return crashes
+
+def iter_event_viewer_incremental(source, state_path, error_codes_data=None, logs=("System",), max_events=5000,
+                                  code_index=None):
+    """
+    I yield each new crash as I read it, and save my cursors once every log has been read.
+    Takes the same arguments as scan_event_viewer_incremental.
+    """
+    state = load_scan_state(state_path)
+    seen = set()
+    if code_index is None:
+        code_index = ErrorCodeIndex(error_codes_data)
+
+    for log_name in logs:
+        # Every record at or below record_number has been read. A scan that ran out of max_events before
+        # getting down there leaves record_number alone and adds the stretch it did read to "read".
+        cursor = state["cursors"].get(log_name) or {}
+        floor = cursor.get("record_number", 0)
+        already_read = cursor.get("read") or []
+        newest = lowest = None
+        processed = 0
+        finished = True
+
+        for event in source.read_records(log_name):
+            if newest is None:
+                newest = event.RecordNumber
+                # If the newest record is older than my cursor, the log was cleared and I start over
+                if event.RecordNumber < floor:
+                    floor, already_read = 0, []
+            if event.RecordNumber <= floor:
+                break
+            if any(low <= event.RecordNumber <= high for low, high in already_read):
+                continue
+            if processed >= max_events:
+                finished = False
+                break
+            processed += 1
+            lowest = event.RecordNumber
+
+            if 'BugCheck' in event.SourceName:
+                yield from iter_new_crashes((event,), error_codes_data, 'evtlog', seen, code_index)
+
+        if newest is None:
+            continue
+        if finished:
+            # I've read everything down to my old cursor, so the newest record becomes the new one
+            state["cursors"][log_name] = {"record_number": newest}
+        else:
+            # I'll carry on from below lowest next time, still skipping every stretch an earlier scan read
+            read = add_stretch(already_read, lowest, newest) if lowest is not None else already_read
+            state["cursors"][log_name] = {"record_number": floor, "read": read}
+
+    save_scan_state(state_path, state)
+
 # I use this code to test my module directly
 if __name__ == "__main__":
     test_data = {"errorCodes": []}
@@ -0,0 +1,221 @@
+"""
+fleet_collector.py - I created this module to gather crashes from many machines and exported event logs at once
+"""
+import os
+import time
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from error_code_index import ErrorCodeIndex
+import event_viewer_scanner
+from event_viewer_scanner import (
+    RecordedEventSource, EvtxFileSource, Win32EventLogSource, collect_crashes_from_source
+)
+
+EXPORT_EXTENSIONS = (".json", ".evtx")
+
+# How many threads may be left stuck on reads I gave up on, across every pool I've retired, per pool thread
+MAX_STUCK_PER_WORKER = 4
+
+
+class CollectorPool:
+    """
+    I'm the thread pool every fleet scan shares. A read that hangs past its timeout can't be stopped,
+    so its thread stays stuck until the read returns. Once every thread of my executor is stuck I retire it
+    and start a fresh one, so hung hosts can't starve later scans; the stuck threads end with their reads.
+    I stop starting fresh executors once max_stuck threads are stuck, so hung hosts can't pile threads up either.
+    """
+
+    def __init__(self, max_workers, max_stuck=None):
+        self.max_workers = max_workers
+        self.max_stuck = max_stuck if max_stuck is not None else MAX_STUCK_PER_WORKER * max_workers
+        self._lock = threading.Lock()
+        self._current = None
+        self._retired = []
+        self._owners = {}  # future -> the generation ({"executor", "stuck"}) running it
+        self._stuck = {}   # futures I was told to give up on while they ran
+
+    def stuck(self):
+        with self._lock:
+            return sum(generation["stuck"] for generation in self._generations())
+
+    def _generations(self):
+        return self._retired + ([self._current] if self._current else [])
+
+    def _executor(self):
+        # I'm called with my lock held
+        self._retired = [generation for generation in self._retired if generation["stuck"]]
+        current = self._current
+        if current is None or (current["stuck"] >= self.max_workers
+                               and sum(g["stuck"] for g in self._generations()) < self.max_stuck):
+            if current is not None:
+                current["executor"].shutdown(wait=False)
+                self._retired.append(current)
+            self._current = current = {
+                "executor": ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fleet-collector"),
+                "stuck": 0
+            }
+        return current
+
+    def submit(self, function, *args):
+        with self._lock:
+            generation = self._executor()
+            future = generation["executor"].submit(function, *args)
+            self._owners[future] = generation
+        future.add_done_callback(self._finished)
+        return future
+
+    def abandon(self, future):
+        """
+        I stop a queued future from running, or count a running one as stuck until it returns
+        """
+        if future.cancel():
+            return
+        with self._lock:
+            generation = self._owners.get(future)
+            if generation is not None and future not in self._stuck:
+                self._stuck[future] = generation
+                generation["stuck"] += 1
+
+    def _finished(self, future):
+        with self._lock:
+            self._owners.pop(future, None)
+            generation = self._stuck.pop(future, None)
+            if generation is not None:
+                generation["stuck"] -= 1
+
+    def shutdown(self):
+        with self._lock:
+            for generation in self._generations():
+                generation["executor"].shutdown(wait=False)
+
+
+collector_pool = None
+collector_pool_lock = threading.Lock()
+
+
+def get_collector_pool(max_workers):
+    """
+    I return the shared collector pool, starting a new one when max_workers differs from the current pool's
+    """
+    global collector_pool
+    with collector_pool_lock:
+        if collector_pool is None or collector_pool.max_workers != max_workers:
+            if collector_pool is not None:
+                collector_pool.shutdown()
+            collector_pool = CollectorPool(max_workers)
+        return collector_pool
+
+
+def open_event_source(target):
+    """
+    I open an exported .json/.evtx log by path, or a remote machine's event log by host name
+    """
+    extension = os.path.splitext(target)[1].lower()
+    if extension == ".json":
+        return RecordedEventSource(target)
+    if extension == ".evtx":
+        return EvtxFileSource(target)
+    if not event_viewer_scanner.load_pywin32():
+        raise RuntimeError("Remote Event Viewer access needs pywin32 on a Windows server")
+    return Win32EventLogSource(server=target)
+
+
+def collect_fleet(targets, error_codes_data=None, timeout=60, max_workers=8, max_events=5000,
+                  open_source=open_event_source, code_index=None, cleanup=None):
+    """
+    I collect crashes from every target concurrently and merge them into one timeline, newest first.
+
+    Args:
+        targets: List of (label, target) pairs, where target is a host name or an export path.
+            Every label must be different.
+        error_codes_data: Dictionary containing error codes database
+        timeout: Seconds each target may spend collecting before I give up on it
+        max_workers: Number of threads in the collector pool all fleet scans share
+        max_events: Maximum number of records I read from each target
+        open_source: Callable turning a target into an event source
+        code_index: Prebuilt ErrorCodeIndex; I only index error_codes_data myself when it's missing
+        cleanup: Callable I run once every read has stopped, including reads I gave up waiting for,
+            so the caller knows when the targets' files can go
+
+    Returns:
+        Dictionary with the merged "crashes" and a per target "hosts" report
+    """
+    labels = [label for label, _ in targets]
+    if len(set(labels)) != len(labels):
+        raise ValueError("Every fleet target needs its own label")
+    if code_index is None:
+        code_index = ErrorCodeIndex(error_codes_data)
+    started = {}
+
+    def collect(label, target):
+        started[label] = time.monotonic()
+        crashes = collect_crashes_from_source(
+            open_source(target), error_codes_data, max_events=max_events, code_index=code_index
+        )
+        for crash in crashes:
+            crash["host"] = label
+        return crashes
+
+    hosts = {label: {"host": label, "status": "queued", "crashes": 0} for label, _ in targets}
+    timelines = []
+    pool = get_collector_pool(max_workers)
+    running = [len(targets)]
+    running_lock = threading.Lock()
+
+    def finished(future):
+        with running_lock:
+            running[0] -= 1
+            last = running[0] == 0
+        if last and cleanup is not None:
+            cleanup()
+
+    if not targets and cleanup is not None:
+        cleanup()
+    pending = {}
+    try:
+        for label, target in targets:
+            future = pool.submit(collect, label, target)
+            future.add_done_callback(finished)
+            pending[future] = label
+    except BaseException:
+        # Targets that never made it into the pool will never finish, so I stop waiting on them for cleanup
+        with running_lock:
+            running[0] -= len(targets) - len(pending)
+            last = running[0] == 0
+        if last and cleanup is not None:
+            cleanup()
+        for future in pending:
+            pool.abandon(future)
+        raise
+    # Targets queued behind a hung one still get their own timeout once a worker frees up,
+    # but I stop waiting altogether when every worker could have timed out on every round
+    rounds = -(-len(targets) // max(1, max_workers))
+    deadline = time.monotonic() + timeout * rounds
+
+    while pending:
+        done, _ = wait(pending, timeout=min(1.0, timeout), return_when=FIRST_COMPLETED)
+        for future in done:
+            label = pending.pop(future)
+            report = hosts[label]
+            report["seconds"] = round(time.monotonic() - started.get(label, time.monotonic()), 3)
+            try:
+                crashes = future.result()
+            except Exception as e:
+                report.update(status="error", error=str(e))
+                continue
+            report.update(status="ok", crashes=len(crashes))
+            timelines.append(crashes)
+
+        now = time.monotonic()
+        for future, label in list(pending.items()):
+            if (label in started and now - started[label] > timeout) or now > deadline:
+                # I can't stop a blocked read, so its thread stays busy until the read gives up; a queued one is cancelled
+                pool.abandon(future)
+                del pending[future]
+                hosts[label].update(status="timeout", error=f"No answer within {timeout} seconds")
+
+    # Every target's crashes are already newest first, so a heap merge builds the timeline
+    crashes = list(heapq.merge(*timelines, key=lambda x: x.get("date", ""), reverse=True))
+    return {"crashes": crashes, "hosts": [hosts[label] for label, _ in targets]}
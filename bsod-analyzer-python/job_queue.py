@@ -0,0 +1,119 @@
+"""
+job_queue.py - I created this module to run slow dump analyses in the background while clients poll for results
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """I raise this when every worker is busy and the waiting queue is at its limit"""
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, queue_depth=8, retention=600):
+        """
+        I run at most max_workers jobs at once and let queue_depth more wait.
+        Finished jobs stay pollable for retention seconds.
+        """
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dump-analysis")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def has_capacity(self):
+        """
+        I give a cheap early answer so callers can refuse work before doing any I/O
+        """
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+        return active < self.max_workers + self.queue_depth
+
+    def submit(self, func, *args):
+        """
+        I queue func(*args, progress=callback) and return the new job id.
+        func must return a (body, http_status) tuple.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Analysis queue is full")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "progress": {"stage": "queued", "percent": 0},
+            "result": None,
+            "httpStatus": None,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+
+        try:
+            self._executor.submit(self._run, job, func, args)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            self._slots.release()
+            raise
+        return job_id
+
+    def get(self, job_id):
+        """
+        I return a copy of the job record, or None if it's unknown or expired
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return {**job, "progress": dict(job["progress"])} if job else None
+
+    def stats(self):
+        """
+        I count jobs by status for monitoring
+        """
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+        counts["capacity"] = self.max_workers + self.queue_depth
+        return counts
+
+    def _run(self, job, func, args):
+        # I'm recording progress so pollers can see which stage the analysis is in
+        def progress(stage, percent):
+            with self._lock:
+                job["progress"] = {"stage": stage, "percent": percent}
+
+        with self._lock:
+            job["status"] = "running"
+            job["started"] = time.time()
+            job["progress"] = {"stage": "started", "percent": 0}
+
+        try:
+            body, status = func(*args, progress=progress)
+        except Exception as e:
+            body, status = {"error": f"Error analyzing dump file: {str(e)}", "type": "analysis_error"}, 500
+        finally:
+            self._slots.release()
+
+        with self._lock:
+            job["result"] = body
+            job["httpStatus"] = status
+            job["status"] = "done" if status < 400 else "failed"
+            job["progress"] = {"stage": job["status"], "percent": 100}
+            job["finished"] = time.time()
+
+    def _prune(self):
+        # I'm forgetting finished jobs nobody has polled for a while (caller holds the lock)
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["finished"] is not None and job["finished"] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
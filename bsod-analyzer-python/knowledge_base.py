@@ -0,0 +1,161 @@
+"""
+knowledge_base.py - I created this module to reload my error codes database while the server runs,
+handing every request a finished, read-only snapshot instead of a copy
+"""
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+
+from error_code_index import ErrorCodeIndex
+from content_encoding import prepare
+
+
+class FrozenDict(dict):
+    """
+    I'm a dict that refuses changes, so a snapshot shared by every request can't be edited by one of them.
+    I still serialize to JSON like any dict.
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Knowledge base snapshots are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    """
+    I turn parsed JSON into FrozenDicts and tuples all the way down
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def validate_error_codes(data):
+    """
+    I check a freshly parsed database has the shape my lookups rely on, raising ValueError if not
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("errorCodes"), list):
+        raise ValueError("error codes database must be an object with an errorCodes list")
+    for position, entry in enumerate(data["errorCodes"]):
+        if not isinstance(entry, dict) or not isinstance(entry.get("code"), str) or not entry["code"].strip():
+            raise ValueError(f"errorCodes[{position}] needs a non-empty code")
+        if not isinstance(entry.get("hexCode", ""), str):
+            raise ValueError(f"errorCodes[{position}] ({entry['code']}) has a hexCode that isn't a string")
+
+
+def prepare_body(value):
+    """
+    I encode a value exactly like jsonify does and precompress it
+    """
+    data = (json.dumps(value, separators=(",", ":"), sort_keys=True) + "\n").encode("utf-8")
+    return prepare(data, "application/json")
+
+
+class KnowledgeSnapshot(namedtuple("KnowledgeSnapshot", "version data index path loaded bodies database_body")):
+    """
+    Everything a request needs from my database, built together and never changed afterwards
+    """
+    __slots__ = ()
+
+    def body_for(self, entry):
+        """
+        I return the prepared response body for one of my index's entries
+        """
+        body = self.bodies.get(id(entry))
+        return body if body is not None else prepare_body(entry)
+
+
+def build_snapshot(version, data, path=None, loaded=None):
+    """
+    I build a snapshot's index and prepared bodies; entries are keyed by identity since my index returns them as is
+    """
+    index = ErrorCodeIndex(data)
+    bodies = {id(entry): prepare_body(entry) for entry in index.entries}
+    return KnowledgeSnapshot(version, data, index, path, loaded, bodies, prepare_body(data))
+
+
+class KnowledgeBase:
+    def __init__(self, paths, poll_interval=2.0, on_reload=None):
+        """
+        I load the first of paths that exists and, once watch() is called, check it every
+        poll_interval seconds. on_reload(snapshot) runs after every successful reload.
+        """
+        self.paths = list(paths)
+        self.poll_interval = poll_interval
+        self.on_reload = on_reload
+        self.snapshot = build_snapshot(0, freeze({"errorCodes": []}))
+        self._signature = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        if not self.reload() and self._signature is None:
+            print("Error codes database not found")
+
+    def _find_path(self):
+        return next((path for path in self.paths if os.path.exists(path)), None)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+            return path, stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def reload(self, force=False):
+        """
+        I rebuild my snapshot if the database file changed and return True if I swapped one in.
+        A file that fails to parse or validate leaves the current snapshot in place.
+        """
+        with self._reload_lock:
+            path = self._find_path()
+            signature = self._stat(path) if path else None
+            if signature is None or (signature == self._signature and not force):
+                return False
+            # I remember this version of the file even if it's bad, so I only complain about it once
+            self._signature = signature
+
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                validate_error_codes(data)
+                data = freeze(data)
+                snapshot = build_snapshot(self.snapshot.version + 1, data, path, time.time())
+            except Exception as e:
+                print(f"Could not load error codes from {path}, keeping version {self.snapshot.version}: {e}")
+                return False
+
+            # Readers pick up the new snapshot with a single attribute read, no lock needed
+            self.snapshot = snapshot
+            print(f"Loaded error-codes.json version {snapshot.version} from: {path}")
+
+        if self.on_reload and snapshot.version > 1:
+            try:
+                self.on_reload(snapshot)
+            except Exception as e:
+                print(f"Warning: Error code reload hook failed: {e}")
+        return True
+
+    def watch(self):
+        """
+        I start a background thread that polls my database file for changes
+        """
+        if self.poll_interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._poll, name="knowledge-base-watcher", daemon=True)
+        self._watcher.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Warning: Could not check error codes database: {e}")
@@ -0,0 +1,281 @@
+"""
+metrics.py - I created this module to count and time what my server does and expose it in Prometheus text format.
+Setting METRICS_ENABLED=0 turns every metric into a no-op.
+"""
+import os
+import time
+import threading
+from bisect import bisect_left
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no', 'off')
+
+# Upper bounds in seconds, from a quick index lookup up to a slow WinDbg run
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=""):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class NullMetric:
+    """
+    I stand in for every metric when metrics are off, so instrumented code pays for one method call
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def labels(self, *values):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def time(self):
+        return self
+
+
+NULL_METRIC = NullMetric()
+
+
+class Timer:
+    # I observe the seconds spent inside a with block, even when it raises
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._started)
+        return False
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        I return the series for these label values, creating it the first time
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    # Unlabelled metrics can be used directly
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount=1):
+        self._children[()].dec(amount)
+
+    def set(self, value):
+        self._children[()].set(value)
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def time(self):
+        return Timer(self._children[()])
+
+    def samples(self):
+        """
+        I yield (suffix, label names, label values, extra label, value) for every series
+        """
+        for values, child in sorted(self._children.items()):
+            yield "", self.labelnames, values, "", child.value
+
+
+class CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class GaugeChild(CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # the last count is the +Inf bucket
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        position = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.sum += value
+
+    def time(self):
+        return Timer(self)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return HistogramChild(self.upper_bounds)
+
+    def samples(self):
+        for values, child in sorted(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, bucket in zip(self.upper_bounds + (float("inf"),), counts):
+                cumulative += bucket
+                yield "_bucket", self.labelnames, values, f'le="{format_value(bound)}"', cumulative
+            yield "_sum", self.labelnames, values, "", total
+            yield "_count", self.labelnames, values, "", cumulative
+
+
+class Registry:
+    def __init__(self, enabled=True):
+        """
+        I hold every metric and render them together. When disabled, I hand out no-op metrics.
+        """
+        self.enabled = enabled
+        self._metrics = []
+        self._collectors = []
+
+    def _register(self, metric):
+        if not self.enabled:
+            return NULL_METRIC
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, callback):
+        """
+        I call callback() on every render for numbers that are cheaper to read when asked than to track
+        as they change. It returns (name, kind, documentation, label names, {label values: value}) tuples.
+        """
+        if self.enabled:
+            self._collectors.append(callback)
+
+    def render(self):
+        """
+        I return every metric in Prometheus text exposition format
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, names, values, extra, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{format_labels(names, values, extra)} {format_value(value)}")
+
+        for callback in self._collectors:
+            try:
+                collected = callback()
+            except Exception as e:
+                print(f"Warning: Metrics collector failed: {e}")
+                continue
+            for name, kind, documentation, labelnames, series in collected:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for values, value in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(labelnames, values)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(METRICS_ENABLED)
+
+# Every module times its own stages under one histogram, told apart by the stage label
+STAGE_SECONDS = REGISTRY.histogram(
+    "bsod_stage_duration_seconds", "Seconds spent in each processing stage", ("stage",)
+)
+
+
+def stage(name):
+    """
+    I time a with block as one observation of the named stage
+    """
+    return STAGE_SECONDS.labels(name).time()
@@ -1,9 +1,15 @@
 """
 minidump_parser.py - I created this basic Windows minidump parser to extract crash codes
 """
+import io
 import os
+import re
+import mmap
 import struct
-import binascii
+from contextlib import contextmanager
+
+from metrics import stage
+from driver_index import attribute_driver
 
 # I'm storing common BSOD stop codes and their meanings
 STOP_CODES = {
@@ -29,85 +35,416 @@ STOP_CODES = {
     # Add more common stop codes as needed
 }
 
-def find_hex_patterns(file_path):
+# I'm capping how much of a dump I hold in memory at once while scanning it
+SCAN_MEMORY_LIMIT = int(os.environ.get("BSOD_SCAN_MEMORY_LIMIT", 16 * 1024 * 1024))
+
+# I'm dropping the same bytes my ascii fallback has always ignored: nulls and anything above 0x7F
+ASCII_NOISE = bytes([0]) + bytes(range(0x80, 0x100))
+
+class StopCodeScanner:
+    """
+    I match every known stop code in a single streaming pass over a dump
+    """
+    def __init__(self, stop_codes=None):
+        self.codes = list((stop_codes or STOP_CODES).items())
+
+        # I'm looking for the raw big-endian bytes of each code first
+        self._raw_regex, self._raw_priority, self._raw_overlap = self._compile(
+            (priority, [struct.pack(">I", code)])
+            for priority, (code, _) in enumerate(self.codes)
+        )
+
+        # If none of those show up, I look for text like "0x0000000A" or the code name
+        self._ascii_regex, self._ascii_priority, self._ascii_overlap = self._compile(
+            (priority, [f"0x{code:08X}".encode("ascii"), name.encode("ascii")])
+            for priority, (code, name) in enumerate(self.codes)
+        )
+
+    @staticmethod
+    def _compile(prioritized_patterns):
+        """
+        I build one automaton for all patterns. Listing them in priority order makes
+        the earlier code win when two start at the same byte.
+        """
+        priority_by_pattern = {}
+        for priority, patterns in prioritized_patterns:
+            for pattern in patterns:
+                priority_by_pattern.setdefault(pattern, priority)
+
+        ordered = sorted(priority_by_pattern, key=priority_by_pattern.get)
+        regex = re.compile(b"|".join(re.escape(p) for p in ordered))
+        overlap = max(len(p) for p in ordered) - 1
+        return regex, priority_by_pattern, overlap
+
+    @staticmethod
+    def _best_priority(regex, priority_by_pattern, data, best):
+        """
+        I return the lowest priority matched in data, stopping as soon as nothing can beat it
+        """
+        position = 0
+        while True:
+            match = regex.search(data, position)
+            if not match:
+                return best
+            priority = priority_by_pattern[bytes(match.group(0))]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    return best
+            # I resume one byte later so overlapping matches are still seen
+            position = match.start() + 1
+
+    def _windows(self, source, chunk_size):
+        """
+        I yield (window, chunk) pairs where each window also holds the last few bytes
+        of the previous chunk, so codes split across chunks are still found
+        """
+        if hasattr(source, "read"):
+            tail = b""
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    return
+                window = tail + chunk
+                tail = window[-self._raw_overlap:]
+                yield window, chunk
+        else:
+            # A buffer can be windowed in place without copying anything
+            view = memoryview(source)
+            for start in range(0, len(view), chunk_size):
+                yield view[max(0, start - self._raw_overlap):start + chunk_size], view[start:start + chunk_size]
+
+    def scan(self, source, memory_limit=None):
+        """
+        I read a stream or buffer in bounded chunks and return (code, name) for the
+        highest priority stop code found, or None
+        """
+        memory_limit = memory_limit or SCAN_MEMORY_LIMIT
+        # Each chunk is briefly held three times: raw, joined with the overlap tail, and filtered
+        chunk_size = max(memory_limit // 3, self._raw_overlap + 1, self._ascii_overlap + 1)
+
+        best_raw = None
+        best_ascii = None
+        ascii_tail = b""
+
+        for window, chunk in self._windows(source, chunk_size):
+            best_raw = self._best_priority(self._raw_regex, self._raw_priority, window, best_raw)
+            if best_raw == 0:
+                break
+
+            # Once a raw match exists, the ascii fallback can no longer change the answer
+            if best_raw is None and best_ascii != 0:
+                window = ascii_tail + bytes(chunk).translate(None, ASCII_NOISE)
+                best_ascii = self._best_priority(self._ascii_regex, self._ascii_priority, window, best_ascii)
+                ascii_tail = window[-self._ascii_overlap:]
+
+        best = best_raw if best_raw is not None else best_ascii
+        return self.codes[best] if best is not None else None
+
+stop_code_scanner = StopCodeScanner()
+
+@contextmanager
+def open_dump_buffer(source):
+    """
+    I give every analysis stage one shared, read-only view of a dump. The source can be
+    a path, a bytes-like object or a binary file object; files are memory-mapped, never copied.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            with open_dump_buffer(f) as view:
+                yield view
+        return
+
+    mapped = None
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(source)
+    elif hasattr(source, "getbuffer"):
+        # An in-memory upload (BytesIO) is analyzed where it already sits
+        view = source.getbuffer()
+    else:
+        try:
+            fileno = source.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fileno = None
+        if fileno is not None and os.fstat(fileno).st_size > 0:
+            mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+        else:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            view = memoryview(source.read())
+
+    try:
+        yield view
+    finally:
+        # I'm releasing the view before the mapping; while leftover slices exist, either one
+        # refuses with BufferError and waits for the garbage collector instead
+        try:
+            view.release()
+        except BufferError:
+            pass
+        finally:
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass
+
+def find_hex_patterns(source, memory_limit=None):
     """
-    I scan a file for common BSOD stop code hex patterns
+    I scan a dump for common BSOD stop code hex patterns without loading it all into memory
     """
     try:
-        stop_code = None
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            
-            # I'm looking for patterns like "STOP: 0x0000000A" or similar formats
-            # First I convert to hex string for easier searching
-            hex_dump = binascii.hexlify(content).decode('utf-8')
-            
-            # I check for each known stop code
-            for code, name in STOP_CODES.items():
-                # I convert the code to hex string without 0x prefix and padded to 8 digits
-                hex_code = f"{code:08x}"
-                
-                # I look for the hex pattern in the dump
-                if hex_code in hex_dump.lower():
-                    stop_code = (code, name)
-                    break
-            
-            # If I can't find it, I try a fallback approach
-            if not stop_code:
-                # I remove null bytes and convert to ASCII
-                ascii_content = content.replace(b'\x00', b'').decode('ascii', errors='ignore')
-                
-                # I check for patterns like "STOP: 0x0000000A" or "DRIVER_IRQL_NOT"
-                for code, name in STOP_CODES.items():
-                    hex_pattern = f"0x{code:08X}"
-                    if hex_pattern in ascii_content or name in ascii_content:
-                        stop_code = (code, name)
-                        break
-        
-        return stop_code
+        with open_dump_buffer(source) as view:
+            return stop_code_scanner.scan(view, memory_limit)
     except Exception as e:
         print(f"Error analyzing dump file: {e}")
         return None
 
-def check_minidump_signature(file_path):
+# I'm describing the on-disk layouts I read with struct
+MINIDUMP_SIGNATURE = b'MDMP'
+MINIDUMP_HEADER = struct.Struct("<4sIIIIIQ")       # Signature, Version, NumberOfStreams, StreamDirectoryRva, CheckSum, TimeDateStamp, Flags
+MINIDUMP_DIRECTORY = struct.Struct("<III")         # StreamType, DataSize, Rva
+MINIDUMP_EXCEPTION_STREAM = struct.Struct("<IIIIQQII15Q")  # ThreadId, alignment, then MINIDUMP_EXCEPTION
+MINIDUMP_MODULE = struct.Struct("<QIIII84x")       # BaseOfImage, SizeOfImage, CheckSum, TimeDateStamp, ModuleNameRva
+MODULE_LIST_STREAM = 4
+EXCEPTION_STREAM = 6
+
+# Kernel crash dumps (the small memory dumps Windows writes on a BSOD) keep the bug check in a fixed header
+KERNEL_DUMP_HEADERS = {
+    b'PAGEDU64': (0x38, struct.Struct("<I4xQQQQ")),  # BugCheckCode, BugCheckParameter1-4
+    b'PAGEDUMP': (0x28, struct.Struct("<IIIII")),
+}
+# ...and the time of the crash as a FILETIME (100ns ticks since 1601) further into the same header
+KERNEL_DUMP_SYSTEM_TIME = {b'PAGEDU64': 0xFA8, b'PAGEDUMP': 0xFC0}
+FILETIME_UNIX_EPOCH = 116444736000000000
+
+# I'm refusing absurd counts and sizes so a corrupt directory can't make me read the whole file
+MAX_STREAMS = 1024
+MAX_MODULES = 4096
+MAX_NAME_BYTES = 1024
+
+def _read_at(view, offset, size):
+    """
+    I read exactly size bytes at offset, or return None if the dump is too short
+    """
+    data = view[offset:offset + size]
+    return bytes(data) if len(data) == size else None
+
+def read_stream_directory(view):
+    """
+    I read the MINIDUMP_HEADER and return {stream_type: (rva, data_size)}
     """
-    I check if the file has a valid Windows minidump signature
+    header = _read_at(view, 0, MINIDUMP_HEADER.size)
+    if not header:
+        return None
+    signature, _, stream_count, directory_rva, _, _, _ = MINIDUMP_HEADER.unpack(header)
+    if signature != MINIDUMP_SIGNATURE or stream_count > MAX_STREAMS:
+        return None
+
+    directory = _read_at(view, directory_rva, stream_count * MINIDUMP_DIRECTORY.size) if stream_count else b""
+    if directory is None:
+        return None
+
+    streams = {}
+    for stream_type, data_size, rva in MINIDUMP_DIRECTORY.iter_unpack(directory):
+        # I keep the first stream of each type, like the debugger does
+        streams.setdefault(stream_type, (rva, data_size))
+    return streams
+
+def read_crash_time(view):
+    """
+    I read when the dump was written, as unix seconds, from the minidump or kernel dump header.
+    I return None when the header doesn't say.
+    """
+    signature = _read_at(view, 0, 8)
+    if signature in KERNEL_DUMP_SYSTEM_TIME:
+        data = _read_at(view, KERNEL_DUMP_SYSTEM_TIME[signature], 8)
+        ticks = struct.unpack("<Q", data)[0] if data else 0
+        return (ticks - FILETIME_UNIX_EPOCH) // 10_000_000 if ticks > FILETIME_UNIX_EPOCH else None
+
+    header = _read_at(view, 0, MINIDUMP_HEADER.size)
+    if not header or header[:4] != MINIDUMP_SIGNATURE:
+        return None
+    return MINIDUMP_HEADER.unpack(header)[5] or None
+
+def read_exception_record(view, streams):
+    """
+    I read the bug check (exception) code, its first four parameters and the faulting address
+    """
+    if EXCEPTION_STREAM not in streams:
+        return None
+    rva, data_size = streams[EXCEPTION_STREAM]
+    if data_size < MINIDUMP_EXCEPTION_STREAM.size:
+        return None
+    data = _read_at(view, rva, MINIDUMP_EXCEPTION_STREAM.size)
+    if data is None:
+        return None
+
+    fields = MINIDUMP_EXCEPTION_STREAM.unpack(data)
+    code, address, parameter_count = fields[2], fields[5], fields[6]
+    parameters = list(fields[8:8 + min(parameter_count, 4)])
+    return {"code": code, "parameters": parameters, "address": address}
+
+def read_module_list(view, streams):
+    """
+    I read every module's name, base address, size and timestamp from the module list stream
+    """
+    if MODULE_LIST_STREAM not in streams:
+        return []
+    rva, _ = streams[MODULE_LIST_STREAM]
+    count_data = _read_at(view, rva, 4)
+    if count_data is None:
+        return []
+    count = min(struct.unpack("<I", count_data)[0], MAX_MODULES)
+    table = _read_at(view, rva + 4, count * MINIDUMP_MODULE.size) if count else b""
+    if table is None:
+        return []
+
+    modules = []
+    for base, size, _, timestamp, name_rva in MINIDUMP_MODULE.iter_unpack(table):
+        path = _read_minidump_string(view, name_rva) or ""
+        modules.append({
+            "name": path.replace("/", "\\").rsplit("\\", 1)[-1],
+            "path": path,
+            "base": base,
+            "size": size,
+            "timestamp": timestamp
+        })
+    return modules
+
+def _read_minidump_string(view, rva):
+    """
+    I read a MINIDUMP_STRING: a byte length followed by UTF-16LE text
+    """
+    length_data = _read_at(view, rva, 4)
+    if length_data is None:
+        return None
+    length = min(struct.unpack("<I", length_data)[0], MAX_NAME_BYTES)
+    data = _read_at(view, rva + 4, length)
+    return data.decode("utf-16-le", errors="replace") if data is not None else None
+
+def read_kernel_bugcheck(view):
+    """
+    I read the bug check code and parameters straight out of a kernel dump header
+    """
+    signature = _read_at(view, 0, 8)
+    if signature not in KERNEL_DUMP_HEADERS:
+        return None
+    offset, layout = KERNEL_DUMP_HEADERS[signature]
+    data = _read_at(view, offset, layout.size)
+    if data is None:
+        return None
+    code, *parameters = layout.unpack(data)
+    return {"code": code, "parameters": parameters, "address": None}
+
+def parse_dump_structure(view):
+    """
+    I parse a dump's headers with a few small reads and return its format,
+    bug check record and module list. The view is anything open_dump_buffer yields.
+    """
+    bugcheck = read_kernel_bugcheck(view)
+    if bugcheck:
+        return {"format": "kernel", "bugcheck": bugcheck, "modules": [], "timestamp": read_crash_time(view)}
+
+    streams = read_stream_directory(view)
+    if streams is None:
+        return None
+    return {
+        "format": "minidump",
+        "bugcheck": read_exception_record(view, streams),
+        "modules": read_module_list(view, streams),
+        "timestamp": read_crash_time(view)
+    }
+
+def has_dump_signature(view):
+    """
+    I check a dump buffer for a Windows minidump or kernel dump signature
+    """
+    # Minidump files start with "MDMP", kernel dumps with "PAGEDU64" or "PAGEDUMP"
+    head = bytes(view[:8])
+    return head[:4] == MINIDUMP_SIGNATURE or head in KERNEL_DUMP_HEADERS
+
+def check_minidump_signature(source):
+    """
+    I check if the file has a valid Windows minidump or kernel dump signature
     """
     try:
-        with open(file_path, 'rb') as f:
-            # Minidump files start with "MDMP" signature
-            return f.read(4) == b'MDMP'
+        with open_dump_buffer(source) as view:
+            return has_dump_signature(view)
     except Exception:
         return False
 
-def extract_dump_info(file_path):
+def extract_dump_info(source):
     """
-    I extract basic information from a Windows dump file
+    I extract basic information from a Windows dump, given a path, a buffer or a file object.
+    Every stage shares one view of the dump, so it's opened and mapped only once.
     """
-    result = {
+    try:
+        with open_dump_buffer(source) as view:
+            return _extract_from_view(view)
+    except Exception as e:
+        print(f"Error analyzing dump file: {e}")
+        return _empty_dump_info()
+
+def _empty_dump_info():
+    return {
         "valid_format": False,
         "stop_code": None,
         "stop_code_name": None,
-        "error_detected": False
+        "error_detected": False,
+        "parameters": [],
+        "exception_address": None,
+        "modules": [],
+        "driver": None,
+        "crash_time": None,
+        "analysis_source": None
     }
+
+def _extract_from_view(view):
+    result = _empty_dump_info()
     
     try:
         # I check if this is a valid minidump file
-        is_minidump = check_minidump_signature(file_path)
+        with stage("signature_check"):
+            is_minidump = has_dump_signature(view)
         
         if is_minidump:
             result["valid_format"] = True
-            
-            # I try to extract the stop code
-            stop_code_info = find_hex_patterns(file_path)
+
+            # I read the bug check record directly from the dump structure first
+            with stage("structure_parse"):
+                structure = parse_dump_structure(view)
+            if structure:
+                result["modules"] = structure["modules"]
+                result["crash_time"] = structure["timestamp"]
+                bugcheck = structure["bugcheck"]
+                if bugcheck:
+                    code = bugcheck["code"]
+                    result["stop_code"] = f"0x{code:08X}"
+                    result["stop_code_name"] = STOP_CODES.get(code, result["stop_code"])
+                    result["parameters"] = [f"0x{p:016X}" for p in bugcheck["parameters"]]
+                    if bugcheck["address"] is not None:
+                        result["exception_address"] = f"0x{bugcheck['address']:016X}"
+                    # I name the module the fault happened in, the way the debugger's "Probably caused by" does
+                    with stage("driver_attribution"):
+                        result["driver"] = attribute_driver(result["modules"], bugcheck)
+                    result["analysis_source"] = "bugcheck_record"
+                    result["error_detected"] = True
+                    return result
+
+            # If the structure has no bug check, I fall back to searching for byte patterns
+            with stage("pattern_scan"):
+                stop_code_info = find_hex_patterns(view)
             if stop_code_info:
+                result["analysis_source"] = "pattern_scan"
                 code, name = stop_code_info
                 result["stop_code"] = f"0x{code:08X}"
                 result["stop_code_name"] = name
                 result["error_detected"] = True
         else:
             # For invalid formats, I fall back to a file size heuristic
-            size = os.path.getsize(file_path)
+            size = len(view)
             # I use file size to make an educated guess about the error type
             if size < 1_048_576:  # Less than 1MB
                 result["stop_code_name"] = "MEMORY_MANAGEMENT"
@@ -119,6 +456,7 @@ def extract_dump_info(file_path):
                 result["stop_code_name"] = "SYSTEM_SERVICE_EXCEPTION"
                 result["stop_code"] = "0x0000003B"
             
+            result["analysis_source"] = "size_heuristic"
             result["error_detected"] = True
             
         return result
@@ -0,0 +1,137 @@
+"""
+result_cache.py - I created this module to remember dump analysis results by content hash, so repeat uploads return instantly
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    def __init__(self, directory, max_entries=1024, ttl=7 * 24 * 60 * 60):
+        """
+        I keep at most max_entries results, each for at most ttl seconds.
+        Every result is a small JSON file in directory so the cache survives restarts.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # digest -> last used time, least recently used first
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _load(self):
+        # I'm rebuilding my LRU order from file modification times, which I bump on every hit
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    found.append((os.path.getmtime(os.path.join(self.directory, name)), name[:-5]))
+                except OSError:
+                    pass
+        for last_used, digest in sorted(found):
+            self._entries[digest] = last_used
+        with self._lock:
+            self._evict()
+
+    def get(self, digest):
+        """
+        I return the cached result for digest, or None on a miss
+        """
+        with self._lock:
+            entry = None
+            if digest in self._entries:
+                try:
+                    with open(self._path(digest), "r") as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    self._remove(digest)
+
+            # I'm expiring results by the time they were stored, not the time they were last used
+            now = time.time()
+            if entry is not None and now - entry.get("stored", 0) > self.ttl:
+                self._remove(digest)
+                self.evictions += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # I'm marking the entry as recently used, on disk too so the order survives a restart
+            self._entries[digest] = now
+            self._entries.move_to_end(digest)
+            try:
+                os.utime(self._path(digest), (now, now))
+            except OSError:
+                pass
+            self.hits += 1
+            return entry["result"]
+
+    def put(self, digest, result):
+        """
+        I store a result, writing it atomically so a crash never leaves half a file behind
+        """
+        path = self._path(digest)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"stored": time.time(), "result": result}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not cache analysis result: {e}")
+            return
+
+        with self._lock:
+            self._entries[digest] = time.time()
+            self._entries.move_to_end(digest)
+            self._evict()
+
+    def clear(self):
+        """
+        I forget every result, for when the data they were built from has changed
+        """
+        with self._lock:
+            for digest in list(self._entries):
+                self._remove(digest)
+
+    def stats(self):
+        """
+        I report my hit and miss counters for monitoring
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRatio": self.hits / lookups if lookups else 0.0
+            }
+
+    def _evict(self):
+        # I'm dropping the least recently used entries, plus any idle longer than my ttl (caller holds the lock)
+        cutoff = time.time() - self.ttl
+        for digest in [d for d, last_used in self._entries.items() if last_used < cutoff]:
+            self._remove(digest)
+            self.evictions += 1
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, digest):
+        self._entries.pop(digest, None)
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
@@ -0,0 +1,85 @@
+"""
+static_assets.py - I created this module to fingerprint and precompress my frontend once at startup,
+so browsers can cache every asset forever and only refetch what actually changed
+"""
+import os
+import re
+import mimetypes
+import threading
+
+from content_encoding import prepare
+
+# I'm rewriting src and href attributes that point at one of my own assets
+ASSET_REFERENCE = re.compile(r'''(\b(?:src|href)\s*=\s*["'])([^"'#?]+)(["'])''')
+
+
+def fingerprinted_name(name, etag):
+    """
+    I put the first characters of an asset's content hash before its extension: script.js becomes script.1a2b3c4d5e6f.js
+    """
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{etag[:12]}{extension}"
+
+
+class StaticAssets:
+    def __init__(self, directory, index_name="index.html"):
+        """
+        I read every file under directory, give each a fingerprinted name,
+        and point index_name's references at those names. I do it on the first request rather than
+        at startup, so a worker that's spawned and never serves the frontend doesn't pay for it.
+        """
+        self.directory = directory
+        self.index_name = index_name
+        self.assets = {}  # request path -> PreparedBody
+        self.fingerprinted = set()  # request paths that are safe to cache forever
+        self._built = False
+        self._build_lock = threading.Lock()
+
+    def _build(self):
+        names = {}
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for file_name in files:
+                    path = os.path.join(root, file_name)
+                    names[os.path.relpath(path, self.directory).replace(os.sep, "/")] = path
+
+        renamed = {}
+        for name, path in sorted(names.items()):
+            if name == self.index_name:
+                continue
+            with open(path, "rb") as f:
+                body = prepare(f.read(), mimetypes.guess_type(name)[0] or "application/octet-stream")
+            hashed = fingerprinted_name(name, body.etag)
+            self.assets[name] = body
+            self.assets[hashed] = body
+            self.fingerprinted.add(hashed)
+            renamed[name] = hashed
+
+        # The page itself can't be fingerprinted, but it's tiny and names everything else by hash
+        if self.index_name in names:
+            with open(names[self.index_name], "r", encoding="utf-8") as f:
+                html = f.read()
+
+            def rewrite(match):
+                reference = match.group(2)
+                hashed = renamed.get(reference.lstrip("/").removeprefix("./"))
+                if hashed is None:
+                    return match.group(0)
+                prefix = reference[:len(reference) - len(reference.lstrip("/"))]
+                return f"{match.group(1)}{prefix}{hashed}{match.group(3)}"
+
+            self.assets[self.index_name] = prepare(
+                ASSET_REFERENCE.sub(rewrite, html).encode("utf-8"), "text/html"
+            )
+
+    def get(self, name):
+        """
+        I return (prepared body, whether it may be cached forever), or (None, False) for unknown paths
+        """
+        if not self._built:
+            with self._build_lock:
+                if not self._built:
+                    self._build()
+                    self._built = True
+        body = self.assets.get(name)
+        return body, name in self.fingerprinted
@@ -0,0 +1,94 @@
+"""
+upload_guard.py - I created this module to turn junk uploads away while they're still arriving:
+each route gets its own size cap, and a file whose first bytes aren't a dump is refused before the rest is spooled
+"""
+import io
+import tempfile
+
+from flask import Request
+from werkzeug.exceptions import UnsupportedMediaType
+
+from minidump_parser import has_dump_signature
+
+# A minidump is told apart by 4 bytes and a kernel dump by 8, so 8 bytes are all I ever wait for
+SIGNATURE_BYTES = 8
+ZIP_SIGNATURE = b"PK\x03\x04"
+# Requests this small have their files spooled in memory, the same cutoff werkzeug uses
+IN_MEMORY_UPLOAD_SIZE = 500 * 1024
+
+
+def is_dump_head(head, allow_zip=False):
+    """
+    I check the first bytes of an upload for a dump signature, or a zip's when the route unpacks archives
+    """
+    return has_dump_signature(head) or (allow_zip and head[:4] == ZIP_SIGNATURE)
+
+
+def upload_stream(total_content_length):
+    """
+    I pick where an uploaded file is spooled: a BytesIO when the request is small enough,
+    an anonymous temporary file otherwise. Unlike werkzeug's SpooledTemporaryFile, both can be
+    read in place by my parser (getbuffer or mmap) without anything private.
+    """
+    if total_content_length is not None and total_content_length <= IN_MEMORY_UPLOAD_SIZE:
+        return io.BytesIO()
+    return tempfile.TemporaryFile("rb+")
+
+
+class NotADumpError(UnsupportedMediaType):
+    description = "The uploaded file is not a Windows minidump or kernel dump"
+
+
+class SignatureCheckedFile:
+    """
+    I stand in for the file werkzeug spools an upload into. I hold back judgement until the first
+    SIGNATURE_BYTES have been written, then either raise NotADumpError or get out of the way.
+    """
+
+    def __init__(self, target, filename=None, allow_zip=False):
+        self._target = target
+        self._filename = filename
+        self._allow_zip = allow_zip
+        self._head = b""
+
+    def write(self, data):
+        if self._head is not None:
+            self._head += data[:SIGNATURE_BYTES - len(self._head)]
+            if len(self._head) >= SIGNATURE_BYTES:
+                self._check()
+        return self._target.write(data)
+
+    def seek(self, *args):
+        # werkzeug rewinds the file once the part is complete, so a file shorter than a signature is judged here
+        if self._head is not None:
+            self._check()
+        return self._target.seek(*args)
+
+    def _check(self):
+        if not is_dump_head(self._head, self._allow_zip):
+            self._target.close()
+            raise NotADumpError(f"{self._filename or 'The uploaded file'} is not a Windows minidump or kernel dump")
+        self._head = None
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class UploadRequest(Request):
+    """
+    I'm Flask's request with two extras, both looked up by endpoint name:
+    size_limits caps the body, and signature_checks names the routes whose files must be dumps
+    (True allows zips of dumps too)
+    """
+    size_limits = {}
+    signature_checks = {}
+
+    @property
+    def max_content_length(self):
+        return self.size_limits.get(self.endpoint, super().max_content_length)
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = upload_stream(total_content_length)
+        if self.endpoint not in self.signature_checks:
+            return stream
+        return SignatureCheckedFile(stream, filename, allow_zip=self.signature_checks[self.endpoint])
@@ -3,12 +3,275 @@ windbg_integration.py - I created this module to integrate with Windows Debuggin
 """
 import os
 import re
+import time
+import uuid
+import queue
+import threading
 import subprocess
 import tempfile
 import platform
 
-class WinDbgAnalyzer:
+from metrics import stage
+
+# I'm keeping downloaded symbols in one local store that every debugger session shares
+SYMBOL_CACHE = os.environ.get('WINDBG_SYMBOL_CACHE', os.path.join(tempfile.gettempdir(), 'bsod-symbols'))
+SYMBOL_SERVER = "https://msdl.microsoft.com/download/symbols"
+
+# These are the commands I run against every dump
+ANALYSIS_COMMANDS = [
+    ".reload",       # Reload symbols for the current target
+    "!analyze -v",   # Verbose crash analysis
+    ".bugcheck",     # Display bugcheck information
+    "lm"             # List loaded modules
+]
+
+class DebuggerSessionError(Exception):
+    """I raise this when a debugger session dies or stops following my command protocol"""
+
+class DebuggerSession:
+    def __init__(self, command, symbol_cache=SYMBOL_CACHE):
+        """
+        I wrap one long-lived console debugger process that I drive over stdin/stdout
+        """
+        self.command = list(command)
+        self.symbol_cache = symbol_cache
+        self.process = None
+        self.uses = 0
+        self._lines = queue.Queue()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, dump_file_path, timeout):
+        """
+        I launch the debugger on its first dump and point it at my shared symbol store
+        """
+        os.makedirs(self.symbol_cache, exist_ok=True)
+        self.process = subprocess.Popen(
+            self.command + ["-z", dump_file_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+        )
+        # I'm reading output on a background thread so I can enforce timeouts on every command
+        threading.Thread(target=self._pump_output, daemon=True).start()
+        self.execute([f".sympath srv*{self.symbol_cache}*{SYMBOL_SERVER}"], timeout)
+
+    def _pump_output(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # The debugger exited
+
+    def execute(self, commands, timeout, on_line=None):
+        """
+        I send commands followed by an echo marker and return everything printed before the marker.
+        With on_line, I hand each line over as it arrives instead of collecting the output.
+        """
+        marker = f"BSOD_ANALYZER_DONE_{uuid.uuid4().hex}"
+        try:
+            self.process.stdin.write("\n".join(list(commands) + [f".echo {marker}"]) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise DebuggerSessionError(f"Could not send commands to debugger: {e}")
+
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._lines.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(self.command, timeout)
+            if line is None:
+                raise DebuggerSessionError("Debugger exited unexpectedly")
+            # The debugger prints its prompt before the echoed marker, but never echoes my input
+            if line.rstrip().endswith(marker) and ".echo" not in line:
+                return "".join(output)
+            if on_line is not None:
+                on_line(line)
+            else:
+                output.append(line)
+
+    def analyze(self, dump_file_path, timeout, on_line=None):
+        """
+        I open a dump in this session, run my analysis commands and detach again
+        """
+        if self.process is None:
+            self.start(dump_file_path, timeout)
+            open_commands = []
+        else:
+            open_commands = [f'.opendump "{dump_file_path}"', "g"]
+
+        output = self.execute(open_commands + ANALYSIS_COMMANDS, timeout, on_line)
+        self.execute([".detach"], timeout)
+        self.uses += 1
+        return output
+
+    def close(self, graceful=True):
+        """
+        I ask the debugger to quit, and kill it if it won't (or straight away if it's hung)
+        """
+        if self.process is None:
+            return
+        try:
+            if graceful and self.alive:
+                self.process.stdin.write("q\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+        except Exception:
+            pass
+        if self.alive:
+            self.process.kill()
+            try:
+                self.process.wait(timeout=5)
+            except Exception:
+                pass
+
+class DebuggerPool:
+    def __init__(self, command, size=2, symbol_cache=SYMBOL_CACHE, timeout=60, max_uses=50):
+        """
+        I reuse up to size debugger sessions across dumps. A session that hangs or
+        errors is killed, and every session is recycled after max_uses dumps.
+        """
+        self.command = list(command)
+        self.size = size
+        self.symbol_cache = symbol_cache
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.recycled = 0
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def analyze(self, dump_file_path, on_line=None):
+        """
+        I run my analysis commands on a dump in a warm session and return the raw output,
+        or stream it line by line to on_line
+        """
+        with self._slots:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                session = DebuggerSession(self.command, self.symbol_cache)
+
+            healthy = False
+            try:
+                output = session.analyze(dump_file_path, self.timeout, on_line)
+                healthy = True
+                return output
+            finally:
+                if healthy and session.alive and session.uses < self.max_uses:
+                    with self._lock:
+                        self._idle.append(session)
+                else:
+                    session.close(graceful=healthy)
+                    with self._lock:
+                        self.recycled += 1
+
+    def close(self):
+        """
+        I shut down every idle session
+        """
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            session.close()
+
+class WinDbgOutputParser:
+    """
+    I pick crash details out of debugger output one line at a time, so a multi-megabyte
+    !analyze -v and lm transcript is read once, while the debugger is still writing it
+    """
+    BUGCHECK_RE = re.compile(r"Bugcheck code: (0x[0-9a-fA-F]+)(?: \(([^)]+)\))?")
+    WORD_DOT_WORD_RE = re.compile(r"\w+\.\w+")
+    HEX_RE = re.compile(r"[0-9a-fA-F]+")
+    SYS_MODULE_RE = re.compile(r"([a-zA-Z0-9]+\.sys)\s")
+    RAW_OUTPUT_LIMIT = 5000  # I'm keeping only the start of the raw output to avoid massive responses
+
     def __init__(self):
+        self.stop_code = None
+        self.stop_code_name = None
+        self.cause = None
+        self.responsible_address = None
+        self._sys_modules = {}  # I only need fast membership and first-seen order, which a dict gives me
+        self._module_table = []
+        self._in_module_table = False
+        self._raw = []
+        self._raw_length = 0
+
+    def feed(self, line):
+        if self._raw_length < self.RAW_OUTPUT_LIMIT:
+            self._raw.append(line)
+            self._raw_length += len(line)
+
+        if self._in_module_table and self._read_module_row(line):
+            return
+        self._in_module_table = False
+
+        # Each field is taken from its first appearance, so I stop looking once I have it.
+        # cdb may print the code bare before it prints it with its name, so the name is looked for on its own.
+        if (self.stop_code is None or self.stop_code_name is None) and "Bugcheck code: " in line:
+            match = self.BUGCHECK_RE.search(line)
+            if match:
+                code, name = match.groups()
+                if self.stop_code is None:
+                    self.stop_code = code
+                if self.stop_code_name is None:
+                    self.stop_code_name = name
+        if self.cause is None and "Probably caused by : " in line:
+            self.cause = line.split("Probably caused by : ", 1)[1].rstrip("\r\n")
+        if self.responsible_address is None and "EXCEPTION_PARAMETER1: " in line:
+            match = self.HEX_RE.match(line.split("EXCEPTION_PARAMETER1: ", 1)[1])
+            if match:
+                self.responsible_address = match.group()
+        if ".sys" in line:
+            self._add_sys_modules(line)
+        if line.startswith("start ") and "module name" in line:
+            self._in_module_table = True
+
+    def _add_sys_modules(self, line):
+        for name in self.SYS_MODULE_RE.findall(line):
+            self._sys_modules.setdefault(name, None)
+
+    def _read_module_row(self, line):
+        # lm rows look like "fffff801`10000000 fffff801`10100000   mydrv    (deferred)"
+        fields = line.split(None, 3)
+        if len(fields) < 3:
+            return False
+        try:
+            start = int(fields[0].replace("`", ""), 16)
+            end = int(fields[1].replace("`", ""), 16)
+        except ValueError:
+            return False
+        self._module_table.append({
+            "name": fields[2],
+            "start": f"0x{start:016X}",
+            "end": f"0x{end:016X}",
+            "details": fields[3].strip() if len(fields) > 3 else ""
+        })
+        if ".sys" in line:
+            self._add_sys_modules(line)
+        return True
+
+    def results(self):
+        driver = self.WORD_DOT_WORD_RE.search(self.cause) if self.cause else None
+        return {
+            "stop_code": self.stop_code,
+            "stop_code_name": self.stop_code_name,
+            "cause": self.cause,
+            "responsible_driver": driver.group() if driver else None,
+            "responsible_address": self.responsible_address,
+            "loaded_modules": list(self._sys_modules),
+            "module_table": self._module_table,
+            "raw_output": "".join(self._raw)[:self.RAW_OUTPUT_LIMIT]
+        }
+
+class WinDbgAnalyzer:
+    def __init__(self, debugger_path=None, pool_size=None, symbol_cache=SYMBOL_CACHE, timeout=60):
         """I initialize my WinDbg analyzer by finding paths to debugging tools"""
         self.is_windows = platform.system() == "Windows"
         
@@ -27,8 +290,13 @@ class WinDbgAnalyzer:
         self.windbg_path = None
         self.available = False
         
+        # An explicit console debugger (or a scripted stand-in for testing) works on any platform
+        if debugger_path:
+            if os.path.exists(debugger_path):
+                self.windbg_path = debugger_path
+                self.available = True
         # I'm trying to find WinDbg or WinDbg Preview
-        if self.is_windows:
+        elif self.is_windows:
             for path in possible_paths:
                 # I'm checking for classic WinDbg (cdb.exe)
                 cdb_path = os.path.join(path, "cdb.exe")
@@ -44,62 +312,36 @@ class WinDbgAnalyzer:
                     self.available = True
                     break
         
+        self.pool = None
         if self.available:
             print(f"WinDbg found at: {self.windbg_path}")
+            self.pool = DebuggerPool(
+                [self.windbg_path],
+                size=pool_size or int(os.environ.get('WINDBG_SESSIONS', 2)),
+                symbol_cache=symbol_cache,
+                timeout=timeout
+            )
         else:
             print("WinDbg not found. Install Windows Debugging Tools for enhanced analysis.")
     
     def analyze_dump(self, dump_file_path):
         """
-        I use WinDbg to analyze a crash dump file
+        I use a warm WinDbg session to analyze a crash dump file
         Returns a dictionary with analysis results
         """
-        if not self.available or not self.is_windows:
+        if not self.available:
             return {"available": False, "error": "WinDbg not available"}
         
         if not os.path.exists(dump_file_path):
             return {"available": True, "error": "Dump file not found"}
         
         try:
-            # I'm creating a temporary file for the WinDbg commands
-            with tempfile.NamedTemporaryFile(suffix='.txt', delete=False, mode='w') as cmd_file:
-                # I'm writing common debugging commands to extract crash information
-                cmd_file.write(".symfix\n")  # Configure symbol path
-                cmd_file.write(".reload\n")  # Reload symbols
-                cmd_file.write("!analyze -v\n")  # Verbose crash analysis
-                cmd_file.write(".bugcheck\n")  # Display bugcheck information
-                cmd_file.write("lm\n")  # List loaded modules
-                cmd_file.write("q\n")  # Quit WinDbg
-                cmd_path = cmd_file.name
-            
-            # I'm running WinDbg with the command file
-            # I use CDB (Console Debugger) which is part of WinDbg
-            cmd = [self.windbg_path, "-z", dump_file_path, "-c", f"$$><{cmd_path}"]
-            print(f"Executing: {' '.join(cmd)}")
-            
-            # I'm executing the command and capturing output
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            stdout, stderr = process.communicate(timeout=60)  # 60 second timeout
-            
-            # I'm cleaning up by deleting the temporary command file
-            os.unlink(cmd_path)
-            
-            if process.returncode != 0:
-                return {
-                    "available": True,
-                    "success": False,
-                    "error": f"WinDbg exited with code {process.returncode}",
-                    "stderr": stderr
-                }
-            
-            # I'm parsing the WinDbg output to extract useful information
-            analysis_results = self._parse_windbg_output(stdout)
+            # I'm running my commands in a pooled session that keeps its symbols loaded,
+            # parsing each line of output as the debugger prints it
+            parser = WinDbgOutputParser()
+            with stage("windbg"):
+                self.pool.analyze(os.path.abspath(dump_file_path), on_line=parser.feed)
+            analysis_results = parser.results()
             analysis_results["available"] = True
             analysis_results["success"] = True
             
@@ -107,59 +349,19 @@ class WinDbgAnalyzer:
             
         except subprocess.TimeoutExpired:
             return {"available": True, "error": "WinDbg analysis timed out"}
+        except DebuggerSessionError as e:
+            return {"available": True, "success": False, "error": str(e)}
         except Exception as e:
             return {"available": True, "error": f"Error during WinDbg analysis: {str(e)}"}
     
     def _parse_windbg_output(self, output):
         """
-        I parse WinDbg output to extract crash information
+        I parse WinDbg output that has already been collected into one string
         """
-        results = {
-            "stop_code": None,
-            "stop_code_name": None,
-            "cause": None,
-            "responsible_driver": None,
-            "responsible_address": None,
-            "loaded_modules": []
-        }
-        
-        # I'm extracting the bugcheck code (stop code)
-        bugcheck_match = re.search(r"Bugcheck code: (0x[0-9a-fA-F]+)", output)
-        if bugcheck_match:
-            results["stop_code"] = bugcheck_match.group(1)
-        
-        # I'm extracting the bugcheck name
-        bugcheck_name_match = re.search(r"Bugcheck code: 0x[0-9a-fA-F]+ \(([^)]+)\)", output)
-        if bugcheck_name_match:
-            results["stop_code_name"] = bugcheck_name_match.group(1)
-        
-        # I'm finding the probable cause of the crash
-        cause_match = re.search(r"Probably caused by : ([^\r\n]+)", output)
-        if cause_match:
-            results["cause"] = cause_match.group(1)
-        
-        # I'm identifying the responsible driver
-        if results["cause"]:
-            driver_match = re.search(r"(\w+\.\w+)", results["cause"])
-            if driver_match:
-                results["responsible_driver"] = driver_match.group(1)
-        
-        # I'm extracting the problematic address
-        address_match = re.search(r"EXCEPTION_PARAMETER1: ([0-9a-fA-F]+)", output)
-        if address_match:
-            results["responsible_address"] = address_match.group(1)
-        
-        # I'm finding loaded modules that might be relevant to the crash
-        module_matches = re.finditer(r"([a-zA-Z0-9]+\.sys)\s+", output)
-        for match in module_matches:
-            module = match.group(1)
-            if module not in results["loaded_modules"]:
-                results["loaded_modules"].append(module)
-        
-        # I'm adding some of the raw output for advanced users who want more details
-        results["raw_output"] = output[:5000]  # I'm limiting to 5000 chars to avoid massive responses
-        
-        return results
+        parser = WinDbgOutputParser()
+        for line in output.splitlines(keepends=True):
+            parser.feed(line)
+        return parser.results()
 
 # I can test my analyzer with this example code
 if __name__ == "__main__":
@@ -3,6 +3,8 @@
 
 // API base URL
 const API_BASE = '';  // Empty string for relative URL to current host
+// Dumps bigger than this are uploaded in resumable parts
+const CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024;
 // Alternative: const API_BASE = window.location.origin;  // For absolute URL to current host
 
 // Wait for DOM to load
@@ -223,14 +225,21 @@ function formatCrashEvent(crash) {
     }
     showLoading();
     try {
-      const formData = new FormData();
-      formData.append('dumpFile', fileInput.files[0]);
-      const response = await fetch(`${API_BASE}/api/analyze-dump`, { 
-        method: 'POST',
-        body: formData
-      });
-      if (!response.ok) throw new Error(`Server error: ${response.status}`);
-      const results = await response.json();
+      const file = fileInput.files[0];
+      let results;
+      if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+        // Big kernel dumps go up in resumable parts, so a dropped connection only costs one part
+        results = await uploadInParts(file);
+      } else {
+        const formData = new FormData();
+        formData.append('dumpFile', file);
+        const response = await fetch(`${API_BASE}/api/analyze-dump`, { 
+          method: 'POST',
+          body: formData
+        });
+        if (!response.ok) throw await serverError(response);
+        results = await response.json();
+      }
       console.log('Dump analysis results:', results); // Debug
       displayResults(results);
     } catch (error) {
@@ -241,6 +250,60 @@ function formatCrashEvent(crash) {
     }
   }
 
+  // Turn a failed response into an Error carrying the server's own message and the status code
+  async function serverError(response) {
+    const data = await response.json().catch(() => ({}));
+    return Object.assign(new Error(data.error || `Server error: ${response.status}`), { status: response.status });
+  }
+
+  // Upload a large dump in parts and return the analysis. Each part is retried, and after a failure
+  // I ask the server which ranges it still needs, so the upload resumes instead of starting over.
+  async function uploadInParts(file) {
+    const created = await fetch(`${API_BASE}/api/uploads`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ filename: file.name, size: file.size })
+    });
+    if (!created.ok) throw await serverError(created);
+    const { uploadUrl, partSize } = await created.json();
+
+    let missing = [[0, file.size]];
+    for (let attempt = 0; missing.length > 0 && attempt < 5; attempt++) {
+      try {
+        for (const [start, end] of missing) {
+          for (let offset = start; offset < end; offset += partSize) {
+            const part = file.slice(offset, Math.min(offset + partSize, end));
+            const headers = { 'Content-Type': 'application/octet-stream' };
+            if (window.crypto && crypto.subtle) {
+              const digest = await crypto.subtle.digest('SHA-256', await part.arrayBuffer());
+              headers['X-Part-SHA256'] = Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+            }
+            const response = await fetch(`${API_BASE}${uploadUrl}?offset=${offset}`, { method: 'PUT', headers, body: part });
+            if (!response.ok) throw await serverError(response);
+            const status = await response.json();
+            // The dump's header usually reveals the stop code long before the last part is sent
+            if (status.earlyResult) {
+              displayResults({ ...status.earlyResult, analysisMethod: `Read from the dump header, ${Math.round(100 * status.received / file.size)}% uploaded` });
+            }
+          }
+        }
+        missing = [];
+      } catch (error) {
+        // Sending a file that isn't a dump, or is too big, again won't help
+        if (error.status === 413 || error.status === 415) throw error;
+        console.warn('Upload part failed, resuming:', error);
+        await new Promise(resolve => setTimeout(resolve, 1000 * (attempt + 1)));
+        const status = await fetch(`${API_BASE}${uploadUrl}`).then(r => r.json()).catch(() => ({ missing }));
+        missing = status.missing || missing;
+      }
+    }
+    if (missing.length > 0) throw new Error('Upload kept failing, please try again');
+
+    const response = await fetch(`${API_BASE}${uploadUrl}/complete`, { method: 'POST' });
+    if (!response.ok) throw new Error(`Server error: ${response.status}`);
+    return response.json();
+  }
+
   // Handle error code form submit
   async function handleCodeSubmit(e) {
     e.preventDefault();
@@ -275,12 +338,25 @@ function formatCrashEvent(crash) {
     showLoading();
     try {
       console.log('Starting system scan...'); // Debug
-      const response = await fetch(`${API_BASE}/api/scan-system`, {
+      const response = await fetch(`${API_BASE}/api/scan-system?stream=1`, {
         method: 'GET'
       });
       console.log('Scan response status:', response.status); // Debug
       if (!response.ok) throw new Error(`Server error: ${response.status}`);
-      const results = await response.json();
+
+      // Crashes arrive one NDJSON line at a time, so I show them as they come in
+      const results = { success: true, crashes: [] };
+      await readJsonLines(response, records => {
+        records.forEach(record => {
+          if (record.type === 'crash') {
+            results.crashes.push(record.crash);
+          } else if (record.type === 'summary') {
+            Object.assign(results, record);
+          }
+        });
+        results.crashes.sort((a, b) => (b.date || '').localeCompare(a.date || ''));
+        displayResults({ ...results, events_found: results.crashes.length });
+      });
       console.log('System scan results:', results); // Debug
       displayResults(results);
     } catch (error) {
@@ -291,6 +367,22 @@ function formatCrashEvent(crash) {
     }
   }
 
+  // Read a streamed NDJSON response, handing each chunk's complete lines to onRecords
+  async function readJsonLines(response, onRecords) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+      const lines = buffered.split('\n');
+      buffered = done ? '' : lines.pop();
+      const records = lines.filter(line => line.trim()).map(line => JSON.parse(line));
+      if (records.length > 0) onRecords(records);
+      if (done) break;
+    }
+  }
+
   // UI helpers
   function showLoading() {
     console.log('Showing loading indicator'); // Debug
@@ -388,6 +480,11 @@ function formatCrashEvent(crash) {
     if (result.description) {
       html += `<p>${result.description}</p>`;
     }
+
+    // Display the driver the crash happened in, when the dump's module list names it
+    if (result.driver) {
+      html += `<p><strong>Probably caused by:</strong> ${result.faultingModule || result.driver}</p>`;
+    }
     
     // Display common causes - check different property names
     let causes = result.causes || result.commonCauses || [];
@@ -0,0 +1,9 @@
+import pytest
+import app as app_module
+
+@pytest.fixture(autouse=True, scope="session")
+def uploads_folder(tmp_path_factory):
+    # I'm keeping everything the app writes out of the real uploads folder
+    folder = tmp_path_factory.mktemp("uploads")
+    app_module.init_app(str(folder))
+    yield folder
@@ -0,0 +1,37 @@
+"""
+A scripted stand-in for cdb.exe that follows the same stdin/stdout protocol.
+Each dump is a small text file: "<code> <name> <driver>", or "hang" to never answer.
+"""
+import os
+import sys
+import time
+
+def main():
+    target = sys.argv[sys.argv.index("-z") + 1] if "-z" in sys.argv else None
+    analyses = 0
+    for line in sys.stdin:
+        command = line.strip()
+        if command.startswith(".echo "):
+            print(f"0: kd> {command[6:]}", flush=True)
+        elif command.startswith(".opendump "):
+            target = command[len(".opendump "):].strip('"')
+            print(f"Loading Dump File [{target}]", flush=True)
+        elif command == ".detach":
+            target = None
+        elif command == "!analyze -v":
+            with open(target) as f:
+                fields = f.read().split()
+            if fields[0] == "hang":
+                time.sleep(3600)
+            analyses += 1
+            print(f"Session {os.getpid()} analysis {analyses}", flush=True)
+            print(f"Bugcheck code: {fields[0]} ({fields[1]})", flush=True)
+            print(f"Probably caused by : {fields[2]} ( {fields[2].split('.')[0]}+1234 )", flush=True)
+        elif command == "lm":
+            print("start             end                 module name", flush=True)
+            print("fffff801`10000000 fffff801`10100000   mydrv    mydrv.sys   ", flush=True)
+        elif command == "q":
+            return
+
+if __name__ == "__main__":
+    main()
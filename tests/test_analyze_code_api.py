@@ -26,4 +26,59 @@ def test_analyze_code_generic_fallback(client):
                       content_type="application/json")
     assert resp.status_code == 200
     body = resp.get_json()
-    assert "Generic BSOD" in body["description"] 
\ No newline at end of file
+    assert "Generic BSOD" in body["description"] 
+
+def test_lookup_etag_and_compression(client):
+    resp = client.get("/api/analyze-code?errorCode=MEMORY_MANAGEMENT")
+    assert resp.status_code == 200
+    assert resp.get_json()["code"] == "MEMORY_MANAGEMENT"
+    assert "public" in resp.headers["Cache-Control"]
+    etag = resp.headers["ETag"]
+
+    # Revalidating with the ETag costs nothing but a 304
+    resp = client.get("/api/analyze-code?errorCode=MEMORY_MANAGEMENT", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+
+    # A POST lookup can't be cached, so it carries no ETag or public Cache-Control
+    resp = client.post("/api/analyze-code", data=json.dumps({"errorCode": "MEMORY_MANAGEMENT"}),
+                       content_type="application/json", headers={"Accept-Encoding": "gzip"})
+    assert resp.get_json()["code"] == "MEMORY_MANAGEMENT"
+    assert "ETag" not in resp.headers and "Cache-Control" not in resp.headers
+    assert "Content-Encoding" not in resp.headers
+
+    import gzip
+    resp = client.get("/api/debug/errors", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["ETag"].endswith('-gzip"')
+    assert json.loads(gzip.decompress(resp.data))["errorCodes"]
+
+def test_analyze_codes_bulk_map(client):
+    resp = client.post("/api/analyze-codes",
+                       data=json.dumps({"codes": ["0x1A", "memory_management", "0x0000001a", "NOT_A_CODE"]}),
+                       content_type="application/json")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    # Each distinct spelling is resolved once and keyed as I normalized it
+    assert set(body["results"]) == {"0X1A", "MEMORY_MANAGEMENT", "0X0000001A", "NOT_A_CODE"}
+    assert body["results"]["0X1A"]["code"] == body["results"]["MEMORY_MANAGEMENT"]["code"] == "MEMORY_MANAGEMENT"
+    assert body["matched"] == 3 and body["unmatched"] == ["NOT_A_CODE"]
+
+    resp = client.post("/api/analyze-codes", data=json.dumps({"codes": "0x1A"}), content_type="application/json")
+    assert resp.status_code == 400
+
+def test_analyze_codes_ndjson_stream(client):
+    lines = "\n".join(['"0x0000000A"', "IRQL_NOT_LESS_OR_EQUAL", "irql_not_less_or_equal", "", "UNKNOWN"])
+    resp = client.post("/api/analyze-codes", data=lines, content_type="application/x-ndjson")
+    records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [(r.get("code"), r.get("matched")) for r in records[:-1]] == [
+        ("0X0000000A", True), ("IRQL_NOT_LESS_OR_EQUAL", True), ("UNKNOWN", False)
+    ]
+    assert records[-1] == {"type": "summary", "codes": 3, "matched": 2}
+
+def test_search_endpoint(client):
+    body = client.get("/api/search?q=kmode+exeption&limit=2").get_json()
+    assert body["query"] == "kmode exeption"
+    assert body["results"][0]["code"] == "KMODE_EXCEPTION_NOT_HANDLED"
+    assert len(body["results"]) <= 2 and 0 < body["results"][0]["score"] <= 1
+    assert client.get("/api/search?q=").status_code == 400
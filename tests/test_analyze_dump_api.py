@@ -1,23 +1,280 @@
 import io
 import pytest
+import app as app_module
 from app import app
+from result_cache import ResultCache
+from crash_history import CrashHistory
 
 @pytest.fixture
-def client():
+def client(tmp_path, monkeypatch):
+    # I'm giving each test its own empty result cache
+    monkeypatch.setattr(app_module, "result_cache", ResultCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(app_module, "crash_history", CrashHistory(str(tmp_path / "history.sqlite3")))
     app.config['TESTING'] = True
     with app.test_client() as c:
         yield c
 
+def unparsed_dump(fill, size):
+    # A minidump signature followed by nothing my parser recognises, so the size heuristic decides
+    return b"MDMP" + fill * (size - 4)
+
 def test_analyze_dump_no_file(client):
     resp = client.post("/api/analyze-dump", data={})
     assert resp.status_code == 400
 
 def test_analyze_dump_small_file(client):
     data = {
-      'dumpFile': (io.BytesIO(b"\x00"*500_000), 'small.dmp')
+      'dumpFile': (io.BytesIO(unparsed_dump(b"\x00", 500_000)), 'small.dmp')
     }
     resp = client.post("/api/analyze-dump", data=data, content_type='multipart/form-data')
     body = resp.get_json()
     assert resp.status_code == 200
     # Heuristic should pick MEMORY_MANAGEMENT (0x1A)
     assert body["code"] == "MEMORY_MANAGEMENT"
+
+def test_analyze_dump_async_job(client):
+    import time
+    data = {
+      'dumpFile': (io.BytesIO(unparsed_dump(b"\x00", 500_000)), 'small.dmp'),
+      'mode': 'async'
+    }
+    resp = client.post("/api/analyze-dump", data=data, content_type='multipart/form-data')
+    assert resp.status_code == 202
+    status_url = resp.get_json()["statusUrl"]
+
+    # I'm polling until my background worker has finished
+    for _ in range(100):
+        job = client.get(status_url).get_json()
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "done"
+    assert job["result"]["code"] == "MEMORY_MANAGEMENT"
+
+def test_unknown_job(client):
+    assert client.get("/api/jobs/does-not-exist").status_code == 404
+
+def test_repeat_upload_hits_cache(client):
+    def upload():
+        data = {'dumpFile': (io.BytesIO(unparsed_dump(b"\x01", 200_000)), 'repeat.dmp')}
+        return client.post("/api/analyze-dump", data=data, content_type='multipart/form-data')
+
+    first, second = upload(), upload()
+    assert first.headers["X-Result-Cache"] == "MISS"
+    assert second.headers["X-Result-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert client.get("/api/cache/stats").get_json()["hits"] == 1
+
+def test_analyze_dumps_batch_zip(client):
+    import json
+    import zipfile
+    # I'm zipping two identical dumps and one different one, and adding a loose part too
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr('a.dmp', unparsed_dump(b"\x02", 1000))
+        z.writestr('nested/b.dmp', unparsed_dump(b"\x02", 1000))
+        z.writestr('c.dmp', unparsed_dump(b"\x03", 2_000_000))
+        z.writestr('README.txt', b"Dumps collected from the fleet")
+    archive.seek(0)
+    data = {'dumpFile': [(archive, 'fleet.zip'), (io.BytesIO(unparsed_dump(b"\x04", 500)), 'loose.dmp')]}
+    resp = client.post("/api/analyze-dumps", data=data, content_type='multipart/form-data')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(l) for l in resp.get_data(as_text=True).splitlines()]
+    results = {l["file"]: l["result"]["code"] for l in lines if l["type"] == "result"}
+    assert results == {
+        "a.dmp": "MEMORY_MANAGEMENT",
+        "nested/b.dmp": "MEMORY_MANAGEMENT",
+        "c.dmp": "DRIVER_IRQL_NOT_LESS_OR_EQUAL",
+        "loose.dmp": "MEMORY_MANAGEMENT",
+    }
+    assert [l["file"] for l in lines if l["type"] == "error"] == ["README.txt"]
+    summary = lines[-1]
+    assert summary["type"] == "summary"
+    assert summary["files"] == 5
+    assert summary["failed"] == 1
+    assert summary["stopCodes"] == {"MEMORY_MANAGEMENT": 3, "DRIVER_IRQL_NOT_LESS_OR_EQUAL": 1}
+
+def test_analyze_dumps_requires_files(client):
+    assert client.post("/api/analyze-dumps", data={}).status_code == 400
+
+def test_sync_analysis_never_writes_upload(client, tmp_path, monkeypatch):
+    # I'm pointing uploads at an empty folder; a 2MB upload is spooled and memory-mapped, not saved
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    monkeypatch.setattr(app_module, "UPLOAD_FOLDER", str(uploads))
+    data = {'dumpFile': (io.BytesIO(unparsed_dump(b"\x05", 2_000_000)), 'big.dmp')}
+    resp = client.post("/api/analyze-dump", data=data, content_type='multipart/form-data')
+    assert resp.status_code == 200
+    assert resp.get_json()["code"] == "DRIVER_IRQL_NOT_LESS_OR_EQUAL"
+    assert list(uploads.iterdir()) == []
+
+def test_non_dump_upload_is_refused_before_analysis(client, tmp_path, monkeypatch):
+    # I'm checking an RTF document is turned away with 415 in both modes, and never lands in my uploads folder
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    monkeypatch.setattr(app_module, "UPLOAD_FOLDER", str(uploads))
+    for mode in ("sync", "async"):
+        data = {'dumpFile': (io.BytesIO(b"{\\rtf1\\ansi " + b"x" * 600_000 + b"}"), 'notes.rtf'), 'mode': mode}
+        resp = client.post("/api/analyze-dump", data=data, content_type='multipart/form-data')
+        assert resp.status_code == 415
+        assert resp.get_json()["type"] == "unsupported_media"
+    assert list(uploads.iterdir()) == []
+    assert client.post("/api/analyze-dump", data={'dumpFile': (io.BytesIO(b"MDM"), 'tiny.dmp')},
+                       content_type='multipart/form-data').status_code == 415
+
+def test_oversized_upload_is_refused_from_its_length(client, monkeypatch):
+    from upload_guard import UploadRequest
+    monkeypatch.setitem(UploadRequest.size_limits, "analyze_dump", 1000)
+    resp = client.post("/api/analyze-dump", data={'dumpFile': (io.BytesIO(unparsed_dump(b"\x00", 2000)), 'big.dmp')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 413
+    assert resp.get_json()["limit"] == 1000
+    # Routes without their own limit share MAX_CONTENT_LENGTH
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", 10)
+    assert client.post("/api/uploads", json={"filename": "MEMORY.DMP", "size": 4096}).status_code == 413
+
+def test_small_sync_upload_stays_in_memory(client, monkeypatch):
+    # I'm checking what the parser is handed: a BytesIO for a small upload, a real file for a large one
+    spools = []
+    open_dump_buffer = app_module.open_dump_buffer
+
+    def recording_open(source):
+        spools.append(getattr(source, "_target", source))
+        return open_dump_buffer(source)
+
+    monkeypatch.setattr(app_module, "open_dump_buffer", recording_open)
+    for size in (100_000, 600_000):
+        data = {'dumpFile': (io.BytesIO(unparsed_dump(b"\x00", size)), 'small.dmp')}
+        assert client.post("/api/analyze-dump", data=data, content_type='multipart/form-data').status_code == 200
+    assert isinstance(spools[0], io.BytesIO)
+    import tempfile
+    assert not isinstance(spools[-2], (io.BytesIO, tempfile.SpooledTemporaryFile))
+
+def test_scan_system_streams_ndjson(client, monkeypatch):
+    import json
+    import platform
+
+    def crashes():
+        yield {"date": "2025-05-01 08:16:10", "error_code": "MEMORY_MANAGEMENT"}
+        yield {"date": "2025-05-03 11:02:47", "error_code": "IRQL_NOT_LESS_OR_EQUAL"}
+        raise RuntimeError("RPC server went away")
+
+    monkeypatch.setattr(platform, "system", lambda: "Windows")
+    monkeypatch.setattr(app_module, "open_system_scan", lambda mode: (crashes(), None))
+    resp = client.get("/api/scan-system?stream=1")
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [line["type"] for line in lines] == ["crash", "crash", "summary"]
+    assert lines[-1]["events_found"] == 2
+    assert "RPC server went away" in lines[-1]["warning"]
+
+def test_incremental_scan_reads_earlier_crashes_from_history(client, tmp_path, monkeypatch):
+    import os
+    import platform
+    import event_viewer_scanner
+    fixture = os.path.join(os.path.dirname(__file__), "fixtures", "system_events.json")
+    monkeypatch.setattr(platform, "system", lambda: "Windows")
+    monkeypatch.setattr(event_viewer_scanner, "load_pywin32", lambda: True)
+    monkeypatch.setattr(event_viewer_scanner, "Win32EventLogSource",
+                        lambda: event_viewer_scanner.RecordedEventSource(fixture))
+    monkeypatch.setattr(app_module, "SCAN_STATE_PATH", str(tmp_path / "scan-state.json"))
+    # Scans look codes up in the knowledge base's own index rather than building another one
+    monkeypatch.setattr(event_viewer_scanner, "ErrorCodeIndex", None)
+
+    first = client.get("/api/scan-system").get_json()
+    assert [c["date"] for c in first["crashes"]] == ["2025-05-03 11:02:47", "2025-05-01 08:16:10"]
+    assert not any(c.get("stored") for c in first["crashes"])
+
+    # Nothing new in the log: the same crashes come back from the history store, and aren't stored again
+    second = client.get("/api/scan-system").get_json()
+    assert [c["date"] for c in second["crashes"]] == ["2025-05-03 11:02:47", "2025-05-01 08:16:10"]
+    assert all(c["stored"] for c in second["crashes"])
+    assert second["crashes"][0]["error_code"] == "IRQL_NOT_LESS_OR_EQUAL"
+    assert len(client.get("/api/history").get_json()["crashes"]) == 2
+
+def test_history_endpoint_lists_analyzed_dumps(client):
+    from test_minidump_parser import build_minidump
+    dump = build_minidump(0x1A, [0x41790, 0, 0, 0], written=1746270167)
+    client.post("/api/analyze-dump", data={'dumpFile': (io.BytesIO(dump), 'Mini.dmp')},
+                content_type='multipart/form-data')
+    # A stop code guessed from the file size isn't a crash worth remembering
+    data = {'dumpFile': (io.BytesIO(unparsed_dump(b"\x00", 500_000)), 'small.dmp')}
+    client.post("/api/analyze-dump", data=data, content_type='multipart/form-data')
+
+    body = client.get("/api/history?code=MEMORY_MANAGEMENT").get_json()
+    assert [c["stopCode"] for c in body["crashes"]] == ["MEMORY_MANAGEMENT"]
+    # ...and the crash is filed under when the dump was written, not when it was analyzed
+    assert body["crashes"][0]["timestamp"] == 1746270167
+    assert body["next"] is None
+    assert client.get("/api/history/stop-codes").get_json()["stopCodes"] == {"MEMORY_MANAGEMENT": 1}
+    assert client.get("/api/history?from=yesterday").status_code == 400
+
+@pytest.mark.skipif(not app_module.REGISTRY.enabled, reason="METRICS_ENABLED=0")
+def test_metrics_endpoint_reports_stages(client):
+    import struct
+    header = bytearray(0x2000)
+    header[0:8] = b"PAGEDU64"
+    struct.pack_into("<I4xQQQQ", header, 0x38, 0x0000001A, 0, 0, 0, 0)
+    client.post("/api/analyze-dump", data={'dumpFile': (io.BytesIO(bytes(header)), 'metrics.dmp')},
+                content_type='multipart/form-data')
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    text = resp.get_data(as_text=True)
+    assert 'bsod_stage_duration_seconds_count{stage="parse"}' in text
+    assert 'bsod_dump_analyses_total{method="basic_parser"}' in text
+    assert 'bsod_request_duration_seconds_count{endpoint="analyze_dump",status="200"}' in text
+    assert 'bsod_analysis_jobs{status="queued"}' in text
+
+def test_parsed_stop_code_beats_size_heuristic(client):
+    import struct
+    header = bytearray(0x2000)
+    header[0:8] = b"PAGEDU64"
+    struct.pack_into("<I4xQQQQ", header, 0x38, 0x0000000A, 0, 0x2, 0, 0)
+    resp = client.post("/api/analyze-dump", data={'dumpFile': (io.BytesIO(bytes(header)), 'MEMORY.DMP')},
+                       content_type='multipart/form-data')
+    body = resp.get_json()
+    assert body["code"] == "IRQL_NOT_LESS_OR_EQUAL"
+    assert body["analysisMethod"] == "Dump bug check record"
+
+def test_chunked_upload_api(client, tmp_path, monkeypatch):
+    import struct
+    from chunked_upload import ChunkedUploads
+    monkeypatch.setattr(app_module, "chunked_uploads", ChunkedUploads(str(tmp_path / "chunked")))
+    data = bytearray(0x3000)
+    data[0:8] = b"PAGEDU64"
+    struct.pack_into("<I4xQQQQ", data, 0x38, 0x0000000A, 0, 0x2, 0, 0)
+
+    created = client.post("/api/uploads", json={"filename": "MEMORY.DMP", "size": len(data)})
+    assert created.status_code == 201
+    url = created.get_json()["uploadUrl"]
+
+    first = client.put(f"{url}?offset=0", data=bytes(data[:0x1000]), content_type="application/octet-stream")
+    assert first.get_json()["earlyResult"]["code"] == "IRQL_NOT_LESS_OR_EQUAL"
+    assert client.post(f"{url}/complete").status_code == 409
+    assert client.get(url).get_json()["missing"] == [[0x1000, 0x3000]]
+
+    client.put(f"{url}?offset=4096", data=bytes(data[0x1000:]), content_type="application/octet-stream")
+    done = client.post(f"{url}/complete")
+    assert done.status_code == 200
+    assert done.get_json()["code"] == "IRQL_NOT_LESS_OR_EQUAL"
+    assert client.get(url).status_code == 404
+
+    # A session whose first part isn't a dump is refused and dropped
+    url = client.post("/api/uploads", json={"filename": "notes.rtf", "size": 4096}).get_json()["uploadUrl"]
+    junk = client.put(f"{url}?offset=0", data=b"{\\rtf1" + bytes(4090), content_type="application/octet-stream")
+    assert junk.status_code == 415
+    assert client.get(url).status_code == 404
+
+def test_dump_response_names_the_faulting_driver(client):
+    from test_minidump_parser import build_minidump
+    modules = [("\\SystemRoot\\system32\\drivers\\nvlddmkm.sys", 0xFFFFF80001000000, 0x400000, 0x5F000000)]
+    dump = build_minidump(0x50, [0xFFFFF80012345678, 0, 0xFFFFF80001000ABC, 0], 0, modules)
+    resp = client.post("/api/analyze-dump", data={'dumpFile': (io.BytesIO(dump), 'Mini.dmp')},
+                       content_type='multipart/form-data')
+    body = resp.get_json()
+    assert body["driver"] == "nvlddmkm.sys"
+    assert body["faultingModule"] == "nvlddmkm.sys+0xABC"
+    assert client.get("/api/history").get_json()["crashes"][0]["driver"] == "nvlddmkm.sys"
@@ -0,0 +1,92 @@
+import io
+import struct
+import hashlib
+import pytest
+from chunked_upload import ChunkedUploads, UploadError, add_range, missing_ranges
+
+def kernel_dump(size):
+    # I'm building a PAGEDU64 dump whose bug check sits in the first page, followed by filler
+    data = bytearray(size)
+    data[0:8] = b"PAGEDU64"
+    struct.pack_into("<I4xQQQQ", data, 0x38, 0x0000001A, 0x41790, 0x2, 0x0, 0x0)
+    data[0x2000:] = bytes(range(256)) * ((size - 0x2000) // 256)
+    return bytes(data)
+
+def test_ranges_merge_and_report_gaps():
+    ranges = add_range([], 10, 20)
+    ranges = add_range(ranges, 30, 40)
+    ranges = add_range(ranges, 20, 30)
+    assert ranges == [[10, 40]]
+    assert missing_ranges(ranges, 50) == [[0, 10], [40, 50]]
+
+def test_out_of_order_parts_resume_and_complete(tmp_path):
+    data = kernel_dump(0x2000 + 256 * 64)
+    uploads = ChunkedUploads(str(tmp_path))
+    upload_id = uploads.create("MEMORY.DMP", len(data))["uploadId"]
+
+    # The tail arrives first, so the stop code isn't known yet
+    status = uploads.write_part(upload_id, 0x1000, io.BytesIO(data[0x1000:]), len(data) - 0x1000)
+    assert status["missing"] == [[0, 0x1000]] and status["earlyResult"] is None
+
+    # A restarted server picks the session back up from its state file
+    resumed = ChunkedUploads(str(tmp_path))
+    assert resumed.status(upload_id)["received"] == len(data) - 0x1000
+    with pytest.raises(UploadError) as error:
+        resumed.complete(upload_id)
+    assert error.value.status == 409
+
+    header = data[:0x1000]
+    status = resumed.write_part(upload_id, 0, io.BytesIO(header), len(header),
+                                sha256=hashlib.sha256(header).hexdigest())
+    assert status["earlyResult"]["code"] == "MEMORY_MANAGEMENT"
+
+    path, digest, _ = resumed.complete(upload_id)
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert digest == hashlib.blake2b(data, digest_size=32).hexdigest()
+
+def test_header_part_alone_reveals_stop_code(tmp_path):
+    data = kernel_dump(0x2000 + 256 * 64)
+    uploads = ChunkedUploads(str(tmp_path))
+    upload_id = uploads.create("MEMORY.DMP", len(data))["uploadId"]
+    status = uploads.write_part(upload_id, 0, io.BytesIO(data[:0x1000]), 0x1000)
+    assert status["earlyResult"]["hexCode"] == "0x0000001A"
+    assert status["received"] < len(data)
+
+def test_bad_parts_are_rejected(tmp_path):
+    uploads = ChunkedUploads(str(tmp_path), max_size=1000, max_part_size=100)
+    with pytest.raises(UploadError) as error:
+        uploads.create("huge.dmp", 1001)
+    assert error.value.status == 413
+
+    upload_id = uploads.create("small.dmp", 200)["uploadId"]
+    for offset, length, status in [(150, 100, 416), (0, 101, 413)]:
+        with pytest.raises(UploadError) as error:
+            uploads.write_part(upload_id, offset, io.BytesIO(b"x" * length), length)
+        assert error.value.status == status
+
+    # A part whose checksum doesn't match doesn't count as received
+    with pytest.raises(UploadError) as error:
+        uploads.write_part(upload_id, 0, io.BytesIO(b"MDMP" + b"x" * 96), 100, sha256="00" * 32)
+    assert error.value.status == 422
+    assert uploads.status(upload_id)["received"] == 0
+
+    # A checksummed part that arrives corrupt never reaches the upload file
+    good = b"MDMP" + b"a" * 96
+    uploads.write_part(upload_id, 100, io.BytesIO(b"b" * 100), 100)
+    with pytest.raises(UploadError) as error:
+        uploads.write_part(upload_id, 0, io.BytesIO(good), 100, sha256=hashlib.sha256(b"MDMP" + b"c" * 96).hexdigest())
+    assert error.value.status == 422
+    with open(uploads._session(upload_id).data_path, "rb") as f:
+        assert f.read(100) == bytes(100)
+
+    # Nor does a resend of a range I already have, checksummed or not
+    uploads.write_part(upload_id, 0, io.BytesIO(good), 100, sha256=hashlib.sha256(good).hexdigest())
+    status = uploads.write_part(upload_id, 0, io.BytesIO(b"MDMP" + b"z" * 96), 100)
+    assert status["received"] == 200
+    with open(uploads._session(upload_id).data_path, "rb") as f:
+        assert f.read() == good + b"b" * 100
+
+    uploads.abort(upload_id)
+    with pytest.raises(UploadError):
+        uploads.status(upload_id)
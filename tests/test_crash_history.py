@@ -0,0 +1,48 @@
+from crash_history import CrashHistory, parse_time
+
+def event(date, code, event_id="1001", host=None):
+    crash = {"date": date, "error_code": code, "event_id": event_id, "event_source": "BugCheck",
+             "parameters": ["0x0000000000041792", "0x0"]}
+    if host:
+        crash["host"] = host
+    return crash
+
+def test_records_are_deduplicated_and_filtered(tmp_path):
+    history = CrashHistory(str(tmp_path / "history.sqlite3"))
+    crashes = [
+        event("2025-05-01 08:16:10", "MEMORY_MANAGEMENT", host="web01"),
+        event("2025-05-03 11:02:47", "IRQL_NOT_LESS_OR_EQUAL", host="web01"),
+        event("2025-05-03 11:02:47", "IRQL_NOT_LESS_OR_EQUAL", host="web02"),
+    ]
+    assert history.record_events(crashes) == 3
+    # A rescan finds the same events again and adds nothing
+    assert history.record_events(crashes) == 0
+    assert history.record_dump("ab" * 32, {"code": "MEMORY_MANAGEMENT", "parameters": ["0x1A"]},
+                               timestamp=parse_time("2025-05-02")) == 1
+    assert history.record_dump("ab" * 32, {"code": "MEMORY_MANAGEMENT"}) == 0
+
+    newest = history.query()
+    assert [c["date"] for c in newest] == [
+        "2025-05-03 11:02:47", "2025-05-03 11:02:47", "2025-05-02 00:00:00", "2025-05-01 08:16:10"
+    ]
+    assert newest[0]["parameters"] == ["0x0000000000041792", "0x0000000000000000"]
+
+    in_range = history.query(start=parse_time("2025-05-02"), end=parse_time("2025-05-03"))
+    assert [(c["source"], c["stopCode"]) for c in in_range] == [("dump", "MEMORY_MANAGEMENT")]
+    assert len(history.query(stop_code="memory_management")) == 2
+    assert [c["host"] for c in history.query(host="web02")] == ["web02"]
+    assert history.stop_code_counts() == {"MEMORY_MANAGEMENT": 2, "IRQL_NOT_LESS_OR_EQUAL": 2}
+
+def test_paging_follows_time_order(tmp_path):
+    history = CrashHistory(str(tmp_path / "history.sqlite3"))
+    # I'm inserting out of time order so row ids and timestamps disagree
+    history.record_events([event(f"2025-05-{day:02d} 10:00:00", "MEMORY_MANAGEMENT") for day in (5, 1, 9, 3, 7)])
+
+    pages, before = [], None
+    while True:
+        page = history.query(limit=2, before=before)
+        if not page:
+            break
+        pages.append([c["date"][8:10] for c in page])
+        before = (page[-1]["timestamp"], page[-1]["id"])
+    assert pages == [["09", "07"], ["05", "03"], ["01"]]
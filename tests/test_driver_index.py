@@ -0,0 +1,35 @@
+from driver_index import ModuleRanges, DriverIndex, attribute_driver
+
+def module(name, base, size):
+    return {"name": name, "path": f"\\SystemRoot\\system32\\drivers\\{name}", "base": base, "size": size, "timestamp": 0}
+
+MODULES = [
+    module("ntoskrnl.exe", 0xFFFFF80000000000, 0x1000000),
+    module("storport.sys", 0xFFFFF80002000000, 0x80000),
+    module("nvlddmkm.sys", 0xFFFFF80001000000, 0x400000),
+]
+
+def test_module_ranges_binary_search():
+    ranges = ModuleRanges(MODULES)
+    assert ranges.find(0xFFFFF80001001234)["name"] == "nvlddmkm.sys"
+    assert ranges.find(0xFFFFF80000000000)["name"] == "ntoskrnl.exe"
+    # Gaps between modules, and addresses on either side of them all, belong to nobody
+    assert ranges.find(0xFFFFF80001400000) is None
+    assert ranges.find(0xFFFFF7FFFFFFFFFF) is None
+    assert ranges.find(0xFFFFF80002080000) is None
+
+def test_attribution_falls_back_to_the_faulting_parameter():
+    # IRQL_NOT_LESS_OR_EQUAL keeps the faulting instruction in its fourth parameter
+    bugcheck = {"code": 0x0A, "parameters": [0x10, 2, 0, 0xFFFFF80002000040], "address": None}
+    driver = attribute_driver(MODULES, bugcheck)
+    assert driver["name"] == "storport.sys"
+    assert driver["offset"] == 0x40
+    assert attribute_driver(MODULES, {"code": 0x1A, "parameters": [0xFFFFF80002000040], "address": 0}) is None
+
+def test_driver_index_interns_names_without_case():
+    index = DriverIndex()
+    first = index.intern("NVLDDMKM.SYS")
+    assert index.intern("nvlddmkm.sys") is first
+    index.intern("storport.sys")
+    assert len(index) == 2
+    assert index.intern(None) is None
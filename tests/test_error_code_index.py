@@ -0,0 +1,56 @@
+import pytest
+from error_code_index import ErrorCodeIndex, SubstringIndex, normalize_hex
+
+@pytest.fixture
+def index():
+    # I'm using a tiny database so I know exactly which entry should win
+    return ErrorCodeIndex({"errorCodes": [
+        {"code": "MEMORY_MANAGEMENT", "hexCode": "0x0000001A"},
+        {"code": "IRQL_NOT_LESS_OR_EQUAL", "hexCode": "0x0000000A"},
+        {"code": "DRIVER_IRQL_NOT_LESS_OR_EQUAL", "hexCode": "0x000000D1"},
+    ]})
+
+def test_normalize_hex_formats():
+    assert normalize_hex("0xA") == normalize_hex("0x0000000A") == normalize_hex("0X0A") == "0XA"
+    assert normalize_hex("0x0") == "0X0"
+    assert normalize_hex("MEMORY_MANAGEMENT") == "MEMORY_MANAGEMENT"
+
+@pytest.mark.parametrize("code", ["0xA", "0x0000000A", "0X0A", "irql_not_less_or_equal", "IRQL NOT LESS OR EQUAL"])
+def test_exact_lookups(index, code):
+    assert index.lookup(code)["code"] == "IRQL_NOT_LESS_OR_EQUAL"
+
+def test_partial_name_prefers_database_order(index):
+    # Both IRQL entries contain this text, so the earlier one wins
+    assert index.lookup("NOT_LESS")["code"] == "IRQL_NOT_LESS_OR_EQUAL"
+    # The database name is contained in a longer query
+    assert index.lookup("MEMORY_MANAGEMENT_ERROR")["code"] == "MEMORY_MANAGEMENT"
+
+def test_partial_hex_and_miss(index):
+    assert index.lookup("000000D1")["code"] == "DRIVER_IRQL_NOT_LESS_OR_EQUAL"
+    assert index.lookup("UNKNOWN_CODE") is None
+
+def test_substring_index_matches_linear_scan():
+    keys = ["ALPHA", "BETA", "ALPHABET", "GAMMA"]
+    substring_index = SubstringIndex(enumerate(keys))
+    for text in ["ALP", "BET", "MM", "ALPHABETA", "XGAMMAX", "ZZZ"]:
+        expected = next((i for i, k in enumerate(keys) if text in k or k in text), None)
+        assert substring_index.find_first(text) == expected
+
+@pytest.mark.parametrize("query, expected", [
+    ("IRQL_NOT_LES_OR_EQUAL", "IRQL_NOT_LESS_OR_EQUAL"),
+    ("memry managment", "MEMORY_MANAGEMENT"),
+    ("driver irql", "DRIVER_IRQL_NOT_LESS_OR_EQUAL"),
+])
+def test_search_tolerates_typos(index, query, expected):
+    assert index.search(query)[0][1]["code"] == expected
+
+def test_search_puts_exact_hex_first_and_ranks_text():
+    index = ErrorCodeIndex({"errorCodes": [
+        {"code": "MEMORY_MANAGEMENT", "hexCode": "0x0000001A", "description": "A severe memory management error."},
+        {"code": "KERNEL_DATA_INPAGE_ERROR", "hexCode": "0x0000007A",
+         "description": "Data could not be read from the paging file.", "commonCauses": ["Failing hard disk"]},
+    ]})
+    results = index.search("0x1a")
+    assert results[0] == (1.0, index.entries[0])
+    assert index.search("failng disk")[0][1]["code"] == "KERNEL_DATA_INPAGE_ERROR"
+    assert index.search("???") == []
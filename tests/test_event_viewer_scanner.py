@@ -0,0 +1,153 @@
+import os
+import json
+import platform
+import pytest
+import event_viewer_scanner
+from event_viewer_scanner import (
+    RecordedEventSource, iter_event_viewer_incremental, merge_crash_events, scan_crash_text,
+    scan_event_viewer_incremental
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "system_events.json")
+ERROR_CODES = {"errorCodes": [
+    {"code": "MEMORY_MANAGEMENT", "hexCode": "0x0000001A", "description": "Memory"},
+    {"code": "IRQL_NOT_LESS_OR_EQUAL", "hexCode": "0x0000000A", "description": "IRQL"},
+]}
+
+class CountingSource(RecordedEventSource):
+    # I'm counting how many records each scan actually pulls from the log
+    reads = 0
+
+    def read_records(self, log_name):
+        for record in super().read_records(log_name):
+            self.reads += 1
+            yield record
+
+def test_incremental_scan_reads_only_new_records(tmp_path):
+    state_path = str(tmp_path / "scan-state.json")
+    source = CountingSource(FIXTURE)
+
+    crashes = scan_event_viewer_incremental(source, state_path, ERROR_CODES)
+    assert [c["error_code"] for c in crashes] == ["IRQL_NOT_LESS_OR_EQUAL", "MEMORY_MANAGEMENT"]
+    assert crashes[0]["dump_file"].endswith("050325-9876-01.dmp")
+
+    # Nothing new: I only peek at the newest record before stopping at my cursor
+    source.reads = 0
+    assert scan_event_viewer_incremental(source, state_path, ERROR_CODES) == []
+    assert source.reads == 1
+
+    # One new crash is all the next scan returns
+    source.logs["System"].append({
+        "RecordNumber": 105, "TimeGenerated": "2025-05-04 09:00:00", "SourceName": "BugCheck", "EventID": 1001,
+        "StringInserts": ["0x0000001a (0x0000000000005003, 0x0, 0x0, 0x0)"]
+    })
+    source.reads = 0
+    crashes = scan_event_viewer_incremental(source, state_path, ERROR_CODES)
+    assert [c["date"] for c in crashes] == ["2025-05-04 09:00:00"]
+    assert source.reads == 2
+
+    # The state file only holds cursors; the crash history keeps the crashes
+    with open(state_path) as f:
+        assert json.load(f) == {"cursors": {"System": {"record_number": 105}}}
+
+def test_cleared_log_resets_cursor(tmp_path):
+    state_path = str(tmp_path / "scan-state.json")
+    source = RecordedEventSource(FIXTURE)
+    scan_event_viewer_incremental(source, state_path, ERROR_CODES)
+
+    # I'm simulating a cleared log whose record numbers start over
+    source.logs["System"] = [{
+        "RecordNumber": 1, "TimeGenerated": "2025-06-01 12:00:00", "SourceName": "BugCheck", "EventID": 1001,
+        "StringInserts": ["0x0000000a (0x0, 0x2, 0x0, 0x0)"]
+    }]
+    crashes = scan_event_viewer_incremental(source, state_path, ERROR_CODES)
+    assert [c["date"] for c in crashes] == ["2025-06-01 12:00:00"]
+
+def test_backlog_larger_than_max_events_is_read_over_several_scans(tmp_path):
+    state_path = str(tmp_path / "scan-state.json")
+    source = CountingSource(FIXTURE)
+    scan_event_viewer_incremental(source, state_path, ERROR_CODES)
+
+    # Six records arrive between two scans, three of them crashes, but each scan may only read two
+    for number in range(105, 111):
+        source.logs["System"].append({
+            "RecordNumber": number, "TimeGenerated": f"2025-05-04 09:00:{number - 100:02d}",
+            "SourceName": "BugCheck" if number % 2 == 0 else "Service Control Manager", "EventID": 1001,
+            "StringInserts": ["0x0000001a (0x0000000000005003, 0x0, 0x0, 0x0)"]
+        })
+    scans = [scan_event_viewer_incremental(source, state_path, ERROR_CODES, max_events=2) for _ in range(3)]
+    assert [[c["date"][-2:] for c in crashes] for crashes in scans] == [["10"], ["08"], ["06"]]
+    with open(state_path) as f:
+        assert json.load(f)["cursors"]["System"] == {"record_number": 110}
+
+    source.reads = 0
+    assert scan_event_viewer_incremental(source, state_path, ERROR_CODES, max_events=2) == []
+    assert source.reads == 1
+
+def test_capped_scans_in_a_row_never_repeat_a_crash(tmp_path):
+    state_path = str(tmp_path / "scan-state.json")
+    source = CountingSource(FIXTURE)
+    scan_event_viewer_incremental(source, state_path, ERROR_CODES)
+
+    def arrive(numbers):
+        for number in numbers:
+            source.logs["System"].append({
+                "RecordNumber": number, "TimeGenerated": f"2025-05-04 09:00:{number - 100:02d}",
+                "SourceName": "BugCheck" if number % 2 == 0 else "Service Control Manager", "EventID": 1001,
+                "StringInserts": ["0x0000001a (0x0000000000005003, 0x0, 0x0, 0x0)"]
+            })
+
+    # Two capped scans, each with new records waiting, leave two separate stretches read
+    arrive(range(105, 111))
+    scans = [scan_event_viewer_incremental(source, state_path, ERROR_CODES, max_events=2)]
+    arrive(range(111, 115))
+    scans.append(scan_event_viewer_incremental(source, state_path, ERROR_CODES, max_events=2))
+    with open(state_path) as f:
+        assert json.load(f)["cursors"]["System"]["read"] == [[109, 110], [113, 114]]
+
+    scans.append(scan_event_viewer_incremental(source, state_path, ERROR_CODES))
+    dates = [c["date"][-2:] for crashes in scans for c in crashes]
+    assert sorted(dates) == ["06", "08", "10", "12", "14"]
+    with open(state_path) as f:
+        assert json.load(f)["cursors"]["System"] == {"record_number": 114}
+
+def test_merge_skips_duplicate_crashes():
+    source = RecordedEventSource(FIXTURE)
+    events = [e for e in source.read_records("System") if 'BugCheck' in e.SourceName]
+    crash_events, seen = [], set()
+
+    assert merge_crash_events(events, ERROR_CODES, 'evtlog', crash_events, seen) == 2
+    # The same records seen again, say from a second query, add nothing
+    assert merge_crash_events(events, ERROR_CODES, 'evtlog', crash_events, seen) == 0
+    assert sorted(c["description"] for c in crash_events) == ["IRQL", "Memory"]
+
+def test_scan_crash_text_single_pass():
+    text = ("0x0000001a (0x0000000000005003, 0x0) The bugcheck was: 0x0000001a (0x5003). "
+            r"A dump was saved in: C:\Windows\Minidump\050325-9876-01.dmp. Report Id: 0x12345678")
+    hex_codes, bugcheck_codes, dump_file = scan_crash_text(text)
+    # A code inside the "bugcheck was:" phrase still counts as a hex code
+    assert hex_codes == ["0x0000001a", "0x0000000000", "0x0000001a", "0x12345678"]
+    assert bugcheck_codes == ["0x0000001a"]
+    assert dump_file == r"C:\Windows\Minidump\050325-9876-01.dmp"
+    assert scan_crash_text("The BugCheck was: 0x1A") == ([], ["0x1a"], "")
+
+def test_incremental_generator_yields_crashes_as_it_reads(tmp_path):
+    state_path = str(tmp_path / "scan-state.json")
+    crashes = iter_event_viewer_incremental(RecordedEventSource(FIXTURE), state_path, ERROR_CODES)
+    # The newest crash comes out before the older records have been read, and the cursor is saved at the end
+    assert next(crashes)["date"] == "2025-05-03 11:02:47"
+    assert not os.path.exists(state_path)
+    assert [c["date"] for c in crashes] == ["2025-05-01 08:16:10"]
+    assert os.path.exists(state_path)
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="pywin32 is expected on Windows")
+def test_pywin32_is_probed_once_and_only_when_needed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(event_viewer_scanner, "_pywin32_loaded", False)
+    monkeypatch.setattr(event_viewer_scanner, "add_pywin32_paths", lambda: calls.append(1))
+    assert event_viewer_scanner.load_pywin32() is False
+    assert event_viewer_scanner.load_pywin32() is False
+    # Off Windows I never touch sys.path looking for pywin32
+    assert calls == []
+    with pytest.raises(RuntimeError):
+        event_viewer_scanner.Win32EventLogSource()
@@ -0,0 +1,133 @@
+import io
+import os
+import time
+import threading
+import pytest
+import app as app_module
+import fleet_collector
+from app import app
+from crash_history import CrashHistory
+from event_viewer_scanner import parse_evtx_record
+from fleet_collector import collect_fleet, open_event_source
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "system_events.json")
+ERROR_CODES = {"errorCodes": [
+    {"code": "MEMORY_MANAGEMENT", "hexCode": "0x0000001A", "description": "Memory"},
+    {"code": "IRQL_NOT_LESS_OR_EQUAL", "hexCode": "0x0000000A", "description": "IRQL"},
+]}
+
+class HungSource:
+    # I'm standing in for a host that doesn't answer until the test lets it
+    answer = threading.Event()
+
+    def read_records(self, log_name):
+        self.answer.wait(5)
+        return iter(())
+
+def open_test_source(target):
+    if target == "hung-host":
+        return HungSource()
+    if target == "broken-host":
+        raise OSError("The RPC server is unavailable")
+    return open_event_source(target)
+
+def test_collect_fleet_merges_timeline_and_reports_hosts():
+    HungSource.answer.clear()
+    cleaned_up = threading.Event()
+    started = time.monotonic()
+    fleet = collect_fleet(
+        [("web01", FIXTURE), ("hung", "hung-host"), ("broken", "broken-host"), ("web02", FIXTURE)],
+        ERROR_CODES, timeout=0.5, open_source=open_test_source, cleanup=cleaned_up.set
+    )
+    assert time.monotonic() - started < 3
+
+    # The hung read is still going, so its files must stay until it stops
+    assert not cleaned_up.is_set()
+    HungSource.answer.set()
+    assert cleaned_up.wait(2)
+
+    # Later scans reuse the same pool instead of starting threads of their own
+    collect_fleet([("web01", FIXTURE)], ERROR_CODES, open_source=open_test_source)
+    assert sum(t.name.startswith("fleet-collector") for t in threading.enumerate()) <= 8
+
+    statuses = {host["host"]: host["status"] for host in fleet["hosts"]}
+    assert statuses == {"web01": "ok", "hung": "timeout", "broken": "error", "web02": "ok"}
+
+    # Both copies of the export land in one newest first timeline, each tagged with its host
+    crashes = fleet["crashes"]
+    assert [c["date"] for c in crashes] == sorted((c["date"] for c in crashes), reverse=True)
+    assert sorted(c["host"] for c in crashes) == ["web01", "web01", "web02", "web02"]
+
+def test_hung_reads_dont_starve_later_scans():
+    HungSource.answer.clear()
+    try:
+        # Both threads of the pool end up stuck on hosts that never answer...
+        hung = collect_fleet([("a", "hung-host"), ("b", "hung-host")], ERROR_CODES, timeout=0.3, max_workers=2,
+                             open_source=open_test_source)
+        assert [host["status"] for host in hung["hosts"]] == ["timeout", "timeout"]
+        assert fleet_collector.get_collector_pool(2).stuck() == 2
+
+        # ...yet the next scan still gets a thread of its own
+        fleet = collect_fleet([("web01", FIXTURE)], ERROR_CODES, timeout=1, max_workers=2,
+                              open_source=open_test_source)
+        assert fleet["hosts"][0]["status"] == "ok"
+    finally:
+        HungSource.answer.set()
+
+def test_collect_fleet_checks_labels_and_cleans_up_after_failed_submits(monkeypatch):
+    with pytest.raises(ValueError):
+        collect_fleet([("web01", FIXTURE), ("web01", FIXTURE)], ERROR_CODES, open_source=open_test_source)
+
+    # Say the pool refuses work halfway through, as it does while the interpreter shuts down
+    pool = fleet_collector.get_collector_pool(3)
+    submitted = []
+
+    def submit(function, *args):
+        if submitted:
+            raise RuntimeError("cannot schedule new futures after interpreter shutdown")
+        submitted.append(args)
+        return fleet_collector.CollectorPool.submit(pool, function, *args)
+
+    monkeypatch.setattr(pool, "submit", submit)
+    cleaned_up = threading.Event()
+    with pytest.raises(RuntimeError):
+        collect_fleet([("web01", FIXTURE), ("web02", FIXTURE)], ERROR_CODES, max_workers=3,
+                      open_source=open_test_source, cleanup=cleaned_up.set)
+    assert cleaned_up.wait(2)
+
+def test_parse_evtx_record():
+    xml = """<Event xmlns="http://schemas.microsoft.com/win/2004/08/events/event"><System>
+        <Provider Name="Microsoft-Windows-WER-SystemErrorReporting" EventSourceName="BugCheck"/>
+        <EventID Qualifiers="16384">1001</EventID><TimeCreated SystemTime="2025-05-03T11:02:47.1234567Z"/>
+        <EventRecordID>104</EventRecordID></System><EventData>
+        <Data Name="param1">0x0000000a (0x0, 0x2, 0x0, 0x0)</Data><Data Name="param2">C:\\Windows\\MEMORY.DMP</Data>
+        </EventData></Event>"""
+    assert parse_evtx_record(xml) == {
+        "RecordNumber": "104", "TimeGenerated": "2025-05-03 11:02:47", "SourceName": "BugCheck",
+        "EventID": "1001", "StringInserts": ["0x0000000a (0x0, 0x2, 0x0, 0x0)", "C:\\Windows\\MEMORY.DMP"]
+    }
+
+def refuse_to_index(error_codes_data):
+    raise AssertionError("The knowledge base's index should be reused, not rebuilt")
+
+def test_scan_fleet_api_with_exports(tmp_path, monkeypatch):
+    import fleet_collector
+    import event_viewer_scanner
+    monkeypatch.setattr(app_module, "crash_history", CrashHistory(str(tmp_path / "history.sqlite3")))
+    monkeypatch.setattr(fleet_collector, "ErrorCodeIndex", refuse_to_index)
+    monkeypatch.setattr(event_viewer_scanner, "ErrorCodeIndex", refuse_to_index)
+    app.config['TESTING'] = True
+    with app.test_client() as client, open(FIXTURE, "rb") as f:
+        export = f.read()
+        resp = client.post("/api/scan-fleet", data={
+            "eventLog": [(io.BytesIO(export), "web01.json"), (io.BytesIO(export), "web01.json")]
+        }, content_type='multipart/form-data')
+        body = resp.get_json()
+        assert resp.status_code == 200
+        assert body["events_found"] == 4
+        assert [h["host"] for h in body["hosts"]] == ["web01.json", "web01.json (2)"]
+        assert len(app_module.crash_history.query(host="web01.json (2)")) == 2
+
+        resp = client.post("/api/scan-fleet", data={"eventLog": (io.BytesIO(b"x"), "log.txt")},
+                           content_type='multipart/form-data')
+        assert resp.status_code == 400
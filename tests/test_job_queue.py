@@ -0,0 +1,41 @@
+import threading
+import time
+import pytest
+from job_queue import JobQueue, QueueFullError
+
+def test_queue_rejects_when_full():
+    # I'm blocking the only worker so the single queue slot fills up
+    release = threading.Event()
+    def slow(progress):
+        progress("working", 50)
+        release.wait(5)
+        return {"ok": True}, 200
+
+    jobs = JobQueue(max_workers=1, queue_depth=1)
+    first = jobs.submit(slow)
+    jobs.submit(slow)
+    assert not jobs.has_capacity()
+    with pytest.raises(QueueFullError):
+        jobs.submit(slow)
+
+    release.set()
+    for _ in range(100):
+        if jobs.get(first)["status"] == "done":
+            break
+        time.sleep(0.02)
+    assert jobs.get(first)["result"] == {"ok": True}
+    assert jobs.get(first)["progress"]["percent"] == 100
+
+def test_failed_job_records_error():
+    def broken(progress):
+        raise ValueError("bad dump")
+
+    jobs = JobQueue(max_workers=1, queue_depth=0)
+    job_id = jobs.submit(broken)
+    for _ in range(100):
+        if jobs.get(job_id)["status"] == "failed":
+            break
+        time.sleep(0.02)
+    job = jobs.get(job_id)
+    assert job["httpStatus"] == 500
+    assert "bad dump" in job["result"]["error"]
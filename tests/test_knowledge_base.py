@@ -0,0 +1,45 @@
+import os
+import json
+import pytest
+from knowledge_base import KnowledgeBase
+
+def write_codes(path, codes, mtime):
+    with open(path, "w") as f:
+        json.dump({"errorCodes": codes}, f)
+    # I'm setting the modification time myself so changes are seen even within one clock tick
+    os.utime(path, (mtime, mtime))
+
+def test_reload_swaps_snapshot_and_rolls_back_bad_files(tmp_path):
+    path = str(tmp_path / "error-codes.json")
+    write_codes(path, [{"code": "MEMORY_MANAGEMENT", "hexCode": "0x0000001A"}], 1000)
+    reloads = []
+    knowledge_base = KnowledgeBase([str(tmp_path / "missing.json"), path], on_reload=reloads.append)
+
+    first = knowledge_base.snapshot
+    assert first.version == 1 and first.index.by_hex("0x1A")["code"] == "MEMORY_MANAGEMENT"
+    assert knowledge_base.reload() is False
+
+    write_codes(path, [{"code": "IRQL_NOT_LESS_OR_EQUAL", "hexCode": "0x0000000A"}], 2000)
+    assert knowledge_base.reload() is True
+    second = knowledge_base.snapshot
+    assert second.version == 2 and second.index.by_hex("0xA")["code"] == "IRQL_NOT_LESS_OR_EQUAL"
+    assert reloads == [second]
+    # A request still holding the old snapshot keeps a consistent view
+    assert first.index.by_hex("0xA") is None
+
+    # Broken JSON and a bad entry both leave version 2 in place
+    with open(path, "w") as f:
+        f.write("{not json")
+    os.utime(path, (3000, 3000))
+    assert knowledge_base.reload() is False
+    write_codes(path, [{"hexCode": "0x0000000A"}], 4000)
+    assert knowledge_base.reload() is False
+    assert knowledge_base.snapshot is second
+
+def test_snapshot_is_read_only(tmp_path):
+    path = str(tmp_path / "error-codes.json")
+    write_codes(path, [{"code": "MEMORY_MANAGEMENT", "causes": ["RAM"]}], 1000)
+    data = KnowledgeBase([path]).snapshot.data
+    with pytest.raises(TypeError):
+        data["errorCodes"][0]["code"] = "CHANGED"
+    assert json.loads(json.dumps(data)) == {"errorCodes": [{"code": "MEMORY_MANAGEMENT", "causes": ["RAM"]}]}
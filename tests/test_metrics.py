@@ -0,0 +1,34 @@
+from metrics import Registry, NULL_METRIC
+
+def test_render_counters_gauges_and_histograms():
+    registry = Registry()
+    uploads = registry.counter("uploads_total", "Uploads", ("kind",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    seconds = registry.histogram("stage_seconds", "Stage seconds", ("stage",), buckets=(0.1, 1))
+    uploads.labels("dump").inc(3)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    seconds.labels("parse").observe(0.05)
+    seconds.labels("parse").observe(0.1)
+    seconds.labels("parse").observe(5)
+    registry.collector(lambda: [("jobs", "gauge", "Jobs", ("status",), {("queued",): 2})])
+
+    text = registry.render()
+    assert "# TYPE uploads_total counter" in text
+    assert 'uploads_total{kind="dump"} 3' in text
+    assert "in_flight 1" in text
+    # Buckets are cumulative and each bound includes values equal to it
+    assert 'stage_seconds_bucket{stage="parse",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="parse",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="parse"} 3' in text
+    assert 'jobs{status="queued"} 2' in text
+
+def test_disabled_registry_hands_out_no_ops():
+    registry = Registry(enabled=False)
+    seconds = registry.histogram("stage_seconds", "Stage seconds", ("stage",))
+    assert seconds is NULL_METRIC
+    with seconds.labels("parse").time():
+        pass
+    assert registry.render() == "\n"
@@ -32,3 +32,118 @@ def test_extract_dump_info(tmp_path, monkeypatch):
     info = extract_dump_info(str(f))
     assert isinstance(info, dict)
     assert "valid_format" in info
+
+# 4) Streaming scanner
+def test_stop_code_split_across_chunks(tmp_path):
+    # I'm using a tiny memory limit so the code straddles a chunk boundary
+    content = b"\xff"*10 + binascii.unhexlify(b"0000003B") + b"\xff"*10
+    f = tmp_path / "split.dmp"
+    f.write_bytes(content)
+    for limit in range(12, 40):
+        code, name = find_hex_patterns(str(f), memory_limit=limit)
+        assert name == "SYSTEM_SERVICE_EXCEPTION"
+
+def test_stop_code_priority_matches_table_order(tmp_path):
+    # MEMORY_MANAGEMENT appears first in the file, but IRQL comes first in STOP_CODES
+    content = binascii.unhexlify(b"0000001A") + b"\xff"*50 + binascii.unhexlify(b"0000000A")
+    f = tmp_path / "both.dmp"
+    f.write_bytes(content)
+    assert find_hex_patterns(str(f), memory_limit=30) == (0x0000000A, "IRQL_NOT_LESS_OR_EQUAL")
+
+def test_ascii_fallback_ignores_nulls(tmp_path):
+    # A UTF-16 code name should be found once the null bytes are dropped
+    content = b"\xff"*20 + "BAD_POOL_HEADER".encode("utf-16-le") + b"\xff"*20
+    f = tmp_path / "text.dmp"
+    f.write_bytes(content)
+    assert find_hex_patterns(str(f), memory_limit=48) == (0x00000019, "BAD_POOL_HEADER")
+    assert find_hex_patterns(str(tmp_path / "missing.dmp")) is None
+
+# 5) Structured header parsing
+def build_minidump(code, parameters, address=0, modules=(), written=0):
+    # I'm laying out a header, a two entry stream directory, an exception stream and a module list
+    import struct
+    header_size, directory_size = 32, 2 * 12
+    exception_rva = header_size + directory_size
+    exception = struct.pack("<IIIIQQII15Q", 1, 0, code, 0, 0, address, len(parameters), 0,
+                            *(list(parameters) + [0] * (15 - len(parameters))))
+    modules_rva = exception_rva + len(exception)
+    names_rva = modules_rva + 4 + 108 * len(modules)
+    table, names = b"", b""
+    for name, base, size, timestamp in modules:
+        encoded = name.encode("utf-16-le")
+        table += struct.pack("<QIIII84x", base, size, 0, timestamp, names_rva + len(names))
+        names += struct.pack("<I", len(encoded)) + encoded
+    module_list = struct.pack("<I", len(modules)) + table + names
+    return (struct.pack("<4sIIIIIQ", b"MDMP", 0xA793, 2, header_size, 0, written, 0)
+            + struct.pack("<III", 6, len(exception), exception_rva)
+            + struct.pack("<III", 4, len(module_list), modules_rva)
+            + exception + module_list)
+
+def test_extract_reads_bugcheck_record(tmp_path):
+    # The pattern scan would find 0x1A in the padding, but the record says 0x50
+    f = tmp_path / "record.dmp"
+    modules = [("\\SystemRoot\\system32\\drivers\\nvlddmkm.sys", 0xFFFFF80000000000, 0x100000, 0x5F000000)]
+    f.write_bytes(build_minidump(0x50, [1, 2, 3, 4, 5], 0xFFFFF80000001234, modules, written=1746270167)
+                  + binascii.unhexlify(b"0000001A"))
+    info = extract_dump_info(str(f))
+    assert info["stop_code"] == "0x00000050"
+    assert info["stop_code_name"] == "PAGE_FAULT_IN_NONPAGED_AREA"
+    assert info["parameters"] == [f"0x{p:016X}" for p in (1, 2, 3, 4)]
+    assert info["analysis_source"] == "bugcheck_record"
+    assert info["modules"][0]["name"] == "nvlddmkm.sys"
+    assert info["modules"][0]["base"] == 0xFFFFF80000000000
+    assert info["driver"]["name"] == "nvlddmkm.sys"
+    assert info["driver"]["offset"] == 0x1234
+    assert info["crash_time"] == 1746270167
+
+def test_extract_reads_kernel_dump_header(tmp_path):
+    import struct
+    header = bytearray(0x2000)
+    header[0:8] = b"PAGEDU64"
+    struct.pack_into("<I4xQQQQ", header, 0x38, 0x000000D1, 0x10, 0x2, 0x0, 0xFFFFF80012345678)
+    # SystemTime is a FILETIME: 100ns ticks since 1601
+    struct.pack_into("<Q", header, 0xFA8, 1746270167 * 10_000_000 + 116444736000000000)
+    f = tmp_path / "MEMORY.DMP"
+    f.write_bytes(bytes(header))
+    info = extract_dump_info(str(f))
+    assert info["valid_format"]
+    assert info["stop_code"] == "0x000000D1"
+    assert info["parameters"][3] == "0xFFFFF80012345678"
+    assert info["crash_time"] == 1746270167
+
+# 6) Buffers and file objects
+def test_extract_from_buffer_and_file_object(tmp_path):
+    import io
+    dump = build_minidump(0x7E, [0xC0000005])
+    for source in (dump, memoryview(dump), io.BytesIO(dump)):
+        info = extract_dump_info(source)
+        assert info["stop_code_name"] == "SYSTEM_THREAD_EXCEPTION_NOT_HANDLED"
+
+    f = tmp_path / "mapped.dmp"
+    f.write_bytes(dump)
+    with open(f, "rb") as handle:
+        assert extract_dump_info(handle)["stop_code"] == "0x0000007E"
+        assert check_minidump_signature(handle)
+
+def test_mapped_dump_is_closed_after_use(tmp_path, monkeypatch):
+    import mmap
+    import minidump_parser
+    maps = []
+
+    class RecordingMap(mmap.mmap):
+        def __new__(cls, *args, **kwargs):
+            maps.append(super().__new__(cls, *args, **kwargs))
+            return maps[-1]
+
+    monkeypatch.setattr(minidump_parser.mmap, "mmap", RecordingMap)
+    f = tmp_path / "mapped.dmp"
+    f.write_bytes(build_minidump(0x7E, [0xC0000005]))
+    with open(f, "rb") as handle:
+        with minidump_parser.open_dump_buffer(handle) as view:
+            assert bytes(view[:4]) == b"MDMP"
+        assert maps[-1].closed
+
+        # A caller still holding on to the view keeps it readable; nothing raises on the way out
+        with minidump_parser.open_dump_buffer(handle) as view:
+            pinned = memoryview(view)
+        assert bytes(pinned[:4]) == b"MDMP"
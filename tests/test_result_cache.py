@@ -0,0 +1,32 @@
+import os
+from result_cache import ResultCache
+
+def test_lru_eviction_and_persistence(tmp_path):
+    cache = ResultCache(str(tmp_path), max_entries=2)
+    cache.put("a", {"code": "A"})
+    cache.put("b", {"code": "B"})
+    assert cache.get("a") == {"code": "A"}   # "a" is now the most recently used
+    cache.put("c", {"code": "C"})
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    # I'm checking that a fresh instance picks the results back up from disk
+    reloaded = ResultCache(str(tmp_path), max_entries=2)
+    assert reloaded.get("a") == {"code": "A"}
+    assert reloaded.get("c") == {"code": "C"}
+
+def test_ttl_expiry_counts_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60)
+    cache.put("old", {"code": "OLD"})
+    cache.ttl = -1
+    assert cache.get("old") is None
+    assert not os.path.exists(tmp_path / "old.json")
+    stats = cache.stats()
+    assert stats["hits"] == 0 and stats["misses"] == 1
+
+def test_clear_forgets_everything(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("a" * 64, {"code": "MEMORY_MANAGEMENT"})
+    cache.clear()
+    assert cache.get("a" * 64) is None
+    assert ResultCache(str(tmp_path)).stats()["entries"] == 0
@@ -0,0 +1,34 @@
+import gzip
+from app import app
+from static_assets import StaticAssets
+
+def test_index_points_at_fingerprinted_assets(tmp_path):
+    (tmp_path / "index.html").write_text('<link href="styles.css"><script src="/script.js"></script><a href="https://x/">')
+    (tmp_path / "script.js").write_text("console.log('hi');")
+    (tmp_path / "styles.css").write_text("body { color: red; }")
+    assets = StaticAssets(str(tmp_path))
+
+    script, _ = assets.get("script.js")
+    html = assets.get("index.html")[0].data.decode()
+    assert f'src="/script.{script.etag[:12]}.js"' in html
+    assert 'href="styles.' in html and 'href="styles.css"' not in html
+    assert 'href="https://x/"' in html
+    assert assets.get(f"script.{script.etag[:12]}.js") == (script, True)
+    assert assets.get("script.js") == (script, False)
+    assert assets.get("missing.js") == (None, False)
+
+def test_static_routes_cache_headers():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        index = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert index.status_code == 200
+        assert "no-cache" in index.headers["Cache-Control"]
+        html = gzip.decompress(index.data).decode()
+        script_name = html.split('<script src="')[1].split('"')[0]
+        assert script_name.startswith("script.") and script_name != "script.js"
+
+        script = client.get("/" + script_name, headers={"Accept-Encoding": "gzip"})
+        assert script.headers["Content-Encoding"] == "gzip"
+        assert "immutable" in script.headers["Cache-Control"]
+        assert client.get("/" + script_name, headers={"If-None-Match": script.headers["ETag"],
+                                                      "Accept-Encoding": "gzip"}).status_code == 304
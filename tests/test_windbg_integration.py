@@ -0,0 +1,72 @@
+import os
+import re
+import sys
+import pytest
+from windbg_integration import WinDbgAnalyzer, WinDbgOutputParser
+
+FAKE_CDB = os.path.join(os.path.dirname(__file__), "fixtures", "fake_cdb.py")
+
+@pytest.fixture
+def analyzer(tmp_path):
+    # I'm turning my scripted debugger into an executable so it stands in for cdb.exe
+    debugger = tmp_path / "cdb"
+    with open(FAKE_CDB) as f:
+        debugger.write_text(f"#!{sys.executable}\n" + f.read())
+    debugger.chmod(0o755)
+    analyzer = WinDbgAnalyzer(debugger_path=str(debugger), pool_size=1,
+                              symbol_cache=str(tmp_path / "symbols"), timeout=2)
+    yield analyzer
+    analyzer.pool.close()
+
+def write_dump(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+def session_pid(result):
+    return re.search(r"Session (\d+)", result["raw_output"]).group(1)
+
+def test_session_is_reused_across_dumps(analyzer, tmp_path):
+    first = analyzer.analyze_dump(write_dump(tmp_path, "a.dmp", "0x50 PAGE_FAULT_IN_NONPAGED_AREA nvlddmkm.sys"))
+    second = analyzer.analyze_dump(write_dump(tmp_path, "b.dmp", "0xA IRQL_NOT_LESS_OR_EQUAL tcpip.sys"))
+    assert first["success"] and second["success"]
+    assert first["stop_code_name"] == "PAGE_FAULT_IN_NONPAGED_AREA"
+    assert second["responsible_driver"] == "tcpip.sys"
+    assert "mydrv.sys" in second["loaded_modules"]
+    assert second["module_table"] == [{"name": "mydrv", "start": "0xFFFFF80110000000",
+                                        "end": "0xFFFFF80110100000", "details": "mydrv.sys"}]
+    assert session_pid(first) == session_pid(second)
+    assert os.path.isdir(tmp_path / "symbols")
+
+def test_hung_session_is_recycled(analyzer, tmp_path):
+    hung = analyzer.analyze_dump(write_dump(tmp_path, "hang.dmp", "hang"))
+    assert hung["error"] == "WinDbg analysis timed out"
+    assert analyzer.pool.recycled == 1
+
+    # I'm checking the pool starts a fresh session for the next dump
+    result = analyzer.analyze_dump(write_dump(tmp_path, "c.dmp", "0x1A MEMORY_MANAGEMENT ntfs.sys"))
+    assert result["success"]
+    assert result["stop_code"] == "0x1A"
+
+def test_output_parser_reads_every_field_in_one_pass():
+    parser = WinDbgOutputParser()
+    for line in [
+        "EXCEPTION_PARAMETER1: fffff80112345678\n",
+        # The first mention has no name; the name comes with a later one
+        "Bugcheck code: 0xD1\n",
+        "Bugcheck code: 0xD1 (DRIVER_IRQL_NOT_LESS_OR_EQUAL)\n",
+        "Probably caused by : tcpip.sys ( tcpip+1234 )\n",
+        "start             end                 module name\n",
+        "fffff801`10000000 fffff801`10100000   tcpip      (deferred)\n",
+        "fffff801`20000000 fffff801`20100000   ndis       (pdb symbols)  c:\\symbols\\ndis.pdb\n",
+        "\n",
+        "Unloaded modules: dump_storport.sys tcpip.sys \n",
+    ]:
+        parser.feed(line)
+    results = parser.results()
+    assert results["stop_code"] == "0xD1"
+    assert results["stop_code_name"] == "DRIVER_IRQL_NOT_LESS_OR_EQUAL"
+    assert results["responsible_driver"] == "tcpip.sys"
+    assert results["responsible_address"] == "fffff80112345678"
+    assert [m["name"] for m in results["module_table"]] == ["tcpip", "ndis"]
+    assert results["loaded_modules"] == ["tcpip.sys", "storport.sys"]